@@ -0,0 +1,290 @@
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+from bank_money import Money
+from bank_storage import Storage
+from bank_transaction import Transaction
+
+
+def merge_posts(posts: list[tuple]) -> (tuple[dict[str, Money], list[Transaction]]):
+    """
+    merges several postings into one, in order -> a later balance of an account replaces an earlier one and the
+    transactions keep their order
+
+    Args:
+        -> posts (list[tuple]): (balances, transactions) of every posting
+
+    Returns:
+        -> tuple[dict[str, Money], list[Transaction]]: the balances and transactions of a single post
+    """
+    balances = {}
+    transactions = []
+
+    for post_balances, post_transactions in posts:
+        balances.update(post_balances)
+        transactions.extend(post_transactions)
+
+    return balances, transactions
+
+
+class SerializedStorage(Storage):
+    """
+    Storage backend wrapper that makes any backend safe to post to from many threads. Every write is handed to a single
+    writer thread which applies the writes to the wrapped backend one at a time, in the order they arrive, while the
+    calling thread waits until its write is stored (errors are raised in the calling thread). Reads go straight to the
+    wrapped backend.
+
+    ** Together with the per-account locks of BankAccount this is the concurrency-safe mode of the Bank System ->
+       independent accounts can be posted in parallel from a thread pool, e.g
+
+            BankAccount.storage = SerializedStorage(TextStorage(sequence=TransactionSequence()))
+
+    Constructor Args:
+        -> storage (Storage): backend the writes are applied to
+    """
+
+    def __init__(self, storage: Storage) -> (None):
+        """
+        constructor method for class Serialized Storage, starts the writer thread
+
+        Args:
+            -> storage (Storage): backend the writes are applied to
+        """
+        self.storage = storage
+        self.queue = queue.Queue()
+        self.closed = False
+
+        # keeps a write from being queued behind the stop marker of close()
+        self._lock = threading.Lock()
+
+        self.writer = threading.Thread(target=self._write_loop, name='storage-writer', daemon=True)
+        self.writer.start()
+
+    def _write_loop(self) -> (None):
+        """
+        body of the writer thread -> applies the queued writes one by one until close() queues None
+        """
+        while True:
+            write = self.queue.get()
+
+            if write is None:
+                return
+
+            future, method, args = write
+
+            try:
+                future.set_result(method(*args))
+            except BaseException as error:
+                future.set_exception(error)
+
+    def _submit(self, method, *args):
+        """
+        queues a write for the writer thread and waits until it was applied
+
+        Args:
+            -> method (callable): method of the wrapped backend
+            -> args: arguments of the method
+
+        Returns:
+            -> the result of the method, its exception is raised here
+        """
+        future = Future()
+
+        with self._lock:
+            if self.closed:
+                raise RuntimeError('storage writer is closed')
+
+            self.queue.put((future, method, args))
+
+        return future.result()
+
+    def load_accounts(self) -> (list[tuple]):
+        """
+        returns all account rows of the wrapped backend
+        """
+        return self.storage.load_accounts()
+
+    def load_transactions(self):
+        """
+        returns an iterable over all transactions of the wrapped backend
+        """
+        return self.storage.load_transactions()
+
+    def load_customers(self) -> (list[tuple]):
+        """
+        returns all customer rows of the wrapped backend
+        """
+        return self.storage.load_customers()
+
+    def reserve_transaction_ids(self, count: int) -> (range):
+        """
+        reserves count consecutive transaction IDs from the wrapped backend's (thread-safe) sequence
+
+        Args:
+            -> count (int): number of transaction IDs to reserve
+
+        Returns:
+            -> range: the reserved transaction IDs
+        """
+        return self.storage.reserve_transaction_ids(count)
+
+    def post(self, balances: dict[str, Money], transactions: list[Transaction]) -> (None):
+        """
+        stores new balances and transactions through the writer thread, transactions get their IDs in the order
+        they are written
+
+        Args:
+            -> balances (dict[str, Money]): account number mapped to the updated funds of the account
+            -> transactions (list[Transaction]): transactions to be stored
+        """
+        self._submit(self.storage.post, balances, transactions)
+
+    def add_account(self, customer_id: int, account: tuple) -> (None):
+        """
+        stores a new account through the writer thread
+
+        Args:
+            -> customer_id (int): unique identifier of the customer owning the account
+            -> account (tuple): account row of the new account
+        """
+        self._submit(self.storage.add_account, customer_id, account)
+
+    def delete_account(self, account_number: str) -> (None):
+        """
+        removes an account through the writer thread
+
+        Args:
+            -> account_number (str): account number of the account to be removed
+        """
+        self._submit(self.storage.delete_account, account_number)
+
+    def add_customer(self, customer: tuple) -> (None):
+        """
+        stores a new customer through the writer thread
+
+        Args:
+            -> customer (tuple): customer row of the new customer
+        """
+        self._submit(self.storage.add_customer, customer)
+
+    def close(self) -> (None):
+        """
+        stores the writes still queued, stops the writer thread and closes the wrapped backend (if it can be closed)
+        """
+        with self._lock:
+            if self.closed:
+                return
+
+            self.closed = True
+            self.queue.put(None)
+
+        self.writer.join()
+
+        if hasattr(self.storage, 'close'):
+            self.storage.close()
+
+
+class GroupCommitStorage(SerializedStorage):
+    """
+    Storage backend wrapper that commits the postings of concurrent callers in groups. The writer thread takes every
+    posting queued while the previous group was stored (waiting up to max_wait seconds for more), stores the group as
+    one post of the wrapped backend -> one buffered append and one fsync for the whole group -> and then acknowledges
+    every caller of the group. A caller returns only once its posting is stored, exactly as with SerializedStorage.
+
+    ** Meant for a wrapped backend with sync enabled, e.g GroupCommitStorage(TextStorage(sync=True)), where a per-post
+       fsync would otherwise cap the number of postings per second
+    ** If a group can't be stored, every caller of the group gets the error
+    ** Account changes and new customers are not grouped, they end the current group so all writes keep their order
+
+    Constructor Args:
+        -> storage (Storage): backend the writes are applied to
+        -> max_batch (int): largest number of postings stored as one group. Defaults to 256
+        -> max_wait (float): seconds the writer waits for more postings before storing a group, 0 only groups the
+           postings already queued. Defaults to 0.0
+    """
+
+    def __init__(self, storage: Storage, max_batch: int = 256, max_wait: float = 0.0) -> (None):
+        """
+        constructor method for class Group Commit Storage, starts the writer thread
+
+        Args:
+            -> storage (Storage): backend the writes are applied to
+            -> max_batch (int): largest number of postings stored as one group. Defaults to 256
+            -> max_wait (float): seconds the writer waits for more postings before storing a group. Defaults to 0.0
+        """
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+
+        # a write taken from the queue that ended a group, it is applied next
+        self._held = []
+
+        super().__init__(storage)
+
+    def _take(self) -> (tuple):
+        """
+        returns the next write to apply, waiting for one if none is queued
+        """
+        return self._held.pop() if self._held else self.queue.get()
+
+    def _next_group(self, write: tuple) -> (list[tuple]):
+        """
+        collects the postings queued behind a first posting
+
+        Args:
+            -> write (tuple): the first posting of the group
+
+        Returns:
+            -> list[tuple]: the postings of the group
+        """
+        group = [write]
+        deadline = time.monotonic() + self.max_wait
+
+        while len(group) < self.max_batch:
+            try:
+                remaining = deadline - time.monotonic()
+                write = self.queue.get(timeout=remaining) if remaining > 0 else self.queue.get_nowait()
+            except queue.Empty:
+                break
+
+            # any other write (or the stop marker of close()) ends the group
+            if write is None or write[1] != self.storage.post:
+                self._held.append(write)
+                break
+
+            group.append(write)
+
+        return group
+
+    def _write_loop(self) -> (None):
+        """
+        body of the writer thread -> stores the queued postings group by group and applies any other write on its
+        own, until close() queues None
+        """
+        while True:
+            write = self._take()
+
+            if write is None:
+                return
+
+            future, method, args = write
+
+            if method != self.storage.post:
+                try:
+                    future.set_result(method(*args))
+                except BaseException as error:
+                    future.set_exception(error)
+
+                continue
+
+            group = self._next_group(write)
+
+            try:
+                self.storage.post(*merge_posts([args for future, method, args in group]))
+            except BaseException as error:
+                for future, method, args in group:
+                    future.set_exception(error)
+            else:
+                for future, method, args in group:
+                    future.set_result(None)
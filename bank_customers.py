@@ -0,0 +1,154 @@
+import threading
+from bisect import bisect_left, insort
+
+from bank_external import Customer
+from bank_sequence import CustomerSequence
+
+
+def _name_key(text: str) -> (str):
+    """
+    returns the form a name is indexed and searched by -> case and surrounding whitespace are ignored
+    """
+    return text.strip().casefold()
+
+
+class CustomerRegistry(object):
+    """
+    A class to hold all customers of the Bank System. Customers are kept in a dict keyed by customer ID, so a login is a
+    single lookup, and in two sorted name indexes -> (surname, name) and name -> so a back-office search by a surname
+    or name prefix is a binary search plus the matching entries only. New customer IDs come from a persistent sequence.
+
+    ** Iterating over the registry yields the customers in the order they were added
+
+    Constructor Args:
+        -> customers (Iterable[Customer]): customers to register. Defaults to ()
+        -> sequence (CustomerSequence): sequence of new customer IDs. Defaults to the sequence in 'data/customerSequence.txt'
+    """
+
+    def __init__(self, customers=(), sequence: CustomerSequence = None) -> (None):
+        """
+        constructor method for class Customer Registry
+
+        Args:
+            -> customers (Iterable[Customer]): customers to register. Defaults to ()
+            -> sequence (CustomerSequence): sequence of new customer IDs. Defaults to the sequence in 'data/customerSequence.txt'
+        """
+        self.customers = {customer.get_custID(): customer for customer in customers}
+
+        # entries are (surname key, name key, customer ID) and (name key, customer ID), kept sorted
+        self._surnames = sorted((_name_key(customer.surname), _name_key(customer.name), customer_id) for customer_id, customer in self.customers.items())
+        self._names = sorted((_name_key(customer.name), customer_id) for customer_id, customer in self.customers.items())
+
+        # the sequence never hands out an ID at or below the highest registered one
+        self.sequence = sequence if sequence is not None else CustomerSequence(last=max(self.customers, default=0))
+
+        # the indexes may be changed from several threads at once
+        self._lock = threading.Lock()
+
+    def __len__(self) -> (int):
+        return len(self.customers)
+
+    def __iter__(self):
+        return iter(list(self.customers.values()))
+
+    def __contains__(self, customer_id: int) -> (bool):
+        return customer_id in self.customers
+
+    def get(self, customer_id: int) -> (Customer):
+        """
+        looks a customer up by ID
+
+        Args:
+            -> customer_id (int): unique identifier of the customer
+
+        Returns:
+            -> Customer: the customer, None if no customer has the ID
+        """
+        return self.customers.get(customer_id)
+
+    def new_id(self) -> (int):
+        """
+        allocates the ID of a new customer
+
+        Returns:
+            -> int: unique customer ID
+        """
+        return self.sequence.next()
+
+    def add(self, customer: Customer) -> (None):
+        """
+        registers a customer and adds it to the name indexes
+
+        Args:
+            -> customer (Customer): customer to register, its ID must not be registered yet
+        """
+        with self._lock:
+            if customer.get_custID() in self.customers:
+                raise ValueError(f'customer {customer.get_custID()} is already registered')
+
+            self.customers[customer.get_custID()] = customer
+            insort(self._surnames, (_name_key(customer.surname), _name_key(customer.name), customer.get_custID()))
+            insort(self._names, (_name_key(customer.name), customer.get_custID()))
+
+    def remove(self, customer_id: int) -> (Customer):
+        """
+        removes a customer and its entries in the name indexes
+
+        Args:
+            -> customer_id (int): unique identifier of the customer
+
+        Returns:
+            -> Customer: the removed customer
+        """
+        with self._lock:
+            customer = self.customers.pop(customer_id)
+
+            for index, entry in ((self._surnames, (_name_key(customer.surname), _name_key(customer.name), customer_id)), (self._names, (_name_key(customer.name), customer_id))):
+                del index[bisect_left(index, entry)]
+
+        return customer
+
+    @staticmethod
+    def _prefixed(index: list[tuple], prefix: tuple) -> (list[int]):
+        """
+        returns the customer IDs of the index entries starting with prefix, the final part of prefix may be partial
+        """
+        matches = []
+        position = bisect_left(index, prefix)
+
+        # matching entries follow each other from the first entry at or after prefix
+        while position < len(index):
+            entry = index[position]
+
+            if entry[:len(prefix) - 1] != prefix[:-1] or not entry[len(prefix) - 1].startswith(prefix[-1]):
+                break
+
+            matches.append(entry[-1])
+            position += 1
+
+        return matches
+
+    def search(self, surname: str = '', name: str = '') -> (list[Customer]):
+        """
+        finds customers by a surname prefix, a full surname and a name prefix, or a name prefix alone, e.g
+        search('mur') -> Murphy, Murray .. and search('murphy', 'j') -> John Murphy, Jane Murphy ..
+
+        Args:
+            -> surname (str): (prefix of the) surname, matched in full when a name is given too. Defaults to ''
+            -> name (str): (prefix of the) name. Defaults to ''
+
+        Returns:
+            -> list[Customer]: matching customers ordered by surname and name (or by name when searching by name alone)
+        """
+        surname, name = _name_key(surname), _name_key(name)
+
+        if surname and name:
+            ids = self._prefixed(self._surnames, (surname, name))
+        elif surname:
+            ids = self._prefixed(self._surnames, (surname,))
+        elif name:
+            ids = self._prefixed(self._names, (name,))
+        else:
+            ids = [entry[-1] for entry in self._surnames]
+
+        return [self.customers[customer_id] for customer_id in ids]
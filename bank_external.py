@@ -1,7 +1,36 @@
+import contextlib
 import datetime
+import threading
+from bank_history import read_transactions
+from bank_money import Money
+from bank_statement import StatementIndex
+from bank_storage import TextStorage
+from bank_transaction import DEPOSIT, TRANSFER_FROM, TRANSFER_TO, WITHDRAWAL, Transaction
 
 today = datetime.date.today() # global variable to permanantly store the date of day of program execution
 
+
+@contextlib.contextmanager
+def lock_accounts(accounts):
+    """
+    context manager holding the locks of several Bank Accounts. The locks are always taken in ascending account number
+    order, so two threads locking overlapping accounts (e.g transfers in opposite directions) can never deadlock
+
+    Args:
+        -> accounts (iterable): Bank Account instances to lock, duplicates are locked once
+    """
+    ordered = sorted({account.account_number: account for account in accounts}.items())
+
+    for account_number, account in ordered:
+        account._lock.acquire()
+
+    try:
+        yield
+    finally:
+        for account_number, account in reversed(ordered):
+            account._lock.release()
+
+
 class BankAccount(object):
     """
     A class to represent a Bank Account
@@ -10,7 +39,7 @@ class BankAccount(object):
     
     Constructor Args:
         -> account_number (str): A Unique Bank Account Identifier
-        -> funds (float): The total funds allocated to the Bank Account. Defaults to 0.0   
+        -> funds (Money): The total funds allocated to the Bank Account. Defaults to 0.00   
         -> transaction_history (list): A list that contains all the transactions that involves the said Bank Account. Defaults to None
 
     """    
@@ -19,17 +48,20 @@ class BankAccount(object):
     BANK_CODE = 'GBIK'     
     BRANCH_CODE = '123456' 
 
-    def __init__(self, account_number: str, funds: float = 0.0, transaction_history: list = None) -> (None): 
+    # storage backend shared by all Bank Accounts and Customers, defaults to the text files in data/
+    storage = TextStorage()
+
+    def __init__(self, account_number: str, funds: Money = Money(), transaction_history: list = None) -> (None): 
         """
         constructor method for class Bank Account
 
         Args:
         -> account_number (str): A Unique Bank Account Identifier
-        -> funds (float): The total funds allocated to the Bank Account. Defaults to 0.0   
+        -> funds (Money): The total funds allocated to the Bank Account. Defaults to 0.00   
         -> transaction_history (list): A list that contains all the transactions that involves the said Bank Account. Defaults to None
         """ 
         self.account_number = account_number
-        self._funds = funds
+        self._funds = Money.of(funds)
         self.iban = self.COUNTRY + self.CHECK_DIGIT + self.BANK_CODE + self.BRANCH_CODE + self.account_number
         
         if transaction_history is None:
@@ -37,214 +69,274 @@ class BankAccount(object):
         else:
             self._transaction_history = transaction_history
 
-    def set_funds(self, funds: float) -> (None): 
+        # source of a deferred transaction history -> (transactions file, byte offsets), see defer_transactions()
+        self._history_source = None
+
+        # held while funds are checked and changed, re-entrant so subclass checks and the base posting share it
+        self._lock = threading.RLock()
+
+        # date index over the transaction history, built on the first call of get_statement()
+        self._statement_index = None
+
+    def set_funds(self, funds: Money) -> (None): 
         """
         set method to set the protected variable funds to a new value (arg) funds
 
         Args:
-            -> funds (float): update float value to set _funds to
+            -> funds (Money): update value to set _funds to, plain numbers are converted to Money
 
         """        
-        self._funds = funds
+        self._funds = Money.of(funds)
 
-    def get_funds(self) -> (float):
+    def get_funds(self) -> (Money):
         """
         get method to return the value of the protected variable funds
 
         Returns:
-            -> float: funds is a float value
+            -> Money: funds in whole cents
         """        
         return self._funds
 
-    def get_transactions(self) -> (list[str]): 
+    def get_transactions(self) -> (list[Transaction]): 
         """
         get method to return the protected list of transactions associated with the bank account
 
         Returns:
-            -> list: list of strings of all the transactions
+            -> list: list of Transaction records of all the transactions
         """        
+        # a deferred transaction history is read from accountsTransactions.txt the first time it is needed
+        if self._history_source is not None:
+            self._transaction_history = read_transactions(*self._history_source) + self._transaction_history
+            self._history_source = None
+
         return self._transaction_history
-        
-    def _file_index(self, file_name: str) -> (int):
+
+    def get_statement(self, start: datetime.date = None, end: datetime.date = None, page: int = 1, page_size: int = 20) -> (tuple[list[Transaction], int]):
         """
-        method that finds the final index within a given file (file_name: str)
+        get method to return one page of the transactions dated within a range, oldest first. Pages are served from a
+        date index over the transaction history (see bank_statement.py) instead of a pass over the whole history
 
         Args:
-            -> file_name (str): text file to find index for
+            -> start (datetime.date): first date of the range, None for no lower bound. Defaults to None
+            -> end (datetime.date): last date of the range (inclusive), None for no upper bound. Defaults to None
+            -> page (int): number of the page, starting at 1. Defaults to 1
+            -> page_size (int): number of transactions per page. Defaults to 20
 
         Returns:
-            -> int: returns the index of the final item in the text file
-        """        
-        # try-except to catch file name error  
-        try:     
-            with open(file_name, 'r') as f:
-                num_lines = len([line.strip('\n') for line in f.readlines() if line != '\n']) 
-           
-            return num_lines
+            -> tuple[list[Transaction], int]: the transactions of the page and the number of transactions in the range
+        """
+        with self._lock:
+            return self._history_index().page(self.get_transactions(), start, end, page, page_size)
 
-        except IOError as file_unidentified:
-            print(file_unidentified)
-            
-    def deposit(self, amount: float) -> (None):
+    def _history_index(self) -> (StatementIndex):
         """
-        method to deposit money into a given Bank Account, updates text files; accounts and transactions
-        with updated values
+        method that returns the date and running balance index over the transaction history, up to date with the history
+        """
+        if self._statement_index is None:
+            self._statement_index = StatementIndex()
+
+        self._statement_index.refresh(self.get_transactions())
+        return self._statement_index
+
+    def get_balance_at(self, date: datetime.date) -> (Money):
+        """
+        get method to return the balance of the bank account at the end of a date, from the running balance index
 
         Args:
-            -> amount (float): amount to be added to current funds
-        """ 
-        # check for non-negative input       
-        if amount > 0: 
+            -> date (datetime.date): date to return the closing balance of
 
-            with open('data/accounts.txt', mode='r') as f:  
+        Returns:
+            -> Money: funds after all transactions dated on or before date
+        """
+        with self._lock:
+            index = self._history_index()
 
-                new_accounts = []
+            # funds not explained by the history (e.g opening funds in accounts.txt) were there before the first transaction
+            return self._funds - Money(index.balance_after(index.size)) + Money(index.balance_after(index.count_through(date)))
 
-                '''
-                for loop to read and modify a specific account that matches the current instance's bank account number.
-                if a match is found, the specific account gets modified to the updated funds value within the accounts.txt file
-                '''
-                for account in f.readlines():        
-                    # check if instance bank account number matches with current account in the loop 
-                    if str(self.account_number) in account: 
+    def get_period_balances(self, start: datetime.date, end: datetime.date) -> (tuple[Money, Money]):
+        """
+        get method to return the opening and closing balance of a period
 
-                        # if account number matched -> funds gets replaced with added funds
-                        account = account.replace(str(self._funds), str(self._funds + amount), 1) 
-                    
-                    new_accounts.append(account) 
+        Args:
+            -> start (datetime.date): first date of the period
+            -> end (datetime.date): last date of the period (inclusive)
 
-            # writing all accounts back to the accounts text file
-            with open('data/accounts.txt', mode='w') as f:
-                for account in new_accounts:
-                    f.write(account)           
-           
-            self._funds += amount
+        Returns:
+            -> tuple[Money, Money]: funds before the first transaction dated start and after the last transaction dated end
+        """
+        with self._lock:
+            index = self._history_index()
+            base = self._funds.cents - index.balance_after(index.size)
 
-            # appending deposit transaction to text accountsTransactions.txt
-            with open('data/accountsTransactions.txt', mode='a+') as g:
+            return Money(base + index.balance_after(index.count_before(start))), Money(base + index.balance_after(index.count_through(end)))
 
-                # using the protected _file_index method to get the appropriate index of last transaction made in the text file accountsTransactions.txt
-                i = self._file_index('data/accountsTransactions.txt')
+    def get_balance_range(self, start: datetime.date, end: datetime.date) -> (tuple[Money, Money]):
+        """
+        get method to return the lowest and highest balance of a period -> the opening balance and the balance after
+        every transaction of the period are taken into account
 
-                # define transaction string format appropriatly for writing and write transaction
-                transaction = f'{i + 1}, {self.account_number}, +{amount}, {today}, deposit\n'
-                g.write(transaction)
+        Args:
+            -> start (datetime.date): first date of the period
+            -> end (datetime.date): last date of the period (inclusive)
 
-                # append transaction to protected instance attribute transaction history
-                transaction = [str(i+1), self.account_number, '+' + str(amount), str(today), 'deposit']
-                self._transaction_history.append(transaction)
-                                    
-    def withdraw(self, amount: float) -> (None):
+        Returns:
+            -> tuple[Money, Money]: minimum and maximum funds within the period
         """
-        method to withdraw money from a given Bank Account, updates databases i.e updates accounts and 
-        transactions text files with updated values
+        with self._lock:
+            index = self._history_index()
+            base = self._funds.cents - index.balance_after(index.size)
+            lo, hi = index.count_before(start), index.count_through(end)
+            lowest = highest = index.balance_after(lo)
+
+            if lo < hi:
+                low, high = index.extremes(lo, hi)
+                lowest, highest = min(lowest, low), max(highest, high)
+
+            return Money(base + lowest), Money(base + highest)
+
+    def _record(self, transaction: Transaction) -> (None):
+        """
+        method that appends a newly posted transaction to the protected transaction history
 
         Args:
-            -> amount (float): amount to be subtracted from current instance funds attribute
-        """        
-        if amount > 0:
-            with open('data/accounts.txt', mode='r') as f:
-                new_accounts = []
+            -> transaction (Transaction): the posted transaction
+        """
+        # a deferred history is read in front of the recorded transactions later, so it doesn't have to be read now
+        self._transaction_history.append(transaction)
 
-                '''
-                    for loop to read and modify a specific account that matches the current instance's bank account number.
-                    if a match is found, the specific account gets modified to the updated funds value within the accounts.txt file
-                '''
-                for account in f.readlines():
-                    if self.account_number in account:
+        # the running balances are kept up to date with every posting once they are in use
+        if self._statement_index is not None and self._history_source is None:
+            self._statement_index.refresh(self._transaction_history)
 
-                        # if account number matched, modify account -> funds gets replaced with updated subtracted funds
-                        account = account.replace(str(self._funds), str(self._funds - amount), 1)
+    def _truncate_transactions(self, count: int) -> (None):
+        """
+        method that drops the transactions after the first count transactions from the history, used to undo postings
+        that could not be stored
 
-                    new_accounts.append(account)
+        Args:
+            -> count (int): number of transactions to keep
+        """
+        del self.get_transactions()[count:]
 
-            # writing all accounts back to the accounts text file
-            with open('data/accounts.txt', mode='w') as f:
-                for account in new_accounts:
-                    f.write(account)
+        # the running balances of the dropped transactions are stale, the index is rebuilt on the next lookup
+        self._statement_index = None
 
-            # update instance attribute funds
-            self._funds -= amount
+    def defer_transactions(self, transactions_txt: str, offsets) -> (None):
+        """
+        method to defer loading of the transaction history, the history is read from the given byte offsets of the
+        transactions file on the first call of get_transactions()
 
-            # appending withdraw transaction to text accountsTransactions.txt
-            with open('data/accountsTransactions.txt', mode='a') as g:
+        Args:
+            -> transactions_txt (str): text file containing All Transactions in Banking System
+            -> offsets (array): byte offsets of this account's transaction lines within transactions_txt
+        """
+        self._history_source = (transactions_txt, offsets)
+        
+        
+    def _post(self, balances: dict[str, Money], transactions: list[Transaction]) -> (None):
+        """
+        method that persists new balances for one or more accounts together with the transactions that caused them
+        through the storage backend, the backend gives the transactions their IDs
 
-                # using the protected _file_index method to get the appropriate index of last transaction made in the text file accountsTransactions.txt
-                i = self._file_index('data/accountsTransactions.txt')
+        Args:
+            -> balances (dict[str, Money]): account number mapped to the updated funds of the account
+            -> transactions (list[Transaction]): transactions to be stored
+        """
+        BankAccount.storage.post(balances, transactions)
 
-                # define transaction string format appropriatly for writing and write transaction
-                transaction_txt = f'{i + 1}, {self.account_number}, -{amount}, {today}, withdrawal\n'
-                g.write(transaction_txt)
+    def deposit(self, amount: Money) -> (None):
+        """
+        method to deposit money into a given Bank Account, updates text files; accounts and transactions
+        with updated values
+
+        Args:
+            -> amount (Money): amount to be added to current funds, plain numbers are converted to Money
+        """ 
+        amount = Money.of(amount)
+
+        # check for non-negative input       
+        if amount > 0: 
+            with self._lock:
+
+                # define transaction appropriatly and store it together with the updated funds
+                transaction = Transaction(None, self.account_number, amount.cents, today.toordinal(), DEPOSIT)
+                self._post({self.account_number: self._funds + amount}, [transaction])
+               
+                # update instance attribute funds and append to protected instance attribute transaction history
+                self._funds += amount
+                self._record(transaction)
+                                    
+    def withdraw(self, amount: Money) -> (None):
+        """
+        method to withdraw money from a given Bank Account, updates databases i.e updates accounts and 
+        transactions text files with updated values
 
-                # append to protected instance attribute transaction history
-                transaction = [str(i + 1), self.account_number, '-' + str(amount), str(today), 'withdrawal']
-                self._transaction_history.append(transaction)
+        Args:
+            -> amount (Money): amount to be subtracted from current instance funds attribute, plain numbers are converted to Money
+        """        
+        amount = Money.of(amount)
+
+        if amount > 0:
+            with self._lock:
+
+                # define transaction appropriatly and store it together with the updated funds
+                transaction = Transaction(None, self.account_number, -amount.cents, today.toordinal(), WITHDRAWAL)
+                self._post({self.account_number: self._funds - amount}, [transaction])
+
+                # update instance attribute funds and append to protected instance attribute transaction history
+                self._funds -= amount
+                self._record(transaction)
         else:
             print('\nError, Invalid Amount\n')
 
-    def transfer(self, amount: float, recipAccount) -> (None):
+    def transfer(self, amount: Money, recipAccount) -> (None):
         """
         method to transfer money from instance to another instance, updates text files; accounts and 
         accountTransactions with updated funds values
 
         Args:
-            -> amount (float): amount to be transferred from current instance bank account
+            -> amount (Money): amount to be transferred from current instance bank account, plain numbers are converted to Money
             -> recipAccount (BankAccount): BankAccount instance that receives transfer from current instance
         """        
+        amount = Money.of(amount)
 
-        # check for non-negative input 
-        if amount > 0:
-    
-            with open('data/accounts.txt', mode='r') as f:
-                new_accounts = []
-
-                '''
-                for loop to read and modify a specific account that matches the recipient object's bank account number.
-                if a match is found, the specific account gets modified to the updated funds value within the accounts.txt file
-                '''
-                for account in f.readlines():
-
-                    # check if recipient bank account number matches with current account in the loop 
-                    if recipAccount.account_number in account:
-
-                        # if account number matched -> funds gets replaced with added funds
-                        account = account.replace(str(recipAccount.get_funds()), str(recipAccount.get_funds() + amount), 1)
-                    
-                    # check if (self)instance account number m atches with current account in loop
-                    elif self.account_number in account:
-                        # if account number matched -> funds gets replaced with added funds
-                        account = account.replace(str(self._funds), str(self._funds + amount), 1)
-
-                    new_accounts.append(account)
-
-            # writing all accounts back to the accounts text file
-            with open('data/accounts.txt', mode='w') as f:
-                for account in new_accounts:
-                    f.write(account)           
-           
-            # update current instance funds and use recipient instance's set funds class method to update(set) its protected funds attribute 
-            self._funds -= amount
-            recipAccount.set_funds(recipAccount.get_funds() + amount)
-
-            # appending transfer transaction to text accountsTransactions.txt
-            with open('data/accountsTransactions.txt', mode='a+') as g:
+        # both sides of a transfer to the same account would be stored as one balance
+        if recipAccount.account_number == self.account_number:
+            print('\nError, Cannot transfer to the same account\n')
 
-                # using the protected _file_index method to get the appropriate index of last transaction made in the text file
-                i = self._file_index('data/accountsTransactions.txt')
-                
-                # define transaction string format appropriatly for writing and write transaction
-                transaction = f'{i + 1}, {self.account_number}, -{amount}, {today}, transfer to {recipAccount.account_number}\n{i + 2}, {recipAccount.account_number}, +{amount}, {today}, transfer from {self.account_number}\n'
-                g.writelines(transaction)
+        # check for non-negative input 
+        elif amount > 0:
+            with lock_accounts((self, recipAccount)):
+
+                # define both sides of the transfer and store them together with the updated funds of both accounts
+                transaction_to = Transaction(None, self.account_number, -amount.cents, today.toordinal(), TRANSFER_TO, recipAccount.account_number)
+                transaction_from = Transaction(None, recipAccount.account_number, amount.cents, today.toordinal(), TRANSFER_FROM, self.account_number)
+                self._post({self.account_number: self._funds - amount, recipAccount.account_number: recipAccount.get_funds() + amount}, [transaction_to, transaction_from])
+               
+                # update current instance funds and use recipient instance's set funds class method to update(set) its protected funds attribute 
+                self._funds -= amount
+                recipAccount.set_funds(recipAccount.get_funds() + amount)
 
                 # append to both current Bank Account instance and Recipient Bank Account protected attribute transaction history 
-                transaction_to = [str(i + 1), self.account_number, '-' + str(amount), str(today), f'transfer to {recipAccount.account_number}']
-                self._transaction_history.append(transaction_to)
-                
-                transaction_from = [str(i + 2), self.account_number, '+' + str(amount), str(today), f'transfer from {self.account_number}']
-                recipAccount.get_transactions().append(transaction_from)
+                self._record(transaction_to)
+                recipAccount._record(transaction_from)
         else:
             print('\nError, Invalid Amount\n')
 
+    def check_withdrawal(self, amount: Money) -> (str):
+        """
+        method that checks if an amount may be withdrawn (or transferred) from the account without changing it. A plain
+        Bank Account has no withdrawal rules, subclasses add their own
+
+        Args:
+            -> amount (Money): amount to be withdrawn from current instance funds attribute
+
+        Returns:
+            -> str: the reason the withdrawal is not allowed, None if it is allowed
+        """
+        return None
+
     def __str__(self) -> (str):
         """
         convert instance to string -> displays non-sensitive account information
@@ -259,24 +351,46 @@ class SavingsAccount(BankAccount):
     
     Constructor Args:
         -> account_number (str): A Unique Bank Account Identifier
-        -> funds (float): The total funds allocated to the Bank Account. Defaults to 0.0   
+        -> funds (Money): The total funds allocated to the Bank Account. Defaults to 0.00   
         -> transaction_history (list): A list that contains all the transactions that involves the said Bank Account. Defaults to None
     """    
 
-    def __init__(self, account_number: float = None, funds: float = 0.0, transaction_history: list = None) -> (None):
+    # number of withdrawals/transfers allowed per calendar month
+    MONTHLY_LIMIT = 1
+
+    def __init__(self, account_number: float = None, funds: Money = Money(), transaction_history: list = None) -> (None):
         BankAccount.__init__(self, account_number, funds, transaction_history)
         """
         Constructor for class Savings Account
 
         Args:
             -> account_number (str): A Unique Bank Account Identifier
-            -> funds (float): The total funds allocated to the Bank Account. Defaults to 0.0   
+            -> funds (Money): The total funds allocated to the Bank Account. Defaults to 0.00   
             -> transaction_history (list): A list that contains all the transactions that involves the said Bank Account. Defaults to None
         """        
+        # withdrawals/transfers per (year, month), built once from the history and kept up to date on every posting
+        self.__monthly_debits = None
+
+        if transaction_history:
+            self.__count_monthly_debits()
+
+    def __count_monthly_debits(self) -> (None):
+        """
+        builds the per (year, month) count of withdrawals/transfers from the full transaction history -> withdrawals
+        (with or without a description) and outgoing transfers count, deposits and incoming transfers don't
+        """
+        monthly_debits = {}
+
+        for transaction in self.get_transactions():
+            if transaction.is_debit():
+                date = transaction.get_date()
+                monthly_debits[(date.year, date.month)] = monthly_debits.get((date.year, date.month), 0) + 1
+
+        self.__monthly_debits = monthly_debits
 
     def __num_withdrawal_transfers(self) -> (bool):
         """
-        method to find total amount of transactions performed using this instance. Used to satisfy system
+        method to check the amount of withdrawals/transfers performed using this instance in the current month. Used to satisfy system
         requirement to limit number of transactions a month to 1.
 
         ** Does not include deposit transactions
@@ -284,47 +398,80 @@ class SavingsAccount(BankAccount):
         Returns:
             -> bool: True or False -> transactions performed exceeds allowed limit
         """        
-        transfer_limt = False
+        if self.__monthly_debits is None:
+            self.__count_monthly_debits()
+
+        return self.__monthly_debits.get((today.year, today.month), 0) >= self.MONTHLY_LIMIT
+
+    def _record(self, transaction: Transaction) -> (None):
+        """
+        appends a newly posted transaction to the history and counts it if it is a withdrawal/transfer
+
+        Args:
+            -> transaction (Transaction): the posted transaction
+        """
+        BankAccount._record(self, transaction)
+
+        if self.__monthly_debits is not None and transaction.is_debit():
+            date = transaction.get_date()
+            self.__monthly_debits[(date.year, date.month)] = self.__monthly_debits.get((date.year, date.month), 0) + 1
+
+    def _truncate_transactions(self, count: int) -> (None):
+        """
+        drops transactions from the history, the monthly counts are rebuilt when they are needed next
 
-        # for loop used to check dates on transactions
-        for transaction in self._transaction_history:
+        Args:
+            -> count (int): number of transactions to keep
+        """
+        BankAccount._truncate_transactions(self, count)
+        self.__monthly_debits = None
 
-            # cast transaction date into datetime object
-            date_obj = datetime.datetime.strptime(transaction[3], '%Y-%m-%d')
+    def check_withdrawal(self, amount: Money) -> (str):
+        """
+        checks if there's sufficient funds for a withdrawl/transfer and if the monthly withdrawal/transfer limit is not reached yet
 
-            # check if current month matches transaction date and if transaction methods are withdrawl or transfer
-            if today.month == date_obj.month and (transaction[4] == 'withdrawal' or transaction[4] == 'transfer'):
-                transfer_limt = True
-                break
+        Args:
+            -> amount (Money): amount to be withdrawn from current instance account
 
-        return transfer_limt
+        Returns:
+            -> str: the reason the withdrawal is not allowed, None if it is allowed
+        """
+        if (self._funds - amount) <= 0:
+            return 'Insufficient funds'
+
+        if self.__num_withdrawal_transfers():
+            return 'Monthly withdrawal/transfer limit reached'
 
-    def withdraw(self, amount: float) -> (BankAccount.withdraw):
+        return None
+
+    def withdraw(self, amount: Money) -> (BankAccount.withdraw):
         """
         identical method to superclass method withdraw, just added max withdrawl/transfer limit requirement and non-negative validation 
         
         Args:
-            -> amount (float): amount to be withdrawn from current instance account
+            -> amount (Money): amount to be withdrawn from current instance account
         """        
-        # if statement to check if there's sufficient funds for a withdrawl and also check num monthly withdrawls
-        if(self._funds - amount) > 0 and not self.__num_withdrawal_transfers():
-            return BankAccount.withdraw(self, amount)
-        else:
-            print('\n\nMonthly withdrawal limit reached')
+        # if statement to check if there's sufficient funds for a withdrawl and also check num monthly withdrawls (the lock keeps check and withdrawal together)
+        with self._lock:
+            if self.check_withdrawal(amount) is None:
+                return BankAccount.withdraw(self, amount)
+            else:
+                print('\n\nMonthly withdrawal limit reached')
            
-    def transfer(self, amount: float, recipAccount : BankAccount) -> (None):
+    def transfer(self, amount: Money, recipAccount : BankAccount) -> (None):
         """
         identical method to superclass method withdraw, just added max withdrawl/transfer limit requirement and non-negative validation 
 
         Args:
-            -> amount (float): amount to be transfered from current instance account
+            -> amount (Money): amount to be transfered from current instance account
             -> recipAccount (BankAccount): recipient instance to receive funds
         """     
         # if statement to check if there's sufficient funds for a withdrawl and also check num monthly withdrawls
-        if(self._funds - amount) > 0 and not self.__num_withdrawal_transfers():
-            BankAccount.transfer(self, amount, recipAccount)
-        else:
-            print('\n\nMonthly transfer limit reached')  
+        with lock_accounts((self, recipAccount)):
+            if self.check_withdrawal(amount) is None:
+                BankAccount.transfer(self, amount, recipAccount)
+            else:
+                print('\n\nMonthly transfer limit reached')  
 
 class CheckAccount(BankAccount):
     """
@@ -333,65 +480,83 @@ class CheckAccount(BankAccount):
     
     Constructor Args:
             -> account_number (str): A Unique Bank Account Identifier
-            -> funds (float): The total funds allocated to the Bank Account. Defaults to 0.0   
+            -> funds (Money): The total funds allocated to the Bank Account. Defaults to 0.00   
             -> transaction_history (list): A list that contains all the transactions that involves the said Bank Account. Defaults to None
-            -> credit_limit (float): The maximum credit allowed by the account. Defaults to a credit of 50
+            -> credit_limit (Money): The maximum credit allowed by the account. Defaults to a credit of 50.00
     """    
 
-    def __init__(self, account_number:str = None, funds: float = 0.0, transaction_history: list = None, credit_limit: float = 50.0) -> (None):
+    def __init__(self, account_number:str = None, funds: Money = Money(), transaction_history: list = None, credit_limit: Money = Money(5000)) -> (None):
         BankAccount.__init__(self, account_number, funds, transaction_history)
         """
         Constructor for class Check Account
 
         Args:
             -> account_number (str): A Unique Bank Account Identifier
-            -> funds (float): The total funds allocated to the Bank Account. Defaults to 0.0   
+            -> funds (Money): The total funds allocated to the Bank Account. Defaults to 0.00   
             -> transaction_history (list): A list that contains all the transactions that involves the said Bank Account. Defaults to None
-            -> credit_limit (float): The maximum credit allowed by the account. Defaults to a credit of 50
+            -> credit_limit (Money): The maximum credit allowed by the account. Defaults to a credit of 50.00
         """    
+        credit_limit = Money.of(credit_limit)
+
         # if statement to convert credit limit to negative value
         if credit_limit > 0:
-            credit_limit = credit_limit * -1
-            self.__credit_limit = credit_limit
+            self.__credit_limit = -credit_limit
         else:
             self.__credit_limit = credit_limit
     
-    def withdraw(self, amount: float) -> (BankAccount.withdraw):
+    def withdraw(self, amount: Money) -> (BankAccount.withdraw):
         """
         identical method to superclass method withdraw, just added max withdrawl/transfer limit requirement and non-negative validation 
         
         Args:
-            -> amount (float): amount to be withdrawn from current instance account
+            -> amount (Money): amount to be withdrawn from current instance account
         """      
-        # if statement to check if withdrawl falls within the credit limit
-        if(self._funds - amount) > self.__credit_limit:
-            return BankAccount.withdraw(self, amount)
-        else:
-            print('\nTransaction exceeds Credit Limit\n')
-
-    def get_credit_limit(self) -> (float):
+        # if statement to check if withdrawl falls within the credit limit (the lock keeps check and withdrawal together)
+        with self._lock:
+            if self.check_withdrawal(amount) is None:
+                return BankAccount.withdraw(self, amount)
+            else:
+                print('\nTransaction exceeds Credit Limit\n')
+
+    def get_credit_limit(self) -> (Money):
         """
         get method to return private instance credit limit
 
         Returns:
-            -> float: max credit allowed for instance
+            -> Money: max credit allowed for instance
         """        
         return self.__credit_limit
 
-    def transfer(self, amount: float, recipAccount : BankAccount) -> (None):
+    def check_withdrawal(self, amount: Money) -> (str):
+        """
+        checks if a withdrawal/transfer falls within the instance credit limit
+
+        Args:
+            -> amount (Money): amount to be withdrawn from current instance account
+
+        Returns:
+            -> str: the reason the withdrawal is not allowed, None if it is allowed
+        """
+        if (self._funds - amount) <= self.__credit_limit:
+            return 'Transaction exceeds Credit Limit'
+
+        return None
+
+    def transfer(self, amount: Money, recipAccount : BankAccount) -> (None):
         """
         identical method to superclass(BankAccount) method withdraw, added credit check
 
         Args:
-            -> amount (float): amount to be transfered from current instance account
+            -> amount (Money): amount to be transfered from current instance account
             -> recipAccount (BankAccount): recipient instance to receive funds
         """     
 
         # if statement to check if transfer falls within instance credit limit
-        if(self._funds - amount) > self.__credit_limit:
-            BankAccount.transfer(self, amount, recipAccount)
-        else:
-            print('\nTransaction Exceeds Credit Limit\n')
+        with lock_accounts((self, recipAccount)):
+            if self.check_withdrawal(amount) is None:
+                BankAccount.transfer(self, amount, recipAccount)
+            else:
+                print('\nTransaction Exceeds Credit Limit\n')
 
 
 class Customer(object):
@@ -467,66 +632,22 @@ class Customer(object):
 
         # if statement to check if account is an instance of subclass SavingsAccount and customer has an age of 14 or older
         if isinstance(account, SavingsAccount) and self.age >= 14:
-            
-            # read all customer data from customers.txt
-            with open('data/customers.txt', 'r') as g:
-                new_customers = []
-
-                # for loop to get specific customer in customers.txt file that matches current instance customer id
-                for customer in g.readlines():
-                    
-                    # if statement to check if customer at specific line in text, matches instance customer id
-                    if ((customer.strip('\n')).split(', '))[0] == str(self.__customer_id): # TEST
-
-                        # modify string format of current instance
-                        customer = customer.strip('\n') + f', {account.account_number}\n'
-                        
-                    new_customers.append(customer)
-            
-            # write updated instance and customers back into customers.txt
-            with open('data/customers.txt', 'w') as g:
-                for customer in new_customers:
-                    g.write(customer)
+
+            # store new account and link it to the instance through the storage backend
+            BankAccount.storage.add_account(self.__customer_id, (account.account_number, 'SavingsAccount', account.get_funds(), None))
 
             # append new account to protected class list attribute, accounts
             self.__accounts.append(account)
 
-            # append new account to accounts.txt in appropriate string format
-            with open('data/accounts.txt', 'a+') as f:
-                account_info = f'{account.account_number}, SavingsAccount, {account.get_funds()}\n'
-                f.write(account_info)
-
         # if statement to check if account is an instance of subclass CheckAccount and customer has an age of 18 or older
         elif isinstance(account, CheckAccount):
 
-            # read all customer data from customers.txt
-            with open('data/customers.txt', 'r') as f:
-                new_customers = []
-
-                # for loop to get specific customer in customers.txt file that matches current instance customer id
-                for customer in f.readlines():
-                    #customer_data = (customer.strip('\n')).split(', ')
-                    # if statement to check if formatted customer at specific line in text matches instance customer id
-                    if ((customer.strip('\n')).split(', '))[0] == str(self.__customer_id):
-
-                        # modify string format of current instance
-                        customer = customer.strip('\n') + f', {account.account_number}\n'
-                        
-                    new_customers.append(customer)
-            
-            # write updated instance and customers back into customers.txt
-            with open('data/customers.txt', 'w') as f:
-                for customer in new_customers:
-                    f.write(customer)
+            # store new account (with its credit limit) and link it to the instance through the storage backend
+            BankAccount.storage.add_account(self.__customer_id, (account.account_number, 'CheckAccount', account.get_funds(), account.get_credit_limit()))
 
             # append new account to protected class list attribute, accounts
             self.__accounts.append(account)
 
-            # append new account to accounts.txt in appropriate string format
-            with open('data/accounts.txt', 'a+') as g:
-                account_info = f'{account.account_number}, CheckAccount, {account.get_funds()}, {account.get_credit_limit()}\n'
-                g.write(account_info)
-
         else: 
 
             print(f"{account} is not an instance of BankAccount")
@@ -538,46 +659,12 @@ class Customer(object):
         Args:
             account (BankAccount): account object associated with instance to be remove from protected class attribute accounts
         """        
-        # read all account data from accounts.txt
-        with open('data/accounts.txt', mode='r') as f:
-            new_accounts = []
+        # remove the account and its link to the instance through the storage backend
+        BankAccount.storage.delete_account(account.account_number)
 
-            # for loop to find account to be deleted in accounts.txt
-            for acc in f.readlines():
-
-                # if statement to skip over (prevent) account from being appended to new_accounts array
-                if account.account_number in acc:
-                    continue
-
-                new_accounts.append(acc)
-
-        # read all customer data from customers.txt
-        with open('data/customers.txt', mode='r') as g:      
-            new_customers = []
-
-            # for loop to find current instance's data in customers.txt
-            for cust in g.readlines():
-
-                # if statement to modify instance's data
-                if account.account_number in cust:
-                    pre_cust = ((cust.strip('\n')).split(', '))
-                    pre_cust.remove(account.account_number)
-                    cust = (', '.join(pre_cust)) + '\n'
-                    
-                new_customers.append(cust)
-        
         # removes account from protected list class attributes
         self.__accounts.remove(account)
 
-        # write back all account and customer updated data
-        with open('data/accounts.txt', mode='w') as f:
-            for acc in new_accounts:
-                f.write(acc)
-
-        with open('data/customers.txt', mode='w') as g:
-            for cust in new_customers:
-                g.write(cust)
-
     def __str__(self) -> (str):
         """
         convert instance to string -> displays non-sensitive customer information
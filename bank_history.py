@@ -0,0 +1,163 @@
+import mmap
+import os
+import struct
+from array import array
+
+from bank_transaction import Transaction
+
+# header of the offset index sidecar -> magic, size of the indexed part of the ledger, number of accounts
+INDEX_MAGIC = b'BTIX'
+INDEX_HEADER = struct.Struct('<4sQI')
+ACCOUNT_HEADER = struct.Struct('<BI')
+
+
+def read_transactions(transactions_txt: str, offsets: array) -> (list[Transaction]):
+    """
+    reads the transactions starting at the given byte offsets from accountsTransactions.txt. The file is memory mapped,
+    so only the pages holding the requested lines are read
+
+    Args:
+        -> transactions_txt (str): text file containing All Transactions in Banking System
+        -> offsets (array): byte offsets of the first character of each transaction line
+
+    Returns:
+        -> list[Transaction]: the transactions in the order of the offsets
+    """
+    transactions = []
+
+    # an empty file can't be memory mapped (and has no transactions to read)
+    if not len(offsets):
+        return transactions
+
+    with open(transactions_txt, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as m:
+        for offset in offsets:
+            end = m.find(b'\n', offset)
+
+            # the last line of the file might not end with a newline
+            if end == -1:
+                end = len(m)
+
+            transactions.append(Transaction.from_fields(m[offset:end].decode().split(', ')))
+
+    return transactions
+
+
+class TransactionIndex(object):
+    """
+    A class to represent a byte offset index over accountsTransactions.txt. For every account number it stores the
+    byte offsets of that account's transaction lines, so the transaction history of an account can be read on demand.
+
+    The index is persisted in a small binary sidecar file together with the size of the part of the ledger it covers.
+    On load only the lines appended to the ledger since the index was saved have to be scanned.
+
+    Constructor Args:
+        -> transactions_txt (str): text file containing All Transactions in Banking System. Defaults to 'data/accountsTransactions.txt'
+        -> index_file (str): binary sidecar file the index is persisted to. Defaults to transactions_txt + '.idx'
+    """
+
+    def __init__(self, transactions_txt: str = 'data/accountsTransactions.txt', index_file: str = None) -> (None):
+        """
+        constructor method for class Transaction Index
+
+        Args:
+            -> transactions_txt (str): text file containing All Transactions in Banking System. Defaults to 'data/accountsTransactions.txt'
+            -> index_file (str): binary sidecar file the index is persisted to. Defaults to transactions_txt + '.idx'
+        """
+        self.transactions_txt = transactions_txt
+        self.index_file = index_file if index_file is not None else transactions_txt + '.idx'
+        self.offsets = {}
+        self.indexed_size = 0
+
+    def __len__(self) -> (int):
+        """
+        returns the total number of indexed transactions
+        """
+        return sum(len(offsets) for offsets in self.offsets.values())
+
+    def load(self) -> (dict[str, array]):
+        """
+        loads the persisted index, scans the lines appended to the ledger after it was saved and persists the
+        updated index again
+
+        Returns:
+            -> dict[str, array]: account number mapped to the byte offsets of its transactions
+        """
+        self._read_index()
+
+        ledger_size = os.path.getsize(self.transactions_txt) if os.path.exists(self.transactions_txt) else 0
+
+        # a ledger that shrank was rewritten -> the persisted offsets can't be trusted anymore
+        if ledger_size < self.indexed_size:
+            self.offsets = {}
+            self.indexed_size = 0
+
+        if ledger_size > self.indexed_size:
+            self._scan()
+            self.save()
+
+        return self.offsets
+
+    def _read_index(self) -> (None):
+        """
+        reads the persisted index from the sidecar file, a missing or damaged sidecar leaves the index empty
+        """
+        try:
+            with open(self.index_file, 'rb') as f:
+                magic, indexed_size, num_accounts = INDEX_HEADER.unpack(f.read(INDEX_HEADER.size))
+
+                if magic != INDEX_MAGIC:
+                    return
+
+                offsets = {}
+                for i in range(num_accounts):
+                    length, count = ACCOUNT_HEADER.unpack(f.read(ACCOUNT_HEADER.size))
+                    account_number = f.read(length).decode()
+
+                    offsets[account_number] = array('q')
+                    offsets[account_number].fromfile(f, count)
+
+        except (IOError, EOFError, struct.error, UnicodeDecodeError):
+            return
+
+        self.offsets = offsets
+        self.indexed_size = indexed_size
+
+    def _scan(self) -> (None):
+        """
+        scans the ledger from the end of the indexed part, recording the offset of each complete transaction line
+        """
+        with open(self.transactions_txt, 'rb') as f:
+            f.seek(self.indexed_size)
+            offset = self.indexed_size
+
+            for line in f:
+                # a partially written last line is left for the next scan
+                if not line.endswith(b'\n'):
+                    break
+
+                if line.strip():
+                    # the account number is the second column of a transaction
+                    account_number = line.split(b', ', 2)[1].decode()
+
+                    if account_number not in self.offsets:
+                        self.offsets[account_number] = array('q')
+                    self.offsets[account_number].append(offset)
+
+                offset += len(line)
+
+        self.indexed_size = offset
+
+    def save(self) -> (None):
+        """
+        persists the index to its sidecar file
+        """
+        with open(self.index_file + '.tmp', 'wb') as f:
+            f.write(INDEX_HEADER.pack(INDEX_MAGIC, self.indexed_size, len(self.offsets)))
+
+            for account_number, offsets in self.offsets.items():
+                account_number = account_number.encode()
+                f.write(ACCOUNT_HEADER.pack(len(account_number), len(offsets)))
+                f.write(account_number)
+                offsets.tofile(f)
+
+        os.replace(self.index_file + '.tmp', self.index_file)
@@ -0,0 +1,131 @@
+import csv
+import sys
+import time
+from itertools import islice
+
+from bank_external import BankAccount
+from bank_ledger import Ledger
+from bank_money import Money
+
+
+def read_payments(csv_file: str):
+    """
+    streams the rows of a payment file -> (account number, signed amount, description) per row
+
+    Args:
+        -> csv_file (str): payment file in csv format
+
+    Returns:
+        -> generator: (line number, row) for every non-empty row of the file
+    """
+    with open(csv_file, 'r', newline='') as f:
+        for line_number, row in enumerate(csv.reader(f), 1):
+            if row:
+                yield line_number, row
+
+
+def to_operations(rows, accounts: dict[str, BankAccount]):
+    """
+    turns payment rows into ledger operations -> credits become deposits and debits become withdrawals. Rows that can't
+    be posted at all (malformed rows, unknown accounts, zero amounts) are passed on with the reason instead
+
+    Args:
+        -> rows (generator): (line number, row) as produced by read_payments()
+        -> accounts (dict[str, BankAccount]): all Account instances in Bank System keyed by account number
+
+    Returns:
+        -> generator: (line number, operation, reason) -> operation is None if the row was rejected
+    """
+    for line_number, row in rows:
+        if len(row) not in (2, 3):
+            yield line_number, None, 'Malformed row'
+            continue
+
+        account_number = row[0].strip()
+
+        try:
+            amount = Money.parse(row[1])
+        except ValueError:
+            yield line_number, None, f'Invalid amount {row[1].strip()}'
+            continue
+
+        if account_number not in accounts:
+            yield line_number, None, f'Unknown account {account_number}'
+
+        elif amount == 0:
+            yield line_number, None, 'Invalid Amount'
+
+        else:
+            # ', ' separates the columns of the text files, so commas can't be part of a description
+            description = ' '.join(row[2].replace(',', ' ').split()) if len(row) == 3 else ''
+
+            yield line_number, ('deposit' if amount > 0 else 'withdraw', account_number, abs(amount), description), None
+
+
+def chunked(iterable, size: int):
+    """
+    groups an iterable into lists of at most size items
+
+    Args:
+        -> iterable (iterable): items to group
+        -> size (int): maximum number of items per chunk
+
+    Returns:
+        -> generator: lists of items
+    """
+    iterator = iter(iterable)
+
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+
+        yield chunk
+
+
+def import_payments(csv_file: str, accounts: dict[str, BankAccount], chunk_size: int = 10000, rejects_file: str = None, storage=None, out=sys.stdout) -> (tuple[int, int]):
+    """
+    imports a payment file without user interaction. Rows are streamed through the generator pipeline
+    read_payments() -> to_operations() -> chunked() and every chunk is posted as one ledger batch, so at most
+    chunk_size rows are held in memory however large the file is
+
+    Args:
+        -> csv_file (str): payment file with rows of account number, signed amount, description
+        -> accounts (dict[str, BankAccount]): all Account instances in Bank System keyed by account number
+        -> chunk_size (int): number of rows posted per batch. Defaults to 10000
+        -> rejects_file (str): csv file the rejected rows are written to (line number, reason). Defaults to None
+        -> storage (Storage): storage backend the payments are posted to. Defaults to the storage backend of BankAccount
+        -> out (file): where progress is printed. Defaults to sys.stdout
+
+    Returns:
+        -> tuple[int, int]: number of posted and rejected rows
+    """
+    ledger = Ledger(accounts, storage)
+    posted = rejected = 0
+    start = time.perf_counter()
+
+    rejects = open(rejects_file, 'w', newline='') if rejects_file is not None else None
+
+    try:
+        for chunk in chunked(to_operations(read_payments(csv_file), accounts), chunk_size):
+            failed = [(line_number, reason) for line_number, operation, reason in chunk if operation is None]
+            valid = [(line_number, operation) for line_number, operation, reason in chunk if operation is not None]
+
+            # post the chunk as one batch, the ledger reports positions within the batch
+            refused = ledger.post([operation for line_number, operation in valid])
+            failed += [(valid[position][0], reason) for position, reason in refused]
+
+            posted += len(valid) - len(refused)
+            rejected += len(failed)
+
+            if rejects is not None:
+                csv.writer(rejects).writerows(sorted(failed))
+
+            elapsed = time.perf_counter() - start
+            print(f'{posted + rejected} rows processed ({posted} posted, {rejected} rejected) - {(posted + rejected) / max(elapsed, 1e-9):,.0f} rows/s', file=out)
+
+    finally:
+        if rejects is not None:
+            rejects.close()
+
+    return posted, rejected
@@ -0,0 +1,307 @@
+import os
+import time
+
+from bank_money import Money, parse_cents
+
+# width of the balance column of accounts.txt -> balances are right aligned so they can be overwritten in place
+BALANCE_WIDTH = 12
+
+
+def fsync_file(path: str) -> (None):
+    """
+    flushes a file written through another file object to disk
+
+    Args:
+        -> path (str): path of the file
+    """
+    fd = os.open(path, os.O_RDONLY)
+
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def read_journal(journal_txt: str = 'data/accountsJournal.txt') -> (dict[str, str]):
+    """
+    reads a balance journal and returns the latest journaled balance of every account found within it
+
+    Args:
+        -> journal_txt (str): text file containing journaled balance records. Defaults to 'data/accountsJournal.txt'
+
+    Returns:
+        -> dict[str, str]: account number mapped to the most recent balance (as written in the journal)
+    """
+    balances = {}
+
+    # a missing journal simply means that there is nothing to replay
+    if not os.path.exists(journal_txt):
+        return balances
+
+    with open(journal_txt, 'r') as f:
+        for record in f:
+            # a record is complete once its newline was written, a final line without one was torn by a crash
+            if not record.endswith('\n'):
+                break
+
+            record = record[:-1].split(', ')
+
+            # skip blank or malformed records, the last complete record for an account wins
+            if len(record) != 2:
+                continue
+
+            try:
+                parse_cents(record[1])
+            except ValueError:
+                continue
+
+            balances[record[0]] = record[1]
+
+    return balances
+
+
+def format_balance(balance) -> (str):
+    """
+    formats a balance as the fixed width balance column of accounts.txt, e.g '     4650.00'
+
+    Args:
+        -> balance (Money | str | float): balance to format
+
+    Returns:
+        -> str: balance with two decimals, right aligned to BALANCE_WIDTH characters
+    """
+    return str(Money.of(balance)).rjust(BALANCE_WIDTH)
+
+
+def balance_positions(accounts_txt: str = 'data/accounts.txt') -> (dict[str, tuple[int, int]]):
+    """
+    finds the position of the balance column of every account within accounts.txt
+
+    Args:
+        -> accounts_txt (str): text file containing All Bank Account data. Defaults to 'data/accounts.txt'
+
+    Returns:
+        -> dict[str, tuple[int, int]]: account number mapped to the byte offset and width of its balance column
+    """
+    positions = {}
+    offset = 0
+
+    with open(accounts_txt, 'rb') as f:
+        for account in f:
+            account_data = account.rstrip(b'\n').split(b', ', 3)
+
+            # the balance is always the third column, it starts after the account number, the type and two separators
+            if len(account_data) >= 3:
+                positions[account_data[0].decode()] = (offset + len(account_data[0]) + len(account_data[1]) + 4, len(account_data[2]))
+
+            offset += len(account)
+
+    return positions
+
+
+def rewrite_balances(balances: dict, accounts_txt: str = 'data/accounts.txt', sync: bool = False) -> (None):
+    """
+    rewrites the balance column of the given accounts within accounts.txt, all balance columns are padded to the
+    fixed width on the way. Accounts are matched on the account number column, the file is written to a temporary
+    file first and then swapped in so a crash never leaves a half written file
+
+    Args:
+        -> balances (dict[str, Money]): account number mapped to the new balance to be stored
+        -> accounts_txt (str): text file containing All Bank Account data. Defaults to 'data/accounts.txt'
+        -> sync (bool): flush the new file and the swap to disk before returning. Defaults to False
+    """
+    new_accounts = []
+
+    with open(accounts_txt, 'r') as f:
+        for account in f:
+            account_data = account.strip('\n').split(', ')
+
+            # untouched balances that are padded already are kept as they are
+            if len(account_data) >= 3 and (account_data[0] in balances or len(account_data[2]) != BALANCE_WIDTH):
+                account_data[2] = format_balance(balances[account_data[0]] if account_data[0] in balances else account_data[2])
+                account = ', '.join(account_data) + '\n'
+
+            new_accounts.append(account)
+
+    with open(accounts_txt + '.tmp', 'w') as f:
+        f.writelines(new_accounts)
+
+        if sync:
+            f.flush()
+            os.fsync(f.fileno())
+
+    os.replace(accounts_txt + '.tmp', accounts_txt)
+
+    # the swap itself is only durable once the directory entry was flushed
+    if sync:
+        fsync_file(os.path.dirname(accounts_txt) or '.')
+
+
+class BalanceWriter(object):
+    """
+    A class to write balances into accounts.txt by record position. The byte offset of every account's balance column
+    is looked up once, a new balance then overwrites the old one in place instead of the whole file being rewritten.
+    Balance columns are right aligned to a fixed width, so a new balance normally fits the space of the old one.
+
+    ** The positions are found again whenever accounts.txt was changed by anything other than this writer
+    ** Bulk updates touching a large share of the accounts rewrite the file sequentially instead
+
+    Constructor Args:
+        -> accounts_txt (str): text file containing All Bank Account data. Defaults to 'data/accounts.txt'
+    """
+    # above this fraction (and number) of updated accounts one sequential rewrite is cheaper than seeking to every balance
+    REWRITE_FRACTION = 0.25
+    REWRITE_MIN = 1024
+
+    def __init__(self, accounts_txt: str = 'data/accounts.txt') -> (None):
+        """
+        constructor method for class Balance Writer
+
+        Args:
+            -> accounts_txt (str): text file containing All Bank Account data. Defaults to 'data/accounts.txt'
+        """
+        self.accounts_txt = accounts_txt
+        self.positions = None
+        self._stat = None
+
+    def _current_positions(self) -> (dict[str, tuple[int, int]]):
+        """
+        returns the balance positions, looking them up again if accounts.txt changed since they were found
+        """
+        stat = os.stat(self.accounts_txt)
+
+        if self.positions is None or self._stat != (stat.st_size, stat.st_mtime_ns):
+            self.positions = balance_positions(self.accounts_txt)
+            self._stat = (stat.st_size, stat.st_mtime_ns)
+
+        return self.positions
+
+    def write(self, balances: dict, sync: bool = False) -> (None):
+        """
+        writes new balances over the old ones in place, accounts.txt is only rewritten as a whole if a balance does
+        not fit its column (or an account is missing from the file)
+
+        Args:
+            -> balances (dict[str, Money]): account number mapped to the new balance to be stored
+            -> sync (bool): flush accounts.txt to disk before returning. Defaults to False
+        """
+        # a bulk update is rewritten right away, looking up the positions first would cost another pass over the file
+        if len(balances) > self.REWRITE_MIN and (self.positions is None or len(balances) > self.REWRITE_FRACTION * len(self.positions)):
+            rewrite_balances(balances, self.accounts_txt, sync)
+            self.positions = None
+            return
+
+        positions = self._current_positions()
+        writes = []
+
+        for account_number, balance in balances.items():
+            position = positions.get(account_number)
+            balance = str(Money.of(balance))
+
+            if position is None or len(balance) > position[1]:
+                rewrite_balances(balances, self.accounts_txt, sync)
+                self.positions = None
+                return
+
+            writes.append((position[0], balance.rjust(position[1]).encode()))
+
+        with open(self.accounts_txt, 'r+b') as f:
+            for offset, balance in writes:
+                f.seek(offset)
+                f.write(balance)
+
+            if sync:
+                f.flush()
+                os.fsync(f.fileno())
+
+        # the file still has the same layout, so the positions stay valid
+        stat = os.stat(self.accounts_txt)
+        self._stat = (stat.st_size, stat.st_mtime_ns)
+
+
+class BalanceJournal(object):
+    """
+    A class to represent an append-only journal of Bank Account balance changes. Instead of rewriting the whole of
+    accounts.txt for every deposit, withdrawal or transfer, the new balances are appended to the journal as small
+    records. Once the journal grows beyond a number of records or a time threshold passes, it is compacted, i.e the
+    balances are folded back into accounts.txt and the journal is emptied.
+
+    ** Journal records store the absolute balance of an account (not the difference), replaying them twice is harmless
+
+    Constructor Args:
+        -> journal_txt (str): text file the balance records are appended to. Defaults to 'data/accountsJournal.txt'
+        -> accounts_txt (str): text file containing All Bank Account data. Defaults to 'data/accounts.txt'
+        -> max_records (int): number of journal records that triggers a compaction. Defaults to 10000
+        -> max_age (float): seconds since the last compaction that triggers a compaction. Defaults to 300.0
+    """
+
+    def __init__(self, journal_txt: str = 'data/accountsJournal.txt', accounts_txt: str = 'data/accounts.txt', max_records: int = 10000, max_age: float = 300.0) -> (None):
+        """
+        constructor method for class Balance Journal
+
+        Args:
+            -> journal_txt (str): text file the balance records are appended to. Defaults to 'data/accountsJournal.txt'
+            -> accounts_txt (str): text file containing All Bank Account data. Defaults to 'data/accounts.txt'
+            -> max_records (int): number of journal records that triggers a compaction. Defaults to 10000
+            -> max_age (float): seconds since the last compaction that triggers a compaction. Defaults to 300.0
+        """
+        self.journal_txt = journal_txt
+        self.accounts_txt = accounts_txt
+        self.max_records = max_records
+        self.max_age = max_age
+        self.last_compaction = time.monotonic()
+        self.writer = BalanceWriter(accounts_txt)
+
+        # count the records left over from a previous run, up to max_records -> compaction_due() only needs to know
+        # whether the threshold is reached, so a long journal is not read in full
+        self.records = 0
+        if os.path.exists(journal_txt):
+            with open(journal_txt, 'r') as f:
+                for record in f:
+                    if self.records >= max_records:
+                        break
+
+                    self.records += record != '\n'
+
+    def record(self, balances: dict[str, Money]) -> (None):
+        """
+        appends the new balance of one or more accounts to the journal with a single write, compacts the journal
+        if a threshold has been reached
+
+        Args:
+            -> balances (dict[str, Money]): account number mapped to the updated balance of the account
+        """
+        with open(self.journal_txt, 'a') as f:
+            f.write(''.join(f'{account_number}, {Money.of(funds)}\n' for account_number, funds in balances.items()))
+
+        self.records += len(balances)
+
+        if self.compaction_due():
+            self.compact()
+
+    def compaction_due(self) -> (bool):
+        """
+        checks whether the journal has grown past its size threshold or if it has not been compacted within max_age seconds
+
+        Returns:
+            -> bool: True or False -> journal should be compacted
+        """
+        if self.records == 0:
+            return False
+
+        return self.records >= self.max_records or time.monotonic() - self.last_compaction >= self.max_age
+
+    def compact(self) -> (None):
+        """
+        folds all journaled balances back into accounts.txt and truncates the journal
+        """
+        balances = read_journal(self.journal_txt)
+
+        # accounts.txt is flushed to disk before the journal is emptied, a crash in between only replays the journal again
+        if balances:
+            self.writer.write(balances, sync=True)
+
+        open(self.journal_txt, 'w').close()
+
+        self.records = 0
+        self.last_compaction = time.monotonic()
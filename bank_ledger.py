@@ -0,0 +1,174 @@
+import bank_external
+from bank_external import BankAccount, lock_accounts
+from bank_money import Money
+from bank_transaction import DEPOSIT, TRANSFER_FROM, TRANSFER_TO, WITHDRAWAL, Transaction
+
+
+class Ledger(object):
+    """
+    A class to represent a batch posting ledger. A list of deposits, withdrawals and transfers is validated item by item
+    against the rules of each account type (Savings Account monthly limit, Check Account credit limit) and all accepted
+    items are then stored with a single storage post, i.e one write per file instead of one rewrite per item.
+
+    Operations are tuples:
+        -> ('deposit', account number, amount[, description])
+        -> ('withdraw', account number, amount[, description])
+        -> ('transfer', account number, amount, recipient account number)
+
+    ** A description is stored after the transaction type, e.g 'deposit - salary'
+
+    Constructor Args:
+        -> accounts (dict[str, BankAccount]): all Account instances in Bank System keyed by account number
+        -> storage (Storage): storage backend the batch is posted to. Defaults to the storage backend of BankAccount
+    """
+
+    def __init__(self, accounts: dict[str, BankAccount], storage=None) -> (None):
+        """
+        constructor method for class Ledger
+
+        Args:
+            -> accounts (dict[str, BankAccount]): all Account instances in Bank System keyed by account number
+            -> storage (Storage): storage backend the batch is posted to. Defaults to the storage backend of BankAccount
+        """
+        self.accounts = accounts
+        self.storage = storage
+
+    def post(self, operations: list[tuple]) -> (list[tuple[int, str]]):
+        """
+        validates and applies a batch of operations, then commits all balance changes and transactions at once. Each
+        item is checked against the balances left by the items before it, so a batch behaves like posting the items
+        one after the other
+
+        Args:
+            -> operations (list[tuple]): deposits, withdrawals and transfers to be posted
+
+        Returns:
+            -> list[tuple[int, str]]: (position in operations, reason) for every rejected item
+        """
+        storage = self.storage if self.storage is not None else BankAccount.storage
+
+        # every account the batch refers to stays locked until the batch is stored (or undone)
+        with lock_accounts(self.accounts[account_number] for account_number in self._account_numbers(operations) if account_number in self.accounts):
+            return self._apply(operations, storage)
+
+    @staticmethod
+    def _account_numbers(operations: list[tuple]):
+        """
+        returns a generator over the account numbers the operations refer to
+        """
+        for operation in operations:
+            if len(operation) > 1:
+                yield operation[1]
+
+            if len(operation) == 4 and operation[0] == 'transfer':
+                yield operation[3]
+
+    def _apply(self, operations: list[tuple], storage) -> (list[tuple[int, str]]):
+        """
+        validates the operations, applies the accepted ones in memory and stores them with one storage post
+
+        Args:
+            -> operations (list[tuple]): deposits, withdrawals and transfers to be posted
+            -> storage (Storage): storage backend the batch is posted to
+
+        Returns:
+            -> list[tuple[int, str]]: (position in operations, reason) for every rejected item
+        """
+        rejected = []
+        pending = []
+
+        # remember the state of every touched account, so a failed commit can be undone
+        saved = {}
+
+        for position, operation in enumerate(operations):
+            reason = self._check(operation)
+
+            if reason is not None:
+                rejected.append((position, reason))
+                continue
+
+            kind, account_number, amount = operation[0], operation[1], Money.of(operation[2])
+            account = self.accounts[account_number]
+            legs = []
+
+            # optional description of a deposit or withdrawal
+            detail = operation[3] if kind != 'transfer' and len(operation) == 4 and operation[3] else ''
+
+            if kind == 'deposit':
+                legs.append((account, amount, DEPOSIT, detail))
+
+            elif kind == 'withdraw':
+                legs.append((account, -amount, WITHDRAWAL, detail))
+
+            else:
+                recipAccount = self.accounts[operation[3]]
+                legs.append((account, -amount, TRANSFER_TO, recipAccount.account_number))
+                legs.append((recipAccount, amount, TRANSFER_FROM, account.account_number))
+
+            # apply the item in memory, transaction IDs are given by the storage backend when the batch is stored
+            for leg_account, change, transaction_type, detail in legs:
+                if leg_account.account_number not in saved:
+                    saved[leg_account.account_number] = (leg_account, leg_account.get_funds(), len(leg_account.get_transactions()))
+
+                transaction = Transaction(None, leg_account.account_number, change.cents, bank_external.today.toordinal(), transaction_type, detail)
+                leg_account.set_funds(leg_account.get_funds() + change)
+                leg_account._record(transaction)
+                pending.append(transaction)
+
+        if not pending:
+            return rejected
+
+        try:
+            storage.post({account_number: account.get_funds() for account_number, (account, funds, num_transactions) in saved.items()}, pending)
+
+        except Exception:
+            # undo the in-memory changes, the batch was not stored
+            for account, funds, num_transactions in saved.values():
+                account.set_funds(funds)
+                account._truncate_transactions(num_transactions)
+            raise
+
+        return rejected
+
+    def _check(self, operation: tuple) -> (str):
+        """
+        checks a single operation against the accounts involved and their account type rules
+
+        Args:
+            -> operation (tuple): deposit, withdrawal or transfer
+
+        Returns:
+            -> str: the reason the operation is rejected, None if it can be posted
+        """
+        if not operation or operation[0] not in ('deposit', 'withdraw', 'transfer'):
+            return 'Unknown operation'
+
+        if len(operation) not in ((4,) if operation[0] == 'transfer' else (3, 4)):
+            return 'Malformed operation'
+
+        if operation[1] not in self.accounts:
+            return f'Unknown account {operation[1]}'
+
+        if isinstance(operation[2], bool) or not isinstance(operation[2], (int, float, Money)):
+            return 'Invalid Amount'
+
+        # amounts are checked in cents -> fractions of a cent round to zero, out of range numbers don't convert at all
+        try:
+            amount = Money.of(operation[2])
+        except ValueError:
+            return 'Invalid Amount'
+
+        if amount.cents <= 0:
+            return 'Invalid Amount'
+
+        if operation[0] == 'deposit':
+            return None
+
+        if operation[0] == 'transfer':
+            if operation[3] not in self.accounts:
+                return f'Unknown account {operation[3]}'
+
+            if operation[3] == operation[1]:
+                return 'Cannot transfer to the same account'
+
+        return self.accounts[operation[1]].check_withdrawal(amount)
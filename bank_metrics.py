@@ -0,0 +1,342 @@
+import builtins
+import functools
+import importlib
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+
+# upper bounds of the latency histogram buckets in seconds (50 µs up to 10 s), an implicit +Inf bucket follows
+BUCKETS = (0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# operation that file I/O outside of any instrumented operation is counted under (e.g the writer thread of SerializedStorage)
+UNATTRIBUTED = 'other'
+
+# instrumented methods -> class name in bank_external mapped to its methods, subclasses that override a method are
+# instrumented too (a subclass calling the method of its superclass is counted once)
+METHODS = {
+    'BankAccount': ('deposit', 'withdraw', 'transfer'),
+    'SavingsAccount': ('withdraw', 'transfer'),
+    'CheckAccount': ('withdraw', 'transfer'),
+    'Customer': ('add_account', 'delete_cust_account'),
+}
+
+# instrumented functions of the main program and modules whose file I/O is counted
+LOADERS = ('get_accounts', 'get_customers', 'load_bank')
+IO_MODULES = ('bank_storage', 'bank_journal', 'bank_history', 'bank_sequence', 'bank_snapshot', 'bank_import')
+
+
+class Metrics(object):
+    """
+    A class to hold the metrics of the Bank System, per operation ->
+
+        -> calls and failed calls (raised an exception)
+        -> a latency histogram with the buckets of BUCKETS, and the sum of all latencies
+        -> files opened, bytes read and bytes written
+
+    ** Updates are made under a lock, the metrics may be updated from several threads at once
+    ** Byte counts of text files are counted in characters (the data files are ASCII, so characters are bytes)
+    """
+
+    def __init__(self) -> (None):
+        """
+        constructor method for class Metrics
+        """
+        self.calls = {}
+        self.failures = {}
+        self.seconds = {}
+        self.buckets = {}
+        self.opens = {}
+        self.bytes_read = {}
+        self.bytes_written = {}
+
+        self._lock = threading.Lock()
+
+    def observe(self, operation: str, seconds: float, failed: bool = False) -> (None):
+        """
+        records one call of an operation
+
+        Args:
+            -> operation (str): name of the operation
+            -> seconds (float): latency of the call
+            -> failed (bool): the call raised an exception. Defaults to False
+        """
+        with self._lock:
+            if operation not in self.calls:
+                self.calls[operation] = self.failures[operation] = 0
+                self.seconds[operation] = 0.0
+                self.buckets[operation] = [0] * (len(BUCKETS) + 1)
+
+            self.calls[operation] += 1
+            self.failures[operation] += failed
+            self.seconds[operation] += seconds
+            self.buckets[operation][bisect_left(BUCKETS, seconds)] += 1
+
+    def count_io(self, operation: str, opens: int = 0, read: int = 0, written: int = 0) -> (None):
+        """
+        records file I/O of an operation
+
+        Args:
+            -> operation (str): name of the operation
+            -> opens (int): number of files opened. Defaults to 0
+            -> read (int): number of bytes read. Defaults to 0
+            -> written (int): number of bytes written. Defaults to 0
+        """
+        with self._lock:
+            self.opens[operation] = self.opens.get(operation, 0) + opens
+            self.bytes_read[operation] = self.bytes_read.get(operation, 0) + read
+            self.bytes_written[operation] = self.bytes_written.get(operation, 0) + written
+
+    def to_json(self) -> (dict):
+        """
+        returns the metrics as a dict -> operation mapped to its calls, failures, total and mean seconds, histogram
+        (bucket upper bound mapped to the cumulative count) and file I/O
+        """
+        with self._lock:
+            operations = {}
+
+            for operation in sorted(set(self.calls) | set(self.opens)):
+                calls = self.calls.get(operation, 0)
+                counts = self.buckets.get(operation, [0] * (len(BUCKETS) + 1))
+                cumulative = [sum(counts[:i + 1]) for i in range(len(counts))]
+
+                operations[operation] = {
+                    'calls': calls,
+                    'failures': self.failures.get(operation, 0),
+                    'seconds': round(self.seconds.get(operation, 0.0), 6),
+                    'mean_seconds': round(self.seconds[operation] / calls, 9) if calls else None,
+                    'histogram': {**{str(bound): count for bound, count in zip(BUCKETS, cumulative)}, '+Inf': cumulative[-1]},
+                    'file_opens': self.opens.get(operation, 0),
+                    'bytes_read': self.bytes_read.get(operation, 0),
+                    'bytes_written': self.bytes_written.get(operation, 0),
+                }
+
+        return {'buckets': list(BUCKETS), 'operations': operations}
+
+    def to_prometheus(self) -> (str):
+        """
+        returns the metrics in the Prometheus text exposition format, e.g for the textfile collector of node_exporter
+        """
+        operations = self.to_json()['operations']
+        lines = ['# HELP bank_operation_duration_seconds Latency of Bank System operations', '# TYPE bank_operation_duration_seconds histogram']
+
+        for operation, values in operations.items():
+            if values['calls']:
+                lines.extend(f'bank_operation_duration_seconds_bucket{{operation="{operation}",le="{bound}"}} {count}' for bound, count in values['histogram'].items())
+                lines.append(f'bank_operation_duration_seconds_sum{{operation="{operation}"}} {values["seconds"]}')
+                lines.append(f'bank_operation_duration_seconds_count{{operation="{operation}"}} {values["calls"]}')
+
+        # plain counters -> (metric name, help text, key in the JSON dump)
+        for name, text, key in (('bank_operation_failures_total', 'Calls of Bank System operations that raised an exception', 'failures'), ('bank_file_opens_total', 'Files opened by Bank System operations', 'file_opens'), ('bank_file_read_bytes_total', 'Bytes read from files by Bank System operations', 'bytes_read'), ('bank_file_written_bytes_total', 'Bytes written to files by Bank System operations', 'bytes_written')):
+            lines.extend([f'# HELP {name} {text}', f'# TYPE {name} counter'])
+            lines.extend(f'{name}{{operation="{operation}"}} {values[key]}' for operation, values in operations.items())
+
+        return '\n'.join(lines) + '\n'
+
+    def write(self, path: str) -> (None):
+        """
+        writes the metrics to a file, replaced in one step so a collector never reads a partial file. A path ending in
+        .json gets the JSON dump, any other path the Prometheus text format
+
+        Args:
+            -> path (str): file the metrics are written to
+        """
+        with builtins.open(path + '.tmp', 'w') as f:
+            if path.endswith('.json'):
+                json.dump(self.to_json(), f, indent=2)
+            else:
+                f.write(self.to_prometheus())
+
+        os.replace(path + '.tmp', path)
+
+
+# active metrics, None while metrics are disabled
+metrics = None
+
+# per thread stack of the instrumented operations being run
+_local = threading.local()
+
+# (owner, attribute, original) of everything replaced by enable(), put back by disable()
+_patched = []
+
+
+def _current_operation() -> (str):
+    """
+    returns the innermost instrumented operation being run by this thread
+    """
+    stack = getattr(_local, 'stack', None)
+
+    return stack[-1] if stack else UNATTRIBUTED
+
+
+def _instrument(function, operation: str):
+    """
+    wraps a function so every call is timed and the file I/O made during the call is counted under operation
+    """
+    @functools.wraps(function)
+    def instrumented(*args, **kwargs):
+        stack = _local.__dict__.setdefault('stack', [])
+
+        # a subclass method calling the method of its superclass is one call
+        if stack and stack[-1] == operation:
+            return function(*args, **kwargs)
+
+        stack.append(operation)
+        start = time.perf_counter()
+        failed = True
+
+        try:
+            result = function(*args, **kwargs)
+            failed = False
+
+            return result
+        finally:
+            metrics.observe(operation, time.perf_counter() - start, failed)
+            stack.pop()
+
+    return instrumented
+
+
+class _CountingFile(object):
+    """
+    A class to wrap a file object and count the bytes read from and written to it, everything else is passed through
+    to the file. Reads of a memory map of the file (see bank_history.py) are not counted
+    """
+
+    def __init__(self, file) -> (None):
+        self._file = file
+
+    def __getattr__(self, name: str):
+        return getattr(self._file, name)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return self._file.__exit__(*exc_info)
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        line = next(self._file)
+        metrics.count_io(_current_operation(), read=len(line))
+
+        return line
+
+    def read(self, *args):
+        data = self._file.read(*args)
+        metrics.count_io(_current_operation(), read=len(data))
+
+        return data
+
+    def readline(self, *args):
+        line = self._file.readline(*args)
+        metrics.count_io(_current_operation(), read=len(line))
+
+        return line
+
+    def readlines(self, *args):
+        lines = self._file.readlines(*args)
+        metrics.count_io(_current_operation(), read=sum(map(len, lines)))
+
+        return lines
+
+    def readinto(self, buffer):
+        count = self._file.readinto(buffer)
+        metrics.count_io(_current_operation(), read=count or 0)
+
+        return count
+
+    def write(self, data):
+        count = self._file.write(data)
+        metrics.count_io(_current_operation(), written=len(data))
+
+        return count
+
+    def writelines(self, lines):
+        for line in lines:
+            self.write(line)
+
+
+def _counting_open(*args, **kwargs) -> (_CountingFile):
+    """
+    replacement of open() in the modules of IO_MODULES while metrics are enabled -> counts the open and the I/O of the file
+    """
+    file = builtins.open(*args, **kwargs)
+    metrics.count_io(_current_operation(), opens=1)
+
+    return _CountingFile(file)
+
+
+def _patch(owner, attribute: str, replacement) -> (None):
+    """
+    replaces an attribute of a class or module and remembers the original (None if the module had no own attribute)
+    """
+    _patched.append((owner, attribute, vars(owner).get(attribute)))
+    setattr(owner, attribute, replacement)
+
+
+def enable(main_module=None) -> (Metrics):
+    """
+    starts collecting metrics -> the methods of METHODS (and the loaders of the main program) are replaced by timed
+    wrappers and open() in the storage modules by a counting open(). While metrics are disabled nothing is wrapped, so
+    the Bank System runs its plain methods without any overhead
+
+    ** Call before the data is loaded to include the loaders. Calling enable() while metrics are enabled returns the
+       metrics being collected
+
+    Args:
+        -> main_module (module): module of the main program holding the loaders of LOADERS, e.g sys.modules['__main__'].
+           Defaults to None (the loaders are not instrumented)
+
+    Returns:
+        -> Metrics: the collected metrics
+    """
+    global metrics
+
+    if metrics is not None:
+        return metrics
+
+    import bank_external
+
+    metrics = Metrics()
+
+    for class_name, methods in METHODS.items():
+        owner = getattr(bank_external, class_name)
+
+        for method in methods:
+            _patch(owner, method, _instrument(owner.__dict__[method], method))
+
+    for module in [importlib.import_module(name) for name in IO_MODULES] + ([main_module] if main_module is not None else []):
+        _patch(module, 'open', _counting_open)
+
+    if main_module is not None:
+        for loader in LOADERS:
+            if hasattr(main_module, loader):
+                _patch(main_module, loader, _instrument(getattr(main_module, loader), loader))
+
+    return metrics
+
+
+def disable() -> (Metrics):
+    """
+    stops collecting metrics and puts the plain methods and open() back
+
+    Returns:
+        -> Metrics: the metrics collected while enabled, None if metrics were never enabled
+    """
+    global metrics
+
+    while _patched:
+        owner, attribute, original = _patched.pop()
+
+        if original is None:
+            delattr(owner, attribute)
+        else:
+            setattr(owner, attribute, original)
+
+    collected, metrics = metrics, None
+
+    return collected
@@ -0,0 +1,214 @@
+# largest amount in cents (100 billion euro) -> far above any real amount, while sums of many of them still fit the
+# 64 bit integers of the statement index and the snapshots
+MAX_CENTS = 10 ** 13
+
+
+def check_cents(cents: int) -> (int):
+    """
+    checks that an amount in cents is within +/- MAX_CENTS
+
+    Args:
+        -> cents (int): amount in cents
+
+    Returns:
+        -> int: the amount, unchanged
+    """
+    if abs(cents) > MAX_CENTS:
+        raise ValueError(f'amount out of range: {format_cents(cents)}')
+
+    return cents
+
+
+def to_cents(value: float) -> (int):
+    """
+    converts a number of euro to integer cents, rounded to the nearest cent
+
+    Args:
+        -> value (int | float): amount in euro
+
+    Returns:
+        -> int: amount in cents
+    """
+    # round() raises OverflowError for infinity, both it and NaN are reported like any other invalid amount
+    try:
+        return round(value * 100)
+    except OverflowError:
+        raise ValueError(f'invalid amount: {value!r}')
+
+
+def format_cents(cents: int, signed: bool = False) -> (str):
+    """
+    formats integer cents as a fixed format amount with two decimals, e.g 500050 -> '5000.50' (or '+5000.50' if signed)
+
+    Args:
+        -> cents (int): amount in cents
+        -> signed (bool): prefix positive amounts with '+'. Defaults to False
+
+    Returns:
+        -> str: amount with two decimals
+    """
+    sign = '-' if cents < 0 else ('+' if signed else '')
+    return f'{sign}{abs(cents) // 100}.{abs(cents) % 100:02d}'
+
+
+def parse_cents(amount: str) -> (int):
+    """
+    parses a fixed format decimal amount such as '+5000.5', '-20' or '4650.00' into integer cents without going
+    through float, amounts beyond MAX_CENTS raise ValueError
+
+    Args:
+        -> amount (str): amount as stored in the text files or entered by the user
+
+    Returns:
+        -> int: amount in cents
+    """
+    amount = amount.strip()
+    sign = -1 if amount.startswith('-') else 1
+    units, _, fraction = amount.lstrip('+-').partition('.')
+
+    if not (units or fraction):
+        raise ValueError(f'invalid amount: {amount!r}')
+
+    # amounts written from binary floats may carry more than two decimals, those are rounded to the nearest cent
+    if len(fraction) > 2:
+        return check_cents(sign * to_cents(float(amount.lstrip('+-'))))
+
+    return check_cents(sign * (int(units or '0') * 100 + int(fraction.ljust(2, '0'))))
+
+
+class Money(object):
+    """
+    A class to represent an amount of money as a whole number of cents. Balances, credit limits and transaction amounts
+    are kept as Money so adding and subtracting them is exact, e.g 0.1 + 0.2 is 0.30 and not 0.30000000000000004.
+
+    ** Plain numbers (int/float) in arithmetic and comparisons are taken as amounts in euro and rounded to the nearest cent
+
+    Constructor Args:
+        -> cents (int): amount in cents. Defaults to 0
+    """
+    __slots__ = ('cents',)
+
+    def __init__(self, cents: int = 0) -> (None):
+        """
+        constructor method for class Money
+
+        Args:
+            -> cents (int): amount in cents. Defaults to 0
+        """
+        self.cents = cents
+
+    @classmethod
+    def parse(cls, amount: str) -> ('Money'):
+        """
+        creates an amount from its fixed format text, e.g '4650.00' or '-500.5'
+
+        Args:
+            -> amount (str): amount as text
+
+        Returns:
+            -> Money: the parsed amount
+        """
+        return cls(parse_cents(amount))
+
+    @classmethod
+    def of(cls, value) -> ('Money'):
+        """
+        converts a value to an amount -> Money is returned as is, text is parsed and numbers are taken as euro. Text
+        and numbers beyond MAX_CENTS raise ValueError
+
+        Args:
+            -> value (Money | str | int | float): value to convert
+
+        Returns:
+            -> Money: the converted amount
+        """
+        if isinstance(value, Money):
+            return value
+
+        if isinstance(value, str):
+            return cls(parse_cents(value))
+
+        return cls(check_cents(to_cents(value)))
+
+    def format_signed(self) -> (str):
+        """
+        returns the amount with an explicit sign, e.g '+5000.50' -> format of amounts in accountsTransactions.txt
+        """
+        return format_cents(self.cents, signed=True)
+
+    @staticmethod
+    def _cents(other) -> (int):
+        """
+        returns the cents of the other operand of an arithmetic or comparison operation, None if it is not an amount
+        """
+        if isinstance(other, Money):
+            return other.cents
+
+        if isinstance(other, (int, float)):
+            return round(other * 100)
+
+        return None
+
+    def __add__(self, other) -> ('Money'):
+        cents = self._cents(other)
+        return NotImplemented if cents is None else Money(self.cents + cents)
+
+    __radd__ = __add__
+
+    def __sub__(self, other) -> ('Money'):
+        cents = self._cents(other)
+        return NotImplemented if cents is None else Money(self.cents - cents)
+
+    def __rsub__(self, other) -> ('Money'):
+        cents = self._cents(other)
+        return NotImplemented if cents is None else Money(cents - self.cents)
+
+    def __neg__(self) -> ('Money'):
+        return Money(-self.cents)
+
+    def __abs__(self) -> ('Money'):
+        return Money(abs(self.cents))
+
+    def __eq__(self, other) -> (bool):
+        cents = self._cents(other)
+        return NotImplemented if cents is None else self.cents == cents
+
+    def __lt__(self, other) -> (bool):
+        cents = self._cents(other)
+        return NotImplemented if cents is None else self.cents < cents
+
+    def __le__(self, other) -> (bool):
+        cents = self._cents(other)
+        return NotImplemented if cents is None else self.cents <= cents
+
+    def __gt__(self, other) -> (bool):
+        cents = self._cents(other)
+        return NotImplemented if cents is None else self.cents > cents
+
+    def __ge__(self, other) -> (bool):
+        cents = self._cents(other)
+        return NotImplemented if cents is None else self.cents >= cents
+
+    def __hash__(self) -> (int):
+        return hash(self.cents)
+
+    def __bool__(self) -> (bool):
+        return self.cents != 0
+
+    def __float__(self) -> (float):
+        return self.cents / 100
+
+    def __format__(self, spec: str) -> (str):
+        """
+        formats the amount as a float if a format spec is given, e.g f'{funds:,.2f}', otherwise as str()
+        """
+        return format(self.cents / 100, spec) if spec else str(self)
+
+    def __str__(self) -> (str):
+        """
+        convert instance to its fixed format text, e.g '4650.00'
+        """
+        return format_cents(self.cents)
+
+    def __repr__(self) -> (str):
+        return f"Money('{self}')"
@@ -0,0 +1,210 @@
+import os
+from array import array
+
+import bank_external
+from bank_external import BankAccount, SavingsAccount, lock_accounts
+from bank_money import Money
+from bank_transaction import DEPOSIT, WITHDRAWAL, Transaction
+
+# NumPy is optional -> without it the accruals are computed with a plain loop over the same arrays
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+def compute_accruals(is_savings, balances, limits, savings_rate: float, overdraft_rate: float, overdraft_fee: int):
+    """
+    computes the month-end accrual of every account in cents -> interest on positive Savings Account balances and
+    interest plus a flat fee on negative Check Account balances. An overdraft charge never takes a balance past the
+    credit limit of the account
+
+    Args:
+        -> is_savings (array): 1 for a Savings Account, 0 for a Check Account
+        -> balances (array): balance of every account in cents
+        -> limits (array): (negative) credit limit of every Check Account in cents, 0 for Savings Accounts
+        -> savings_rate (float): yearly interest rate paid on Savings Accounts, e.g 0.01 for 1%
+        -> overdraft_rate (float): yearly interest rate charged on overdrawn Check Accounts, e.g 0.12 for 12%
+        -> overdraft_fee (int): flat monthly fee charged on overdrawn Check Accounts in cents
+
+    Returns:
+        -> array: signed accrual of every account in cents, positive for interest paid and negative for charges
+    """
+    if np is not None:
+        is_savings = np.asarray(is_savings, dtype=bool)
+        balances = np.asarray(balances, dtype=np.int64)
+        limits = np.asarray(limits, dtype=np.int64)
+
+        interest = np.where(is_savings & (balances > 0), np.rint(balances * (savings_rate / 12)).astype(np.int64), 0)
+
+        # the charge is capped by the headroom left above the credit limit (and by zero for accounts already past it)
+        charge = np.rint(-balances * (overdraft_rate / 12)).astype(np.int64) + overdraft_fee
+        charge = np.clip(charge, 0, np.maximum(balances - limits, 0))
+        charge = np.where(~is_savings & (balances < 0), charge, 0)
+
+        return interest - charge
+
+    accruals = array('q', bytes(8 * len(balances)))
+
+    for i, (savings, balance, limit) in enumerate(zip(is_savings, balances, limits)):
+        if savings and balance > 0:
+            accruals[i] = round(balance * (savings_rate / 12))
+
+        elif not savings and balance < 0:
+            accruals[i] = -min(max(round(-balance * (overdraft_rate / 12)) + overdraft_fee, 0), max(balance - limit, 0))
+
+    return accruals
+
+
+class MonthEnd(object):
+    """
+    A class to represent the month-end run of the Bank System. The balances and credit limits of all accounts are loaded
+    into arrays once, the accruals of every account are computed in one vectorized pass (see compute_accruals()) and all
+    resulting transactions and balance updates are stored with a single storage post.
+
+    ** Savings Account interest is stored as a deposit - interest, Check Account charges as a withdrawal - overdraft interest
+    ** The last month booked is kept in a small text file, a second run for the same (or an earlier) month is refused
+
+    Constructor Args:
+        -> accounts (dict[str, BankAccount]): all Account instances in Bank System keyed by account number
+        -> storage (Storage): storage backend the run is posted to. Defaults to the storage backend of BankAccount
+        -> savings_rate (float): yearly interest rate paid on Savings Accounts. Defaults to 0.01
+        -> overdraft_rate (float): yearly interest rate charged on overdrawn Check Accounts. Defaults to 0.12
+        -> overdraft_fee (Money): flat monthly fee charged on overdrawn Check Accounts. Defaults to 0.00
+        -> period_txt (str): text file holding the last month booked, None to not keep track. Defaults to 'data/monthEnd.txt'
+    """
+
+    def __init__(self, accounts: dict[str, BankAccount], storage=None, savings_rate: float = 0.01, overdraft_rate: float = 0.12, overdraft_fee: Money = Money(), period_txt: str = 'data/monthEnd.txt') -> (None):
+        """
+        constructor method for class Month End
+
+        Args:
+            -> accounts (dict[str, BankAccount]): all Account instances in Bank System keyed by account number
+            -> storage (Storage): storage backend the run is posted to. Defaults to the storage backend of BankAccount
+            -> savings_rate (float): yearly interest rate paid on Savings Accounts. Defaults to 0.01
+            -> overdraft_rate (float): yearly interest rate charged on overdrawn Check Accounts. Defaults to 0.12
+            -> overdraft_fee (Money): flat monthly fee charged on overdrawn Check Accounts. Defaults to 0.00
+            -> period_txt (str): text file holding the last month booked, None to not keep track. Defaults to 'data/monthEnd.txt'
+        """
+        self.accounts = accounts
+        self.storage = storage
+        self.savings_rate = savings_rate
+        self.overdraft_rate = overdraft_rate
+        self.overdraft_fee = Money.of(overdraft_fee)
+        self.period_txt = period_txt
+
+    def last_period(self) -> (str):
+        """
+        get method to return the last month booked
+
+        Returns:
+            -> str: month as 'yyyy-mm', None if no month was booked yet (or no period file is kept)
+        """
+        if self.period_txt is None or not os.path.exists(self.period_txt):
+            return None
+
+        with open(self.period_txt, 'r') as f:
+            return f.read().strip() or None
+
+    def _store_period(self, period: str) -> (None):
+        """
+        stores the month just booked, written to a temporary file first and then swapped in
+        """
+        if self.period_txt is None:
+            return
+
+        with open(self.period_txt + '.tmp', 'w') as f:
+            f.write(f'{period}\n')
+
+        os.replace(self.period_txt + '.tmp', self.period_txt)
+
+    def load(self) -> (tuple):
+        """
+        loads the account type, balance and credit limit of every account into arrays
+
+        Returns:
+            -> tuple: (account instances, is_savings, balances, limits) in the same order
+        """
+        accounts = list(self.accounts.values())
+        is_savings = array('b', [isinstance(account, SavingsAccount) for account in accounts])
+        balances = array('q', [account.get_funds().cents for account in accounts])
+        limits = array('q', [0 if savings else account.get_credit_limit().cents for account, savings in zip(accounts, is_savings)])
+
+        return accounts, is_savings, balances, limits
+
+    def run(self, date=None) -> (int):
+        """
+        computes the month-end accruals of all accounts and stores them as one batch, the account instances are only
+        updated once the batch was stored. Raises ValueError if the month of date was booked already
+
+        Args:
+            -> date (datetime.date): date the accruals are booked on. Defaults to the date of program execution
+
+        Returns:
+            -> int: number of transactions posted
+        """
+        storage = self.storage if self.storage is not None else BankAccount.storage
+        date = date or bank_external.today
+        period = f'{date.year:04d}-{date.month:02d}'
+
+        # no posting may change a balance between loading it and storing its accrual
+        with lock_accounts(self.accounts.values()):
+            last = self.last_period()
+
+            # 'yyyy-mm' sorts by date, booking an earlier month after a later one would be just as wrong as booking it twice
+            if last is not None and period <= last:
+                raise ValueError(f'month-end of {period} refused, month-end was booked up to {last} already')
+
+            posted = self._run(storage, date.toordinal())
+
+            # the month is only marked as booked once its accruals were stored
+            self._store_period(period)
+
+        return posted
+
+    def _run(self, storage, date_ordinal: int) -> (int):
+        """
+        computes and stores the accruals while all accounts are locked
+
+        Args:
+            -> storage (Storage): storage backend the run is posted to
+            -> date_ordinal (int): date the accruals are booked on as returned by datetime.date.toordinal()
+
+        Returns:
+            -> int: number of transactions posted
+        """
+        accounts, is_savings, balances, limits = self.load()
+        accruals = compute_accruals(is_savings, balances, limits, self.savings_rate, self.overdraft_rate, self.overdraft_fee.cents)
+
+        # only accounts with a non-zero accrual get a transaction
+        if np is not None:
+            changed = np.flatnonzero(accruals).tolist()
+            accruals = accruals.tolist()
+        else:
+            changed = [i for i, accrual in enumerate(accruals) if accrual]
+
+        if not changed:
+            return 0
+
+        transactions = []
+        new_balances = {}
+
+        # transaction IDs are given by the storage backend when the batch is stored
+        for i in changed:
+            account, accrual = accounts[i], accruals[i]
+
+            if accrual > 0:
+                transactions.append(Transaction(None, account.account_number, accrual, date_ordinal, DEPOSIT, 'interest'))
+            else:
+                transactions.append(Transaction(None, account.account_number, accrual, date_ordinal, WITHDRAWAL, 'overdraft interest'))
+
+            new_balances[account.account_number] = Money(balances[i] + accrual)
+
+        storage.post(new_balances, transactions)
+
+        for transaction in transactions:
+            account = self.accounts[transaction.account_number]
+            account.set_funds(new_balances[transaction.account_number])
+            account._record(transaction)
+
+        return len(transactions)
@@ -0,0 +1,227 @@
+import atexit
+import contextlib
+import cProfile
+import functools
+import io
+import os
+import pstats
+import sys
+import time
+import tracemalloc
+
+# environment variables that turn profiling on without a command line flag -> directory of the profiles, and 1 to take
+# tracemalloc snapshots too
+PROFILE_ENV = 'BANK_PROFILE'
+PROFILE_MEMORY_ENV = 'BANK_PROFILE_MEMORY'
+
+# number of frames kept per allocation by tracemalloc
+TRACEMALLOC_FRAMES = 1
+
+# allocations of the profilers themselves are left out of the allocation sites
+PROFILER_FILTERS = [tracemalloc.Filter(False, module.__file__) for module in (cProfile, pstats, tracemalloc)] + [tracemalloc.Filter(False, __file__)]
+
+
+class ActionProfiler(object):
+    """
+    A class to profile the actions of a session (menu choices, batch runs) one by one. Each action is run under its own
+    cProfile profiler and written to the profile directory as '<number>-<action>.prof' (readable with pstats or
+    snakeviz). With memory profiling, a tracemalloc snapshot is taken before and after the action and the allocation
+    sites that grew the most are written next to it as '<number>-<action>.alloc.txt'.
+
+    ** Profiles measure CPU time (time.process_time), so time an action spends waiting for the teller at an input prompt
+       doesn't hide its hotspots
+    ** An action started while another is being profiled gets its own profile, the outer profile is paused meanwhile
+       (its CPU and wall time leave out the nested action, its allocations don't)
+    ** summary() adds up all actions -> calls and CPU time per action, the top functions by own time and the top
+       allocation sites
+
+    Constructor Args:
+        -> directory (str): directory the profiles are written to, created if missing
+        -> memory (bool): take tracemalloc snapshots around every action. Defaults to False
+        -> top (int): number of hotspots and allocation sites in the summary and allocation files. Defaults to 15
+    """
+
+    def __init__(self, directory: str, memory: bool = False, top: int = 15) -> (None):
+        """
+        constructor method for class Action Profiler
+
+        Args:
+            -> directory (str): directory the profiles are written to, created if missing
+            -> memory (bool): take tracemalloc snapshots around every action. Defaults to False
+            -> top (int): number of hotspots and allocation sites in the summary and allocation files. Defaults to 15
+        """
+        self.directory = directory
+        self.memory = memory
+        self.top = top
+
+        os.makedirs(directory, exist_ok=True)
+
+        # number of the last profile file, and [profile, nested CPU seconds, nested wall seconds] of the running actions
+        self.count = 0
+        self._running = []
+
+        # action name mapped to [calls, CPU seconds, wall seconds], all profiles added up, allocation site mapped to bytes
+        self.actions = {}
+        self.stats = None
+        self.allocations = {}
+
+        if memory and not tracemalloc.is_tracing():
+            tracemalloc.start(TRACEMALLOC_FRAMES)
+
+    @contextlib.contextmanager
+    def action(self, name: str):
+        """
+        context manager that profiles the code run within it as one action
+
+        Args:
+            -> name (str): name of the action, used in the file names and the summary
+        """
+        self.count += 1
+        prefix = os.path.join(self.directory, f'{self.count:04d}-{name}')
+
+        # only one profiler can be active, the action this one is nested in is paused until it ends
+        if self._running:
+            self._running[-1][0].disable()
+
+        before = tracemalloc.take_snapshot().filter_traces(PROFILER_FILTERS) if self.memory else None
+        profile = cProfile.Profile(time.process_time)
+        running = [profile, 0.0, 0.0]
+        self._running.append(running)
+        wall, cpu = time.perf_counter(), time.process_time()
+        profile.enable()
+
+        try:
+            yield
+        finally:
+            profile.disable()
+            wall, cpu = time.perf_counter() - wall, time.process_time() - cpu
+            self._running.pop()
+
+            # the outer action resumes, the time of this action is not part of its own time
+            if self._running:
+                self._running[-1][1] += cpu
+                self._running[-1][2] += wall
+                self._running[-1][0].enable()
+
+            cpu, wall = cpu - running[1], wall - running[2]
+            profile.dump_stats(prefix + '.prof')
+
+            calls = self.actions.setdefault(name, [0, 0.0, 0.0])
+            calls[0] += 1
+            calls[1] += cpu
+            calls[2] += wall
+
+            if self.stats is None:
+                self.stats = pstats.Stats(profile, stream=io.StringIO())
+            else:
+                self.stats.add(profile)
+
+            if before is not None:
+                self._record_allocations(prefix + '.alloc.txt', tracemalloc.take_snapshot().filter_traces(PROFILER_FILTERS).compare_to(before, 'lineno'))
+
+    def _record_allocations(self, alloc_txt: str, differences: list[tracemalloc.StatisticDiff]) -> (None):
+        """
+        writes the allocation sites that grew the most during an action and adds their growth to the totals
+        """
+        differences = [difference for difference in differences if difference.size_diff > 0]
+
+        for difference in differences:
+            site = str(difference.traceback[0])
+            self.allocations[site] = self.allocations.get(site, 0) + difference.size_diff
+
+        with open(alloc_txt, 'w') as f:
+            for difference in differences[:self.top]:
+                f.write(f'{difference}\n')
+
+    def summary(self) -> (str):
+        """
+        returns the summary of all profiled actions as text
+
+        Returns:
+            -> str: calls, CPU and wall time per action, the top functions by own CPU time over all actions and, with
+               memory profiling, the top allocation sites by bytes allocated and still held at the end of an action
+        """
+        lines = [f'Profiled {self.count} actions, profiles in {self.directory}', '', f"{'action':<24}{'calls':>8}{'cpu s':>12}{'wall s':>12}"]
+        lines.extend(f'{name:<24}{calls:>8}{cpu:>12.4f}{wall:>12.4f}' for name, (calls, cpu, wall) in sorted(self.actions.items(), key=lambda item: -item[1][1]))
+
+        if self.stats is not None:
+            stream = io.StringIO()
+            self.stats.stream = stream
+            self.stats.sort_stats(pstats.SortKey.TIME).print_stats(self.top)
+
+            # drop the header of print_stats(), the table starts at its column titles
+            table = stream.getvalue()
+            lines.extend(['', f'Top {self.top} hotspots (own CPU time over all actions):', table[table.find('   ncalls'):].rstrip()])
+
+        if self.allocations:
+            lines.extend(['', f'Top {self.top} allocation sites (bytes held after the actions):'])
+            lines.extend(f'{size / 1024:>12.1f} KiB  {site}' for site, size in sorted(self.allocations.items(), key=lambda item: -item[1])[:self.top])
+
+        return '\n'.join(lines)
+
+    def close(self) -> (None):
+        """
+        stops memory tracing and prints the summary to stderr
+        """
+        if self.memory and tracemalloc.is_tracing():
+            tracemalloc.stop()
+
+        if self.count:
+            print(self.summary(), file=sys.stderr)
+
+
+# active profiler, None while profiling is off
+profiler = None
+
+
+def enable(directory: str = None, memory: bool = None, top: int = 15) -> (ActionProfiler):
+    """
+    turns profiling on for the rest of the session, the summary is printed when the program exits. Settings not given
+    are taken from the environment (BANK_PROFILE, BANK_PROFILE_MEMORY)
+
+    Args:
+        -> directory (str): directory the profiles are written to. Defaults to $BANK_PROFILE
+        -> memory (bool): take tracemalloc snapshots around every action. Defaults to $BANK_PROFILE_MEMORY == '1'
+        -> top (int): number of hotspots and allocation sites in the summary. Defaults to 15
+
+    Returns:
+        -> ActionProfiler: the profiler, None if no directory was given either way
+    """
+    global profiler
+
+    directory = directory or os.environ.get(PROFILE_ENV)
+    memory = memory if memory is not None else os.environ.get(PROFILE_MEMORY_ENV) == '1'
+
+    if profiler is None and directory:
+        profiler = ActionProfiler(directory, memory, top)
+        atexit.register(profiler.close)
+
+    return profiler
+
+
+def action(name: str):
+    """
+    returns a context manager that profiles the code within it as one action, or does nothing while profiling is off
+
+    Args:
+        -> name (str): name of the action, None for code that is not an action
+    """
+    return profiler.action(name) if profiler is not None and name is not None else contextlib.nullcontext()
+
+
+def profiled(name: str):
+    """
+    decorator that profiles every call of a function as one action while profiling is on
+
+    Args:
+        -> name (str): name of the action
+    """
+    def decorator(function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            with action(name):
+                return function(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
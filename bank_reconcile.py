@@ -0,0 +1,235 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from bank_money import Money, format_cents, parse_cents
+
+# number of ID gaps and malformed lines kept per check, the totals are always counted in full
+MAX_EXAMPLES = 20
+
+
+def chunk_ranges(transactions_txt: str, num_chunks: int) -> (list[tuple[int, int]]):
+    """
+    splits accountsTransactions.txt into byte ranges of about equal size, every range starts at the beginning of a line
+
+    Args:
+        -> transactions_txt (str): text file containing All Transactions in Banking System
+        -> num_chunks (int): number of ranges wanted
+
+    Returns:
+        -> list[tuple[int, int]]: (start offset, end offset) of every non-empty range, in file order
+    """
+    size = os.path.getsize(transactions_txt)
+    boundaries = [0]
+
+    with open(transactions_txt, 'rb') as f:
+        for i in range(1, num_chunks):
+            # move each boundary forward to the start of the next line
+            f.seek(max(size * i // num_chunks, boundaries[-1]))
+            f.readline()
+            boundaries.append(min(f.tell(), size))
+
+    boundaries.append(size)
+
+    return [(start, end) for start, end in zip(boundaries, boundaries[1:]) if start < end]
+
+
+def _count_leg(transfers: dict, key: tuple, surplus: int) -> (None):
+    """
+    adds transfer legs to the count of their key, a key whose legs cancel out is removed
+    """
+    surplus += transfers.get(key, 0)
+
+    if surplus:
+        transfers[key] = surplus
+    else:
+        del transfers[key]
+
+
+def scan_chunk(transactions_txt: str, start: int, end: int) -> (dict):
+    """
+    replays the transaction lines within one byte range of accountsTransactions.txt, run in a worker process
+
+    Args:
+        -> transactions_txt (str): text file containing All Transactions in Banking System
+        -> start (int): offset of the first line of the range
+        -> end (int): offset after the last line of the range
+
+    Returns:
+        -> dict: partial result of the range ->
+            sums: account number mapped to the sum of its signed amounts in cents
+            transfers: (sender, recipient, cents, date) mapped to the number of 'transfer to' legs minus 'transfer from' legs
+            first_id, last_id, count: first and last transaction ID of the range and its number of transactions
+            id_gaps: (previous ID, ID) of the lines whose ID does not follow the ID before it, id_gap_count: their number
+            malformed: offsets of the lines that could not be parsed, malformed_count: their number
+    """
+    sums = {}
+    transfers = {}
+    first_id = last_id = None
+    count = id_gap_count = malformed_count = 0
+    id_gaps = []
+    malformed = []
+
+    with open(transactions_txt, 'rb') as f:
+        f.seek(start)
+        offset = start
+
+        for line in f:
+            if offset >= end:
+                break
+
+            line_offset, offset = offset, offset + len(line)
+
+            if not line.strip():
+                continue
+
+            try:
+                transaction_id, account_number, amount, date, description = line.decode().rstrip('\n').split(', ', 4)
+                transaction_id = int(transaction_id)
+                units, _, fraction = amount.partition('.')
+
+                # amounts written with two decimals are converted inline, anything else goes through parse_cents()
+                if len(fraction) == 2 and units:
+                    amount = int(units) * 100 - int(fraction) if units[0] == '-' else int(units) * 100 + int(fraction)
+                else:
+                    amount = parse_cents(amount)
+
+            except ValueError:
+                malformed_count += 1
+
+                if len(malformed) < MAX_EXAMPLES:
+                    malformed.append(line_offset)
+
+                continue
+
+            sums[account_number] = sums.get(account_number, 0) + amount
+
+            # both legs of a transfer are keyed by (sender, recipient, amount, date), matched legs cancel out and are
+            # dropped, so only legs whose counterpart is in another range (or missing) are kept
+            if description.startswith('transfer to '):
+                _count_leg(transfers, (account_number, description[12:], -amount, date), 1)
+
+            elif description.startswith('transfer from '):
+                _count_leg(transfers, (description[14:], account_number, amount, date), -1)
+
+            # IDs are stored in ascending order, each ID follows the one before it
+            if last_id is not None and transaction_id != last_id + 1:
+                id_gap_count += 1
+
+                if len(id_gaps) < MAX_EXAMPLES:
+                    id_gaps.append((last_id, transaction_id))
+
+            if first_id is None:
+                first_id = transaction_id
+
+            last_id = transaction_id
+            count += 1
+
+    return {'sums': sums, 'transfers': transfers, 'first_id': first_id, 'last_id': last_id, 'count': count, 'id_gaps': id_gaps, 'id_gap_count': id_gap_count, 'malformed': malformed, 'malformed_count': malformed_count}
+
+
+def reconcile(transactions_txt: str, balances: dict[str, Money], workers: int = None, chunk_size: int = 64 * 1024 * 1024) -> (dict):
+    """
+    audits the transaction log against the stored balances. The log is split into byte ranges which are replayed by a
+    pool of worker processes (see scan_chunk()), their partial results are merged in file order. Checks that
+
+        -> the signed amounts of every account add up to its stored balance
+        -> every 'transfer to' leg has a matching 'transfer from' leg (same accounts, amount and date) and vice versa
+        -> transaction IDs are unique and contiguous, i.e every ID follows the one before it
+
+    Args:
+        -> transactions_txt (str): text file containing All Transactions in Banking System
+        -> balances (dict[str, Money]): account number mapped to the stored balance of every account
+        -> workers (int): number of worker processes, 1 replays the log in this process. Defaults to the number of CPUs
+        -> chunk_size (int): approximate size of the byte ranges in bytes. Defaults to 64 MiB
+
+    Returns:
+        -> dict: the reconciliation report ->
+            transactions: number of transactions replayed
+            balance_mismatches: (account number, stored balance, replayed balance) of every account that does not add up
+            unmatched_transfers: (sender, recipient, amount, date, surplus) of every transfer leg without a counterpart,
+                surplus > 0 are 'transfer to' legs and surplus < 0 'transfer from' legs
+            id_gaps, id_gap_count: examples and number of IDs that do not follow the ID before them
+            malformed, malformed_count: examples and number of lines that could not be parsed (as byte offsets)
+    """
+    workers = workers or os.cpu_count() or 1
+    size = os.path.getsize(transactions_txt) if os.path.exists(transactions_txt) else 0
+
+    # at least one range per worker, more for large logs so the workers stay evenly loaded
+    ranges = chunk_ranges(transactions_txt, max(workers, -(-size // chunk_size))) if size else []
+
+    if workers > 1 and len(ranges) > 1:
+        with ProcessPoolExecutor(min(workers, len(ranges))) as pool:
+            results = list(pool.map(scan_chunk, [transactions_txt] * len(ranges), *zip(*ranges)))
+    else:
+        results = [scan_chunk(transactions_txt, start, end) for start, end in ranges]
+
+    sums = {}
+    transfers = {}
+    report = {'transactions': 0, 'id_gaps': [], 'id_gap_count': 0, 'malformed': [], 'malformed_count': 0}
+    last_id = 0
+
+    for result in results:
+        for account_number, amount in result['sums'].items():
+            sums[account_number] = sums.get(account_number, 0) + amount
+
+        for key, surplus in result['transfers'].items():
+            _count_leg(transfers, key, surplus)
+
+        # the first ID of a range has to follow the last ID of the range before it (the log starts at ID 1)
+        gaps = list(result['id_gaps'])
+
+        if result['first_id'] is not None:
+            if result['first_id'] != last_id + 1:
+                gaps.insert(0, (last_id, result['first_id']))
+                report['id_gap_count'] += 1
+
+            last_id = result['last_id']
+
+        report['transactions'] += result['count']
+        report['id_gaps'].extend(gaps[:MAX_EXAMPLES - len(report['id_gaps'])])
+        report['id_gap_count'] += result['id_gap_count']
+        report['malformed'].extend(result['malformed'][:MAX_EXAMPLES - len(report['malformed'])])
+        report['malformed_count'] += result['malformed_count']
+
+    # accounts without transactions have to hold a zero balance, transactions of removed accounts have to add up to zero
+    report['balance_mismatches'] = sorted((account_number, balances.get(account_number), Money(sums.get(account_number, 0))) for account_number in set(balances) | set(sums) if balances.get(account_number, Money()).cents != sums.get(account_number, 0))
+    report['unmatched_transfers'] = sorted((sender, recipient, Money(amount), date, surplus) for (sender, recipient, amount, date), surplus in transfers.items())
+
+    return report
+
+
+def format_report(report: dict) -> (str):
+    """
+    formats a reconciliation report for printing
+
+    Args:
+        -> report (dict): report returned by reconcile()
+
+    Returns:
+        -> str: the report as text, one finding per line
+    """
+    lines = [f"Reconciled {report['transactions']} transactions"]
+
+    for account_number, stored, replayed in report['balance_mismatches']:
+        lines.append(f"Balance mismatch: account {account_number} stores {stored if stored is not None else 'no balance (account removed)'}, transactions add up to {replayed}")
+
+    for sender, recipient, amount, date, surplus in report['unmatched_transfers']:
+        leg = f'transfer to {recipient} on account {sender}' if surplus > 0 else f'transfer from {sender} on account {recipient}'
+        lines.append(f'Unmatched transfer: {abs(surplus)} x {leg} of {format_cents(amount.cents)} on {date}')
+
+    for previous, transaction_id in report['id_gaps']:
+        lines.append(f'Transaction ID {transaction_id} follows ID {previous}')
+
+    if report['id_gap_count'] > len(report['id_gaps']):
+        lines.append(f"... {report['id_gap_count']} transaction IDs out of sequence in total")
+
+    for offset in report['malformed']:
+        lines.append(f'Malformed transaction line at byte {offset}')
+
+    if report['malformed_count'] > len(report['malformed']):
+        lines.append(f"... {report['malformed_count']} malformed transaction lines in total")
+
+    if len(lines) == 1:
+        lines.append('All balances, transfer pairs and transaction IDs are consistent')
+
+    return '\n'.join(lines)
@@ -0,0 +1,266 @@
+import os
+import random
+import threading
+from array import array
+
+
+def last_transaction_id(transactions_txt: str = 'data/accountsTransactions.txt') -> (int):
+    """
+    finds the ID of the final transaction within accountsTransactions.txt by reading the file backwards from its end,
+    so the cost does not depend on the number of transactions in the file
+
+    Args:
+        -> transactions_txt (str): text file containing All Transactions in Banking System. Defaults to 'data/accountsTransactions.txt'
+
+    Returns:
+        -> int: ID of the last transaction, 0 if the file is missing or empty
+    """
+    if not os.path.exists(transactions_txt):
+        return 0
+
+    with open(transactions_txt, 'rb') as f:
+        f.seek(0, os.SEEK_END)
+        position = f.tell()
+        tail = b''
+
+        # read blocks from the end of the file until a complete non-empty line is found
+        while position > 0:
+            step = min(4096, position)
+            position -= step
+            f.seek(position)
+            tail = f.read(step) + tail
+
+            lines = [line for line in tail.split(b'\n') if line.strip()]
+
+            # the first line in the tail is only complete if the start of the file was reached or a newline precedes it
+            if len(lines) > 1 or (lines and position == 0):
+                return int(lines[-1].split(b', ')[0])
+
+    return 0
+
+
+class TransactionSequence(object):
+    """
+    A class to represent the sequence of transaction IDs in the Bank System. The sequence is seeded once from the last
+    record of accountsTransactions.txt and afterwards hands out IDs from memory, instead of counting the lines of the
+    file for every transaction.
+
+    Constructor Args:
+        -> transactions_txt (str): text file containing All Transactions in Banking System. Defaults to 'data/accountsTransactions.txt'
+        -> last (int): last transaction ID already in use, seeds the sequence without reading transactions_txt. Defaults to None
+    """
+
+    def __init__(self, transactions_txt: str = 'data/accountsTransactions.txt', last: int = None) -> (None):
+        """
+        constructor method for class Transaction Sequence
+
+        Args:
+            -> transactions_txt (str): text file containing All Transactions in Banking System. Defaults to 'data/accountsTransactions.txt'
+            -> last (int): last transaction ID already in use, seeds the sequence without reading transactions_txt. Defaults to None
+        """
+        self.transactions_txt = transactions_txt
+        self._last = last_transaction_id(transactions_txt) if last is None else last
+
+        # IDs may be handed out to several threads at once
+        self._lock = threading.Lock()
+
+    def last(self) -> (int):
+        """
+        get method to return the last transaction ID handed out by the sequence
+
+        Returns:
+            -> int: last allocated transaction ID
+        """
+        return self._last
+
+    def next(self) -> (int):
+        """
+        allocates the next transaction ID
+
+        Returns:
+            -> int: unique transaction ID
+        """
+        with self._lock:
+            self._last += 1
+            return self._last
+
+    def reserve(self, count: int) -> (range):
+        """
+        reserves a block of consecutive transaction IDs, used when posting several transactions at once
+
+        Args:
+            -> count (int): number of transaction IDs to reserve
+
+        Returns:
+            -> range: the reserved transaction IDs in ascending order
+        """
+        with self._lock:
+            first = self._last + 1
+            self._last += count
+            return range(first, self._last + 1)
+
+
+class AccountNumberAllocator(object):
+    """
+    A class to hand out unique 8 digit account numbers. Every number ever issued is kept in a set, so a random number
+    is checked for a collision with a single lookup, and issued numbers are appended to a small binary file so the set
+    is restored on restart without scanning the accounts.
+
+    ** Numbers of closed accounts stay issued, an account number is never handed out twice
+    ** Blocks of numbers can be reserved at once for bulk onboarding, they are persisted with a single write
+
+    Constructor Args:
+        -> numbers_file (str): binary file of all issued numbers, None keeps them in memory only. Defaults to 'data/accountNumbers.bin'
+        -> existing (Iterable[str]): account numbers already in use, only read when numbers_file does not exist yet. Defaults to ()
+    """
+    NUM_DIGITS = 8
+
+    def __init__(self, numbers_file: str = 'data/accountNumbers.bin', existing=()) -> (None):
+        """
+        constructor method for class Account Number Allocator
+
+        Args:
+            -> numbers_file (str): binary file of all issued numbers, None keeps them in memory only. Defaults to 'data/accountNumbers.bin'
+            -> existing (Iterable[str]): account numbers already in use, only read when numbers_file does not exist yet. Defaults to ()
+        """
+        self.numbers_file = numbers_file
+        self.capacity = 10 ** self.NUM_DIGITS
+
+        # numbers may be handed out to several threads at once
+        self._lock = threading.Lock()
+
+        if numbers_file is not None and os.path.exists(numbers_file):
+            numbers = array('I')
+
+            with open(numbers_file, 'rb') as f:
+                data = f.read()
+
+            # a torn final record (from a crash during an append) is dropped
+            numbers.frombytes(data[:len(data) - len(data) % numbers.itemsize])
+            self.issued = set(numbers)
+
+        else:
+            self.issued = {int(account_number) for account_number in existing}
+            self._persist(self.issued)
+
+    def __contains__(self, account_number: str) -> (bool):
+        return int(account_number) in self.issued
+
+    def __len__(self) -> (int):
+        return len(self.issued)
+
+    def _persist(self, numbers) -> (None):
+        """
+        appends newly issued numbers to numbers_file with a single write
+        """
+        if self.numbers_file is not None:
+            with open(self.numbers_file, 'ab') as f:
+                f.write(array('I', numbers).tobytes())
+
+    def issue(self, account_number: str) -> (None):
+        """
+        marks an account number created elsewhere (e.g an imported account) as issued
+
+        Args:
+            -> account_number (str): account number in use
+        """
+        with self._lock:
+            if int(account_number) not in self.issued:
+                self.issued.add(int(account_number))
+                self._persist([int(account_number)])
+
+    def reserve(self, count: int) -> (list[str]):
+        """
+        draws a block of random account numbers that were never issued before and marks them as issued
+
+        Args:
+            -> count (int): number of account numbers to reserve
+
+        Returns:
+            -> list[str]: the reserved account numbers, zero filled to 8 digits
+        """
+        with self._lock:
+            if count > self.capacity - len(self.issued):
+                raise ValueError(f'only {self.capacity - len(self.issued)} account numbers are left')
+
+            numbers = []
+
+            # colliding draws are simply drawn again, each check is a single set lookup
+            while len(numbers) < count:
+                number = random.randrange(self.capacity)
+
+                if number not in self.issued:
+                    self.issued.add(number)
+                    numbers.append(number)
+
+            self._persist(numbers)
+
+        return [str(number).zfill(self.NUM_DIGITS) for number in numbers]
+
+    def allocate(self) -> (str):
+        """
+        draws a single random account number that was never issued before
+
+        Returns:
+            -> str: unique 8 digit account number
+        """
+        return self.reserve(1)[0]
+
+
+class CustomerSequence(object):
+    """
+    A class to represent the sequence of customer IDs in the Bank System. The last ID handed out is kept in a small
+    text file, so an ID is never handed out twice -> not even after the customer holding the highest ID was removed.
+
+    Constructor Args:
+        -> sequence_txt (str): text file holding the last customer ID handed out. Defaults to 'data/customerSequence.txt'
+        -> last (int): highest customer ID known to be in use, the sequence never hands out an ID at or below it. Defaults to 0
+    """
+
+    def __init__(self, sequence_txt: str = 'data/customerSequence.txt', last: int = 0) -> (None):
+        """
+        constructor method for class Customer Sequence
+
+        Args:
+            -> sequence_txt (str): text file holding the last customer ID handed out. Defaults to 'data/customerSequence.txt'
+            -> last (int): highest customer ID known to be in use, the sequence never hands out an ID at or below it. Defaults to 0
+        """
+        self.sequence_txt = sequence_txt
+        self._last = last
+
+        if sequence_txt is not None and os.path.exists(sequence_txt):
+            with open(sequence_txt, 'r') as f:
+                stored = f.read().strip()
+
+            self._last = max(self._last, int(stored) if stored else 0)
+
+        # IDs may be handed out to several threads at once
+        self._lock = threading.Lock()
+
+    def last(self) -> (int):
+        """
+        get method to return the last customer ID handed out by the sequence
+
+        Returns:
+            -> int: last allocated customer ID
+        """
+        return self._last
+
+    def next(self) -> (int):
+        """
+        allocates the next customer ID and stores it before handing it out
+
+        Returns:
+            -> int: unique customer ID
+        """
+        with self._lock:
+            self._last += 1
+
+            # written to a temporary file first and then swapped in, a crash never leaves a half written ID
+            if self.sequence_txt is not None:
+                with open(self.sequence_txt + '.tmp', 'w') as f:
+                    f.write(f'{self._last}\n')
+
+                os.replace(self.sequence_txt + '.tmp', self.sequence_txt)
+
+            return self._last
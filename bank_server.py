@@ -0,0 +1,618 @@
+import asyncio
+import datetime
+import json
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+from bank_external import BankAccount, CheckAccount, Customer, SavingsAccount
+from bank_concurrency import merge_posts
+from bank_customers import CustomerRegistry
+from bank_ledger import Ledger
+from bank_money import Money
+from bank_sequence import AccountNumberAllocator
+from bank_storage import Storage
+from bank_transaction import Transaction
+
+logger = logging.getLogger(__name__)
+
+
+class RequestError(Exception):
+    """
+    raised for a request that can't be served, the message is sent back to the client
+    """
+
+
+class QueuedStorage(Storage):
+    """
+    Storage backend used while the server runs. Reads go straight to the wrapped backend, writes are only collected -> the
+    server hands the writes of a request to its writer task once the request has been applied in memory
+
+    Constructor Args:
+        -> storage (Storage): backend the writer task stores the writes in
+    """
+
+    def __init__(self, storage: Storage) -> (None):
+        """
+        constructor method for class Queued Storage
+
+        Args:
+            -> storage (Storage): backend the writer task stores the writes in
+        """
+        self.storage = storage
+        self.pending = []
+
+    def take(self) -> (list[tuple]):
+        """
+        returns the writes collected since the last call and starts a new collection
+
+        Returns:
+            -> list[tuple]: (name of the storage method, arguments) per write
+        """
+        pending, self.pending = self.pending, []
+        return pending
+
+    def load_accounts(self) -> (list[tuple]):
+        return self.storage.load_accounts()
+
+    def load_transactions(self):
+        return self.storage.load_transactions()
+
+    def load_customers(self) -> (list[tuple]):
+        return self.storage.load_customers()
+
+    def reserve_transaction_ids(self, count: int) -> (range):
+        return self.storage.reserve_transaction_ids(count)
+
+    def post(self, balances: dict[str, Money], transactions: list[Transaction]) -> (None):
+        self.pending.append(('post', (dict(balances), list(transactions))))
+
+    def add_account(self, customer_id: int, account: tuple) -> (None):
+        self.pending.append(('add_account', (customer_id, account)))
+
+    def delete_account(self, account_number: str) -> (None):
+        self.pending.append(('delete_account', (account_number,)))
+
+    def add_customer(self, customer: tuple) -> (None):
+        self.pending.append(('add_customer', (customer,)))
+
+
+class BankServer(object):
+    """
+    A class to represent the network service of the Bank System. Clients send one JSON object per line and receive one
+    JSON object per line in return, many clients are served concurrently against the same in-memory accounts.
+
+    Every request is applied to the in-memory accounts within the event loop (so requests never interleave halfway),
+    its writes are then handed to a single writer task which stores them in arrival order. The response is only sent
+    once the writes of the request are stored.
+
+    Requests -> {"op": ..., fields}, an optional "id" is echoed in the response:
+        -> login (customer_id), logout, accounts
+        -> deposit / withdraw (account_number, amount), transfer (account_number, amount, recipient)
+        -> history (account_number, optional from / to as yyyy-mm-dd, page from 1, page_size up to MAX_PAGE_SIZE)
+        -> balance (account_number, date) -> balance at the end of date, or (account_number, from, to) -> opening,
+           closing, lowest and highest balance of the period
+        -> open_account (type: "savings" or "check", credit_limit for check accounts), close_account (account_number)
+
+    Responses -> {"ok": true, result fields} or {"ok": false, "error": reason}
+
+    ** The writer task group commits -> the postings of all requests queued while the previous group was stored are
+       stored as one post of the storage backend (one fsync with sync enabled), up to max_batch requests per group.
+       With max_wait set, the writer task waits that long for more requests before storing a group
+
+    Constructor Args:
+        -> accounts (dict[str, BankAccount]): all Account instances in Bank System keyed by account number
+        -> customers (CustomerRegistry | list[Customer]): all Customer instances in Bank System
+        -> storage (Storage): storage backend the writer task stores all changes in
+        -> max_batch (int): largest number of requests stored as one group. Defaults to 256
+        -> max_wait (float): seconds the writer task waits for more requests before storing a group. Defaults to 0.0
+        -> allocator (AccountNumberAllocator): allocator of new account numbers. Defaults to one kept in memory, seeded from accounts
+    """
+
+    # largest page of transactions returned by a history request
+    MAX_PAGE_SIZE = 1000
+
+    def __init__(self, accounts: dict[str, BankAccount], customers: list[Customer], storage: Storage, max_batch: int = 256, max_wait: float = 0.0, allocator: AccountNumberAllocator = None) -> (None):
+        """
+        constructor method for class Bank Server
+
+        Args:
+            -> accounts (dict[str, BankAccount]): all Account instances in Bank System keyed by account number
+            -> customers (CustomerRegistry | list[Customer]): all Customer instances in Bank System
+            -> storage (Storage): storage backend the writer task stores all changes in
+            -> max_batch (int): largest number of requests stored as one group. Defaults to 256
+            -> max_wait (float): seconds the writer task waits for more requests before storing a group. Defaults to 0.0
+            -> allocator (AccountNumberAllocator): allocator of new account numbers. Defaults to one kept in memory, seeded from accounts
+        """
+        self.accounts = accounts
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self.allocator = allocator if allocator is not None else AccountNumberAllocator(None, accounts)
+        self.customers = customers if isinstance(customers, CustomerRegistry) else CustomerRegistry(customers)
+        self.storage = QueuedStorage(storage)
+        self.ledger = Ledger(accounts, self.storage)
+
+        # the first write that could not be stored, the server refuses further changes once memory is ahead of storage
+        self.failure = None
+
+        # storage calls block, the writer task runs them on one thread so the event loop keeps serving reads
+        self.executor = ThreadPoolExecutor(1, thread_name_prefix='bank-writer')
+
+        self.queue = None
+        self.writer = None
+        self.server = None
+
+    async def start(self, host: str = '127.0.0.1', port: int = 8765, path: str = None) -> (asyncio.AbstractServer):
+        """
+        starts the writer task and listens for clients on a TCP port or a Unix socket
+
+        Args:
+            -> host (str): address to listen on. Defaults to '127.0.0.1'
+            -> port (int): TCP port to listen on, 0 picks a free port. Defaults to 8765
+            -> path (str): path of a Unix socket to listen on instead of TCP. Defaults to None
+
+        Returns:
+            -> asyncio.AbstractServer: the listening server
+        """
+        # accounts opened and closed by Customers are stored through the class wide storage backend
+        BankAccount.storage = self.storage
+
+        self.queue = asyncio.Queue()
+        self.writer = asyncio.create_task(self._write_loop())
+
+        if path is not None:
+            self.server = await asyncio.start_unix_server(self._serve_client, path)
+        else:
+            self.server = await asyncio.start_server(self._serve_client, host, port)
+
+        return self.server
+
+    async def close(self) -> (None):
+        """
+        stops accepting clients, waits until all queued writes are stored and stops the writer task
+        """
+        self.server.close()
+        await self.server.wait_closed()
+
+        await self.queue.join()
+        self.writer.cancel()
+        self.executor.shutdown()
+
+        BankAccount.storage = self.storage.storage
+
+    def _store(self, writes: list[tuple]) -> (None):
+        """
+        applies writes to the storage backend in order, consecutive postings are merged into a single post
+
+        Args:
+            -> writes (list[tuple]): (name of the storage method, arguments) per write
+        """
+        storage = self.storage.storage
+        posts = []
+
+        for name, args in writes + [(None, None)]:
+            if name == 'post':
+                posts.append(args)
+                continue
+
+            if posts:
+                storage.post(*merge_posts(posts))
+                posts = []
+
+            if name is not None:
+                getattr(storage, name)(*args)
+
+    async def _write_loop(self) -> (None):
+        """
+        body of the writer task -> takes every request queued so far, stores their writes as one group and acknowledges
+        each request of the group
+        """
+        loop = asyncio.get_running_loop()
+
+        while True:
+            group = [await self.queue.get()]
+            deadline = loop.time() + self.max_wait
+
+            while len(group) < self.max_batch:
+                if not self.queue.empty():
+                    group.append(self.queue.get_nowait())
+                    continue
+
+                if deadline <= loop.time():
+                    break
+
+                try:
+                    group.append(await asyncio.wait_for(self.queue.get(), deadline - loop.time()))
+                except asyncio.TimeoutError:
+                    break
+
+            try:
+                await loop.run_in_executor(self.executor, self._store, [write for writes, done in group for write in writes])
+
+            except Exception as error:
+                self.failure = error
+
+                for writes, done in group:
+                    if not done.done():
+                        done.set_exception(error)
+            else:
+                for writes, done in group:
+                    if not done.done():
+                        done.set_result(None)
+
+            finally:
+                for request in group:
+                    self.queue.task_done()
+
+    async def _commit(self) -> (None):
+        """
+        hands the writes of the current request to the writer task and waits until they are stored
+        """
+        writes = self.storage.take()
+
+        if writes:
+            done = asyncio.get_running_loop().create_future()
+            self.queue.put_nowait((writes, done))
+            await done
+
+    async def _serve_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> (None):
+        """
+        serves one client connection until it is closed, each connection has its own login session
+        """
+        session = {'customer': None}
+
+        try:
+            while True:
+                line = await reader.readline()
+
+                if not line:
+                    break
+
+                request = None
+
+                try:
+                    request = json.loads(line)
+
+                    if not isinstance(request, dict):
+                        raise RequestError('request must be a JSON object')
+
+                    response = {'ok': True}
+                    response.update(await self._dispatch(session, request))
+
+                except (RequestError, ValueError) as error:
+                    response = {'ok': False, 'error': str(error)}
+
+                # anything else is a fault of the server (or a write that could not be stored), the client still gets a reply
+                except Exception as error:
+                    logger.exception('request %r failed', request)
+                    response = {'ok': False, 'error': f'storage failure: {error}' if error is self.failure else 'internal error'}
+
+                if isinstance(request, dict) and 'id' in request:
+                    response['id'] = request['id']
+
+                writer.write(json.dumps(response).encode() + b'\n')
+                await writer.drain()
+
+        except ConnectionError:
+            pass
+
+        finally:
+            writer.close()
+
+    async def _dispatch(self, session: dict, request: dict) -> (dict):
+        """
+        runs the operation named by a request
+
+        Args:
+            -> session (dict): login session of the connection
+            -> request (dict): the decoded request
+
+        Returns:
+            -> dict: result fields of the response
+        """
+        operation = getattr(self, f"_op_{request.get('op')}", None)
+
+        if operation is None:
+            raise RequestError(f"unknown op {request.get('op')!r}")
+
+        if request['op'] != 'login' and session['customer'] is None:
+            raise RequestError('not logged in')
+
+        return await operation(session, request)
+
+    @staticmethod
+    def _field(request: dict, name: str, kind: type = None):
+        """
+        returns a required field of a request, of the given type if kind is set
+        """
+        if name not in request:
+            raise RequestError(f'missing field {name}')
+
+        if kind is not None and not isinstance(request[name], kind):
+            raise RequestError(f'{name} must be a {kind.__name__}')
+
+        return request[name]
+
+    def _amount(self, request: dict) -> (Money):
+        """
+        returns the amount of a request, given as a number or as text such as "12.50"
+        """
+        amount = self._field(request, 'amount')
+
+        if isinstance(amount, bool) or not isinstance(amount, (int, float, str)):
+            raise RequestError('invalid amount')
+
+        # malformed text, infinite numbers and amounts beyond MAX_CENTS don't convert
+        try:
+            return Money.of(amount)
+        except ValueError:
+            raise RequestError('invalid amount')
+
+    def _own_account(self, session: dict, request: dict) -> (BankAccount):
+        """
+        returns the account of the logged in customer named by the request
+        """
+        account_number = self._field(request, 'account_number', str)
+
+        for account in session['customer'].get_accounts():
+            if account.account_number == account_number:
+                return account
+
+        raise RequestError(f'unknown account {account_number}')
+
+    def _check_writable(self) -> (None):
+        """
+        refuses changes once a write could not be stored
+        """
+        if self.failure is not None:
+            raise RequestError(f'storage failure: {self.failure}')
+
+    @staticmethod
+    def _account_info(account: BankAccount) -> (dict):
+        """
+        returns the fields describing an account in a response
+        """
+        info = {'account_number': account.account_number, 'iban': account.iban, 'funds': str(account.get_funds())}
+
+        if isinstance(account, CheckAccount):
+            info.update(type='check', credit_limit=str(account.get_credit_limit()))
+        else:
+            info.update(type='savings')
+
+        return info
+
+    async def _post(self, operation: tuple, account: BankAccount) -> (dict):
+        """
+        posts a deposit, withdrawal or transfer through the ledger and waits until it is stored
+
+        Returns:
+            -> dict: the new funds of the account and the ID of its new transaction
+        """
+        self._check_writable()
+
+        rejected = self.ledger.post([operation])
+        if rejected:
+            raise RequestError(rejected[0][1])
+
+        # taken before waiting, later requests may post to the account in the meantime
+        funds, transaction = account.get_funds(), account.get_transactions()[-1]
+
+        await self._commit()
+
+        return {'funds': str(funds), 'transaction_id': transaction.transaction_id}
+
+    async def _op_login(self, session: dict, request: dict) -> (dict):
+        customer_id = self._field(request, 'customer_id')
+
+        customer = self.customers.get(customer_id) if isinstance(customer_id, int) else None
+
+        if customer is None:
+            raise RequestError('unknown customer')
+
+        session['customer'] = customer
+
+        return {'customer_id': customer_id, 'name': customer.name, 'surname': customer.surname, 'accounts': [self._account_info(account) for account in customer.get_accounts()]}
+
+    async def _op_logout(self, session: dict, request: dict) -> (dict):
+        session['customer'] = None
+        return {}
+
+    async def _op_accounts(self, session: dict, request: dict) -> (dict):
+        return {'accounts': [self._account_info(account) for account in session['customer'].get_accounts()]}
+
+    async def _op_deposit(self, session: dict, request: dict) -> (dict):
+        account = self._own_account(session, request)
+        return await self._post(('deposit', account.account_number, self._amount(request)), account)
+
+    async def _op_withdraw(self, session: dict, request: dict) -> (dict):
+        account = self._own_account(session, request)
+        return await self._post(('withdraw', account.account_number, self._amount(request)), account)
+
+    async def _op_transfer(self, session: dict, request: dict) -> (dict):
+        account = self._own_account(session, request)
+        return await self._post(('transfer', account.account_number, self._amount(request), self._field(request, 'recipient', str)), account)
+
+    async def _op_history(self, session: dict, request: dict) -> (dict):
+        account = self._own_account(session, request)
+        page, page_size = request.get('page', 1), request.get('page_size', 50)
+
+        if not isinstance(page, int) or not isinstance(page_size, int) or page < 1 or not 1 <= page_size <= self.MAX_PAGE_SIZE:
+            raise RequestError(f'page must be 1 or greater and page_size between 1 and {self.MAX_PAGE_SIZE}')
+
+        # the date range is optional on both sides
+        try:
+            start, end = [datetime.date.fromisoformat(request[field]) if request.get(field) else None for field in ('from', 'to')]
+        except (TypeError, ValueError):
+            raise RequestError('from and to must be dates as yyyy-mm-dd')
+
+        transactions, total = account.get_statement(start, end, page, page_size)
+
+        return {'total': total, 'page': page, 'transactions': [{'id': transaction.transaction_id, 'amount': transaction.format_amount(), 'date': str(transaction.get_date()), 'type': transaction.get_description()} for transaction in transactions]}
+
+    async def _op_balance(self, session: dict, request: dict) -> (dict):
+        account = self._own_account(session, request)
+
+        try:
+            if 'date' in request:
+                return {'balance': str(account.get_balance_at(datetime.date.fromisoformat(request['date'])))}
+
+            start, end = datetime.date.fromisoformat(self._field(request, 'from')), datetime.date.fromisoformat(self._field(request, 'to'))
+        except (TypeError, ValueError):
+            raise RequestError('dates must be given as yyyy-mm-dd')
+
+        opening, closing = account.get_period_balances(start, end)
+        lowest, highest = account.get_balance_range(start, end)
+
+        return {'opening': str(opening), 'closing': str(closing), 'lowest': str(lowest), 'highest': str(highest)}
+
+    async def _op_open_account(self, session: dict, request: dict) -> (dict):
+        self._check_writable()
+        customer = session['customer']
+        account_type = self._field(request, 'type')
+
+        # the same requirements as the interactive menu -> 14 or older for a Savings Account, 18 or older for a Check Account
+        if account_type == 'savings':
+            if customer.age < 14:
+                raise RequestError('a Savings Account requires an age of 14 or older')
+
+            account = SavingsAccount(self._new_account_number())
+
+        elif account_type == 'check':
+            if customer.age < 18:
+                raise RequestError('a Check Account requires an age of 18 or older')
+
+            credit_limit = self._amount({'amount': self._field(request, 'credit_limit')})
+            if not 50 <= credit_limit <= 5000:
+                raise RequestError('credit limit must be between 50 and 5000')
+
+            account = CheckAccount(self._new_account_number(), credit_limit=credit_limit)
+
+        else:
+            raise RequestError('type must be savings or check')
+
+        customer.add_account(account)
+        self.accounts[account.account_number] = account
+
+        await self._commit()
+
+        return self._account_info(account)
+
+    async def _op_close_account(self, session: dict, request: dict) -> (dict):
+        self._check_writable()
+        account = self._own_account(session, request)
+
+        # an account may not be closed while funds are still allocated to it
+        if account.get_funds() != 0:
+            raise RequestError(f'account {account.account_number} still has funds associated with it')
+
+        session['customer'].delete_cust_account(account)
+        del self.accounts[account.account_number]
+
+        await self._commit()
+
+        return {'account_number': account.account_number}
+
+    def _new_account_number(self) -> (str):
+        """
+        returns a random 8 digit account number that was never issued before
+        """
+        while True:
+            account_number = self.allocator.allocate()
+
+            if account_number not in self.accounts:
+                return account_number
+
+
+class BankClient(object):
+    """
+    asyncio client for the line-delimited JSON protocol of BankServer, e.g
+
+        client = await BankClient.connect(port=8765)
+        await client.request('login', customer_id=1)
+        await client.request('deposit', account_number='15840454', amount='20.00')
+
+    Constructor Args:
+        -> reader (asyncio.StreamReader): stream of the server responses
+        -> writer (asyncio.StreamWriter): stream the requests are written to
+    """
+
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> (None):
+        """
+        constructor method for class Bank Client
+
+        Args:
+            -> reader (asyncio.StreamReader): stream of the server responses
+            -> writer (asyncio.StreamWriter): stream the requests are written to
+        """
+        self.reader = reader
+        self.writer = writer
+
+        # responses carry no order of their own, so requests on one connection are sent one at a time
+        self._lock = asyncio.Lock()
+
+    @classmethod
+    async def connect(cls, host: str = '127.0.0.1', port: int = 8765, path: str = None) -> ('BankClient'):
+        """
+        connects to a BankServer over TCP or a Unix socket
+
+        Args:
+            -> host (str): address of the server. Defaults to '127.0.0.1'
+            -> port (int): TCP port of the server. Defaults to 8765
+            -> path (str): path of the server's Unix socket, used instead of TCP if given. Defaults to None
+
+        Returns:
+            -> BankClient: the connected client
+        """
+        if path is not None:
+            return cls(*await asyncio.open_unix_connection(path))
+
+        return cls(*await asyncio.open_connection(host, port))
+
+    async def request(self, op: str, **fields) -> (dict):
+        """
+        sends one request and waits for its response
+
+        Args:
+            -> op (str): name of the operation
+            -> fields: fields of the request
+
+        Returns:
+            -> dict: the decoded response
+        """
+        async with self._lock:
+            self.writer.write(json.dumps({'op': op, **fields}).encode() + b'\n')
+            await self.writer.drain()
+
+            return json.loads(await self.reader.readline())
+
+    async def close(self) -> (None):
+        """
+        closes the connection
+        """
+        self.writer.close()
+        await self.writer.wait_closed()
+
+
+async def serve(accounts: dict[str, BankAccount], customers: list[Customer], storage: Storage, host: str = '127.0.0.1', port: int = 8765, path: str = None, max_batch: int = 256, max_wait: float = 0.0, allocator: AccountNumberAllocator = None) -> (None):
+    """
+    runs a BankServer until the task is cancelled (e.g by Ctrl+C)
+
+    Args:
+        -> accounts (dict[str, BankAccount]): all Account instances in Bank System keyed by account number
+        -> customers (CustomerRegistry | list[Customer]): all Customer instances in Bank System
+        -> storage (Storage): storage backend all changes are stored in
+        -> host (str): address to listen on. Defaults to '127.0.0.1'
+        -> port (int): TCP port to listen on. Defaults to 8765
+        -> path (str): path of a Unix socket to listen on instead of TCP. Defaults to None
+        -> max_batch (int): largest number of requests stored as one group. Defaults to 256
+        -> max_wait (float): seconds the writer task waits for more requests before storing a group. Defaults to 0.0
+        -> allocator (AccountNumberAllocator): allocator of new account numbers. Defaults to one kept in memory, seeded from accounts
+    """
+    bank = BankServer(accounts, customers, storage, max_batch, max_wait, allocator)
+    server = await bank.start(host, port, path)
+
+    print(f"Serving on {path if path is not None else ', '.join(str(sock.getsockname()) for sock in server.sockets)}")
+
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await bank.close()
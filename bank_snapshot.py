@@ -0,0 +1,244 @@
+import datetime
+import os
+import struct
+import zlib
+
+from bank_money import Money
+
+# snapshot header -> magic, version, fingerprints (size, mtime, crc32) of accounts.txt and customers.txt, record counts
+SNAPSHOT_MAGIC = b'BSNP'
+SNAPSHOT_VERSION = 2
+SNAPSHOT_HEADER = struct.Struct('<4sHQQIQQIII')
+
+# fixed width account record -> account number, account type code, funds and credit limit in cents
+ACCOUNT_RECORD = struct.Struct('<8sBqq')
+ACCOUNT_TYPES = ('SavingsAccount', 'CheckAccount')
+
+# customer record header -> customer id, date of birth, length of name/surname/address, number of linked accounts
+CUSTOMER_RECORD = struct.Struct('<IHBBHHHH')
+
+
+def parse_account(line: str) -> (tuple):
+    """
+    parses one line of accounts.txt
+
+    Args:
+        -> line (str): account line as stored in accounts.txt
+
+    Returns:
+        -> tuple: (account number, account type, funds, credit limit) -> credit limit is None for Savings Accounts
+    """
+    account = line.strip('\n').split(', ')
+
+    if account[1] == 'SavingsAccount':
+        return account[0], account[1], Money.parse(account[2]), None
+
+    return account[0], account[1], Money.parse(account[2]), Money.parse(account[3])
+
+
+def parse_customer(line: str) -> (tuple):
+    """
+    parses one line of customers.txt
+
+    Args:
+        -> line (str): customer line as stored in customers.txt
+
+    Returns:
+        -> tuple: (customer id, name, surname, date of birth, address, list of linked account numbers)
+    """
+    customer = line.strip('\n').split(', ')
+
+    return int(customer[0]), customer[1], customer[2], datetime.date(int(customer[3]), int(customer[4]), int(customer[5])), customer[6], customer[7:]
+
+
+def _fingerprint(file_name: str, size: int = None) -> (tuple[int, int, int]):
+    """
+    computes the size, modification time and crc32 of a text file, or of its first size bytes
+
+    Args:
+        -> file_name (str): file to fingerprint
+        -> size (int): only checksum the first size bytes of the file. Defaults to the whole file
+
+    Returns:
+        -> tuple[int, int, int]: size, modification time in ns and crc32 of the file (prefix)
+    """
+    stat = os.stat(file_name)
+    remaining = stat.st_size if size is None else size
+    crc = 0
+
+    with open(file_name, 'rb') as f:
+        while remaining > 0:
+            chunk = f.read(min(remaining, 1 << 20))
+            if not chunk:
+                break
+
+            crc = zlib.crc32(chunk, crc)
+            remaining -= len(chunk)
+
+    return stat.st_size, stat.st_mtime_ns, crc
+
+
+def _changes_since(file_name: str, size: int, mtime_ns: int, crc: int) -> (list[str]):
+    """
+    finds the lines appended to a text file after the snapshot was taken
+
+    Args:
+        -> file_name (str): text file the snapshot was taken of
+        -> size (int): size of the file when the snapshot was taken
+        -> mtime_ns (int): modification time of the file when the snapshot was taken
+        -> crc (int): crc32 of the file when the snapshot was taken
+
+    Returns:
+        -> list[str]: the appended lines, None if the snapshotted part of the file was modified (snapshot is stale)
+    """
+    stat = os.stat(file_name)
+
+    # untouched since the snapshot was taken
+    if stat.st_size == size and stat.st_mtime_ns == mtime_ns:
+        return []
+
+    # lines were only appended if the snapshotted part of the file is unchanged
+    if stat.st_size < size or _fingerprint(file_name, size)[2] != crc:
+        return None
+
+    with open(file_name, 'r') as f:
+        f.seek(size)
+        return [line for line in f if line.strip()]
+
+
+def write_snapshot(snapshot_file: str = 'data/bank.snap', accounts_txt: str = 'data/accounts.txt', customers_txt: str = 'data/customers.txt') -> (tuple[int, int]):
+    """
+    writes a binary snapshot of the account table and of the customers with their account links. Accounts are stored
+    as fixed width records, so the snapshot can be loaded without parsing any text
+
+    Args:
+        -> snapshot_file (str): file to write the snapshot to. Defaults to 'data/bank.snap'
+        -> accounts_txt (str): text file containing All Bank Account data. Defaults to 'data/accounts.txt'
+        -> customers_txt (str): text file containing all customer data in Bank System. Defaults to 'data/customers.txt'
+
+    Returns:
+        -> tuple[int, int]: number of accounts and customers written to the snapshot
+    """
+    # fingerprint before reading, a file modified while the snapshot is taken then shows up as stale
+    accounts_print = _fingerprint(accounts_txt)
+    customers_print = _fingerprint(customers_txt)
+
+    with open(accounts_txt, 'r') as f:
+        accounts = [parse_account(line) for line in f if line.strip()]
+
+    with open(customers_txt, 'r') as f:
+        customers = [parse_customer(line) for line in f if line.strip()]
+
+    with open(snapshot_file + '.tmp', 'wb') as f:
+        f.write(SNAPSHOT_HEADER.pack(SNAPSHOT_MAGIC, SNAPSHOT_VERSION, *accounts_print, *customers_print, len(accounts), len(customers)))
+
+        # the account table is a contiguous block of fixed width records
+        f.write(b''.join(ACCOUNT_RECORD.pack(number.encode(), ACCOUNT_TYPES.index(accType), funds.cents, limit.cents if limit is not None else 0) for number, accType, funds, limit in accounts))
+
+        for customer_id, name, surname, dob, address, account_numbers in customers:
+            name, surname, address = name.encode(), surname.encode(), address.encode()
+
+            f.write(CUSTOMER_RECORD.pack(customer_id, dob.year, dob.month, dob.day, len(name), len(surname), len(address), len(account_numbers)))
+            f.write(name + surname + address + b''.join(number.encode().ljust(8, b'\0') for number in account_numbers))
+
+    os.replace(snapshot_file + '.tmp', snapshot_file)
+
+    return len(accounts), len(customers)
+
+
+def _read_header(snapshot_file: str) -> (tuple):
+    """
+    reads the header of a snapshot file
+
+    Args:
+        -> snapshot_file (str): snapshot file to read
+
+    Returns:
+        -> tuple: the unpacked header followed by the rest of the file as bytes, None if there is no valid snapshot
+    """
+    if not os.path.exists(snapshot_file):
+        return None
+
+    with open(snapshot_file, 'rb') as f:
+        data = f.read()
+
+    if len(data) < SNAPSHOT_HEADER.size:
+        return None
+
+    header = SNAPSHOT_HEADER.unpack_from(data)
+
+    if header[0] != SNAPSHOT_MAGIC or header[1] != SNAPSHOT_VERSION:
+        return None
+
+    return header, data
+
+
+def read_account_snapshot(snapshot_file: str = 'data/bank.snap', accounts_txt: str = 'data/accounts.txt') -> (list[tuple]):
+    """
+    loads the account table from a snapshot and applies the accounts appended to accounts.txt since it was taken
+
+    Args:
+        -> snapshot_file (str): snapshot file to read. Defaults to 'data/bank.snap'
+        -> accounts_txt (str): text file containing All Bank Account data. Defaults to 'data/accounts.txt'
+
+    Returns:
+        -> list[tuple]: (account number, account type, funds, credit limit) per account, None if the snapshot is missing or stale
+    """
+    snapshot = _read_header(snapshot_file)
+    if snapshot is None:
+        return None
+
+    (magic, version, size, mtime_ns, crc, c_size, c_mtime_ns, c_crc, num_accounts, num_customers), data = snapshot
+
+    appended = _changes_since(accounts_txt, size, mtime_ns, crc)
+    if appended is None:
+        return None
+
+    end = SNAPSHOT_HEADER.size + num_accounts * ACCOUNT_RECORD.size
+    accounts = [(number.rstrip(b'\0').decode(), ACCOUNT_TYPES[code], Money(funds), Money(limit) if code else None) for number, code, funds, limit in ACCOUNT_RECORD.iter_unpack(data[SNAPSHOT_HEADER.size:end])]
+
+    return accounts + [parse_account(line) for line in appended]
+
+
+def read_customer_snapshot(snapshot_file: str = 'data/bank.snap', customers_txt: str = 'data/customers.txt') -> (list[tuple]):
+    """
+    loads the customers and their account links from a snapshot and applies the customers appended to customers.txt since it was taken
+
+    Args:
+        -> snapshot_file (str): snapshot file to read. Defaults to 'data/bank.snap'
+        -> customers_txt (str): text file containing all customer data in Bank System. Defaults to 'data/customers.txt'
+
+    Returns:
+        -> list[tuple]: (customer id, name, surname, date of birth, address, linked account numbers) per customer, None if the snapshot is missing or stale
+    """
+    snapshot = _read_header(snapshot_file)
+    if snapshot is None:
+        return None
+
+    (magic, version, size, mtime_ns, crc, c_size, c_mtime_ns, c_crc, num_accounts, num_customers), data = snapshot
+
+    appended = _changes_since(customers_txt, c_size, c_mtime_ns, c_crc)
+    if appended is None:
+        return None
+
+    customers = []
+    position = SNAPSHOT_HEADER.size + num_accounts * ACCOUNT_RECORD.size
+
+    for i in range(num_customers):
+        customer_id, year, month, day, name_len, surname_len, address_len, num_links = CUSTOMER_RECORD.unpack_from(data, position)
+        position += CUSTOMER_RECORD.size
+
+        name = data[position:position + name_len].decode()
+        position += name_len
+        surname = data[position:position + surname_len].decode()
+        position += surname_len
+        address = data[position:position + address_len].decode()
+        position += address_len
+
+        # linked account numbers are stored back to back as 8 byte strings
+        links = [data[j:j + 8].rstrip(b'\0').decode() for j in range(position, position + num_links * 8, 8)]
+        position += num_links * 8
+
+        customers.append((customer_id, name, surname, datetime.date(year, month, day), address, links))
+
+    return customers + [parse_customer(line) for line in appended]
@@ -0,0 +1,172 @@
+import datetime
+from array import array
+from bisect import bisect_left, bisect_right
+from itertools import accumulate
+
+from bank_transaction import Transaction
+
+
+class StatementIndex(object):
+    """
+    A class to represent a date sorted index over the transaction history of one Bank Account. It holds the date of every
+    transaction in date order, so the transactions of a date range are found with two binary searches and a page of
+    them is taken straight from the history -> O(log n + page size) per page instead of a pass over the whole history.
+
+    ** Transactions are recorded in ID order, which normally is date order too -> the index then needs no positions of
+       its own and new transactions are simply appended to it. A history that is not date sorted (e.g imported back
+       dated payments) is indexed through an array of history positions sorted by date
+    ** The index is brought up to date with the history on every posting and lookup, only new transactions are added
+    ** Alongside the dates it holds the running balance after every transaction (in date order, in cents, relative to
+       the balance before the first transaction), so a balance at any date is one binary search. Minimum and maximum
+       balances over a range come from sparse tables over the running balances, built on the first such query and
+       extended by O(log n) per new transaction
+    """
+
+    def __init__(self) -> (None):
+        """
+        constructor method for class Statement Index
+        """
+        self.dates = array('l')
+        self.balances = array('q')
+        self.order = None
+        self.size = 0
+
+        # sparse tables -> level k holds the minimum / maximum running balance of every run of 2 ** k transactions
+        self._mins = None
+        self._maxs = None
+
+    def _rebuild(self, history: list[Transaction]) -> (None):
+        """
+        indexes the whole history again
+        """
+        dates = [transaction.date_ordinal for transaction in history]
+
+        if all(earlier <= later for earlier, later in zip(dates, dates[1:])):
+            self.dates = array('l', dates)
+            self.balances = array('q', accumulate(transaction.amount for transaction in history))
+            self.order = None
+
+        # the sort is stable, transactions of the same date keep their history order
+        else:
+            self.order = array('l', sorted(range(len(dates)), key=dates.__getitem__))
+            self.dates = array('l', [dates[position] for position in self.order])
+            self.balances = array('q', accumulate(history[position].amount for position in self.order))
+
+        self.size = len(history)
+        self._mins = self._maxs = None
+
+    def refresh(self, history: list[Transaction]) -> (None):
+        """
+        adds the transactions recorded since the last lookup to the index, the history is indexed again only if
+        transactions were removed from it or a new transaction is dated before the latest indexed one
+
+        Args:
+            -> history (list[Transaction]): the account's transaction history
+        """
+        if len(history) < self.size:
+            return self._rebuild(history)
+
+        for position in range(self.size, len(history)):
+            date = history[position].date_ordinal
+
+            if self.dates and date < self.dates[-1]:
+                return self._rebuild(history)
+
+            self.dates.append(date)
+            self.balances.append(self.balance_after(len(self.balances)) + history[position].amount)
+
+            if self.order is not None:
+                self.order.append(position)
+
+        self.size = len(history)
+
+    def page(self, history: list[Transaction], start: datetime.date = None, end: datetime.date = None, page: int = 1, page_size: int = 20) -> (tuple[list[Transaction], int]):
+        """
+        returns one page of the transactions dated within a range, oldest first
+
+        Args:
+            -> history (list[Transaction]): the account's transaction history
+            -> start (datetime.date): first date of the range, None for no lower bound. Defaults to None
+            -> end (datetime.date): last date of the range (inclusive), None for no upper bound. Defaults to None
+            -> page (int): number of the page, starting at 1. Defaults to 1
+            -> page_size (int): number of transactions per page. Defaults to 20
+
+        Returns:
+            -> tuple[list[Transaction], int]: the transactions of the page and the number of transactions in the range
+        """
+        if page < 1 or page_size < 1:
+            raise ValueError('page and page size must be 1 or greater')
+
+        self.refresh(history)
+
+        lo = 0 if start is None else bisect_left(self.dates, start.toordinal())
+        hi = len(self.dates) if end is None else bisect_right(self.dates, end.toordinal())
+
+        first = lo + (page - 1) * page_size
+        last = min(first + page_size, hi)
+
+        if self.order is None:
+            transactions = history[first:last]
+        else:
+            transactions = [history[self.order[i]] for i in range(first, last)]
+
+        return transactions, max(hi - lo, 0)
+
+    def count_before(self, date: datetime.date) -> (int):
+        """
+        returns the number of transactions dated before a date
+        """
+        return bisect_left(self.dates, date.toordinal())
+
+    def count_through(self, date: datetime.date) -> (int):
+        """
+        returns the number of transactions dated on or before a date
+        """
+        return bisect_right(self.dates, date.toordinal())
+
+    def balance_after(self, count: int) -> (int):
+        """
+        returns the running balance after the first count transactions (in date order) in cents, relative to the
+        balance before the first transaction
+        """
+        return self.balances[count - 1] if count else 0
+
+    def _extend_extremes(self) -> (None):
+        """
+        adds the running balances not yet covered by the sparse tables to them
+        """
+        if self._mins is None:
+            self._mins, self._maxs = [array('q')], [array('q')]
+
+        for n in range(len(self._mins[0]), len(self.balances)):
+            self._mins[0].append(self.balances[n])
+            self._maxs[0].append(self.balances[n])
+
+            # the new balance completes one run of 2 ** k transactions per level -> the run ending at n
+            k = 1
+            while 1 << k <= n + 1:
+                if len(self._mins) == k:
+                    self._mins.append(array('q'))
+                    self._maxs.append(array('q'))
+
+                start, half = n + 1 - (1 << k), 1 << (k - 1)
+                self._mins[k].append(min(self._mins[k - 1][start], self._mins[k - 1][start + half]))
+                self._maxs[k].append(max(self._maxs[k - 1][start], self._maxs[k - 1][start + half]))
+                k += 1
+
+    def extremes(self, lo: int, hi: int) -> (tuple[int, int]):
+        """
+        returns the minimum and maximum running balance after the transactions lo up to (not including) hi in date
+        order, from two overlapping runs of the sparse tables
+
+        Args:
+            -> lo (int): position of the first transaction
+            -> hi (int): position after the last transaction, greater than lo
+
+        Returns:
+            -> tuple[int, int]: minimum and maximum running balance in cents
+        """
+        self._extend_extremes()
+        k = (hi - lo).bit_length() - 1
+
+        return min(self._mins[k][lo], self._mins[k][hi - (1 << k)]), max(self._maxs[k][lo], self._maxs[k][hi - (1 << k)])
@@ -0,0 +1,515 @@
+import datetime
+import os
+import sqlite3
+
+from bank_journal import BalanceWriter, format_balance, fsync_file, read_journal
+from bank_sequence import TransactionSequence
+from bank_money import Money
+from bank_snapshot import parse_account, parse_customer
+from bank_transaction import Transaction, parse_type
+
+
+class Storage(object):
+    """
+    A class to represent the persistence interface of the Bank System. Bank Accounts, Customers and the main program
+    only talk to a storage backend through these methods, the backend decides how the data is kept.
+
+    Rows exchanged with a backend:
+        -> account (tuple): (account number, account type, funds, credit limit) -> credit limit is None for Savings Accounts
+        -> transaction (Transaction): see bank_transaction.py
+        -> customer (tuple): (customer id, name, surname, date of birth, address, list of linked account numbers)
+    """
+
+    def load_accounts(self) -> (list[tuple]):
+        """
+        returns all account rows
+        """
+        raise NotImplementedError
+
+    def load_transactions(self):
+        """
+        returns an iterable over all transactions in ascending ID order
+        """
+        raise NotImplementedError
+
+    def load_customers(self) -> (list[tuple]):
+        """
+        returns all customer rows
+        """
+        raise NotImplementedError
+
+    def reserve_transaction_ids(self, count: int) -> (range):
+        """
+        reserves count consecutive transaction IDs
+
+        Args:
+            -> count (int): number of transaction IDs to reserve
+
+        Returns:
+            -> range: the reserved transaction IDs
+        """
+        raise NotImplementedError
+
+    def post(self, balances: dict[str, Money], transactions: list[Transaction]) -> (None):
+        """
+        stores the new balances of one or more accounts together with the transactions that caused them. Transactions
+        without an ID are given the next IDs of the transaction sequence, in list order, as part of the post
+
+        Args:
+            -> balances (dict[str, Money]): account number mapped to the updated funds of the account
+            -> transactions (list[Transaction]): transactions to be stored
+        """
+        raise NotImplementedError
+
+    def _assign_ids(self, transactions: list[Transaction]) -> (None):
+        """
+        gives every transaction without an ID the next ID of the transaction sequence. IDs are taken when a post is
+        stored, so the stored transactions are always in ascending ID order
+
+        Args:
+            -> transactions (list[Transaction]): transactions about to be stored
+        """
+        missing = [transaction for transaction in transactions if transaction.transaction_id is None]
+
+        if missing:
+            for transaction, transaction_id in zip(missing, self.reserve_transaction_ids(len(missing))):
+                transaction.transaction_id = transaction_id
+
+    def add_account(self, customer_id: int, account: tuple) -> (None):
+        """
+        stores a new account and links it to a customer
+
+        Args:
+            -> customer_id (int): unique identifier of the customer owning the account
+            -> account (tuple): account row of the new account
+        """
+        raise NotImplementedError
+
+    def delete_account(self, account_number: str) -> (None):
+        """
+        removes an account and its link to its customer
+
+        Args:
+            -> account_number (str): account number of the account to be removed
+        """
+        raise NotImplementedError
+
+    def add_customer(self, customer: tuple) -> (None):
+        """
+        stores a new customer
+
+        Args:
+            -> customer (tuple): customer row of the new customer
+        """
+        raise NotImplementedError
+
+
+class TextStorage(Storage):
+    """
+    Storage backend keeping all data in the text files; accounts.txt, accountsTransactions.txt and customers.txt
+
+    Constructor Args:
+        -> accounts_txt (str): text file containing All Bank Account data. Defaults to 'data/accounts.txt'
+        -> transactions_txt (str): text file containing All Transactions in Banking System. Defaults to 'data/accountsTransactions.txt'
+        -> customers_txt (str): text file containing all customer data in Bank System. Defaults to 'data/customers.txt'
+        -> journal (BalanceJournal): balance journal to append balance changes to instead of rewriting accounts.txt. Defaults to None
+        -> sequence (TransactionSequence): transaction ID sequence. Defaults to a sequence seeded from transactions_txt on first use
+        -> sync (bool): fsync the files written by every post before it returns. Defaults to False
+    """
+
+    def __init__(self, accounts_txt: str = 'data/accounts.txt', transactions_txt: str = 'data/accountsTransactions.txt', customers_txt: str = 'data/customers.txt', journal=None, sequence: TransactionSequence = None, sync: bool = False) -> (None):
+        """
+        constructor method for class Text Storage
+
+        Args:
+            -> accounts_txt (str): text file containing All Bank Account data. Defaults to 'data/accounts.txt'
+            -> transactions_txt (str): text file containing All Transactions in Banking System. Defaults to 'data/accountsTransactions.txt'
+            -> customers_txt (str): text file containing all customer data in Bank System. Defaults to 'data/customers.txt'
+            -> journal (BalanceJournal): balance journal to append balance changes to instead of rewriting accounts.txt. Defaults to None
+            -> sequence (TransactionSequence): transaction ID sequence. Defaults to a sequence seeded from transactions_txt on first use
+            -> sync (bool): fsync the files written by every post before it returns. Defaults to False
+        """
+        self.accounts_txt = accounts_txt
+        self.transactions_txt = transactions_txt
+        self.customers_txt = customers_txt
+        self.journal = journal
+        self.sequence = sequence
+        self.sync = sync
+
+        # balances are written by record position, the journal (if any) folds its balances in through the same writer
+        self.writer = journal.writer if journal is not None else BalanceWriter(accounts_txt)
+
+    def load_accounts(self) -> (list[tuple]):
+        """
+        returns all account rows from accounts.txt with the balances of the journal tail replayed over them
+        """
+        journaled = read_journal(self.journal.journal_txt) if self.journal is not None else {}
+
+        with open(self.accounts_txt, 'r') as f:
+            accounts = [parse_account(account) for account in f if account.strip()]
+
+        return [(number, accType, Money.parse(journaled[number]) if number in journaled else funds, limit) for number, accType, funds, limit in accounts]
+
+    def load_transactions(self):
+        """
+        returns a generator over all transactions of accountsTransactions.txt
+        """
+        with open(self.transactions_txt, 'r') as f:
+            for transaction in f:
+                if transaction != '\n':
+                    yield Transaction.from_fields(transaction.strip('\n').split(', '))
+
+    def load_customers(self) -> (list[tuple]):
+        """
+        returns all customer rows from customers.txt
+        """
+        with open(self.customers_txt, 'r') as f:
+            return [parse_customer(customer) for customer in f if customer.strip()]
+
+    def reserve_transaction_ids(self, count: int) -> (range):
+        """
+        reserves count consecutive transaction IDs, the sequence is seeded from accountsTransactions.txt on first use
+
+        Args:
+            -> count (int): number of transaction IDs to reserve
+
+        Returns:
+            -> range: the reserved transaction IDs
+        """
+        if self.sequence is None:
+            self.sequence = TransactionSequence(self.transactions_txt)
+
+        return self.sequence.reserve(count)
+
+    def post(self, balances: dict[str, Money], transactions: list[Transaction]) -> (None):
+        """
+        stores new balances in the balance journal (or rewrites them in accounts.txt) and appends the transactions to
+        accountsTransactions.txt with a single write. With sync enabled both files are flushed to disk before returning,
+        i.e one fsync per file per post (see GroupCommitStorage to share it between many postings)
+
+        Args:
+            -> balances (dict[str, Money]): account number mapped to the updated funds of the account
+            -> transactions (list[Transaction]): transactions to be stored
+        """
+        self._assign_ids(transactions)
+
+        if balances:
+            if self.journal is not None:
+                self.journal.record(balances)
+            else:
+                self.writer.write(balances)
+
+            if self.sync:
+                fsync_file(self.journal.journal_txt if self.journal is not None else self.accounts_txt)
+
+        if transactions:
+            with open(self.transactions_txt, mode='a') as g:
+                g.write(''.join(', '.join(transaction.to_fields()) + '\n' for transaction in transactions))
+
+                if self.sync:
+                    g.flush()
+                    os.fsync(g.fileno())
+
+    def add_account(self, customer_id: int, account: tuple) -> (None):
+        """
+        appends the account number to the customer's line in customers.txt and the account to accounts.txt
+
+        Args:
+            -> customer_id (int): unique identifier of the customer owning the account
+            -> account (tuple): account row of the new account
+        """
+        new_customers = []
+
+        # read all customer data from customers.txt
+        with open(self.customers_txt, 'r') as f:
+
+            # for loop to get specific customer in customers.txt file that matches the customer id
+            for customer in f.readlines():
+                if ((customer.strip('\n')).split(', '))[0] == str(customer_id):
+
+                    # modify string format of the customer
+                    customer = customer.strip('\n') + f', {account[0]}\n'
+
+                new_customers.append(customer)
+
+        # write updated customers back into customers.txt
+        with open(self.customers_txt, 'w') as f:
+            f.writelines(new_customers)
+
+        # append new account to accounts.txt in appropriate string format (Check Accounts also store their credit limit)
+        with open(self.accounts_txt, 'a+') as f:
+            if account[3] is None:
+                f.write(f'{account[0]}, {account[1]}, {format_balance(account[2])}\n')
+            else:
+                f.write(f'{account[0]}, {account[1]}, {format_balance(account[2])}, {Money.of(account[3])}\n')
+
+    def delete_account(self, account_number: str) -> (None):
+        """
+        removes the account from accounts.txt and its account number from the owning customer in customers.txt
+
+        Args:
+            -> account_number (str): account number of the account to be removed
+        """
+        # fold any journaled balances into accounts.txt first, so a stale journal record can't outlive the deleted account
+        if self.journal is not None:
+            self.journal.compact()
+
+        # read all account data from accounts.txt, skipping over the account to be deleted
+        with open(self.accounts_txt, mode='r') as f:
+            new_accounts = [acc for acc in f.readlines() if acc.split(', ')[0] != account_number]
+
+        # read all customer data from customers.txt
+        with open(self.customers_txt, mode='r') as g:
+            new_customers = []
+
+            for cust in g.readlines():
+                pre_cust = (cust.strip('\n')).split(', ')
+
+                # remove the account number from the linked accounts (7th index onwards) of its owner
+                if account_number in pre_cust[7:]:
+                    pre_cust.remove(account_number)
+                    cust = (', '.join(pre_cust)) + '\n'
+
+                new_customers.append(cust)
+
+        # write back all account and customer updated data
+        with open(self.accounts_txt, mode='w') as f:
+            f.writelines(new_accounts)
+
+        with open(self.customers_txt, mode='w') as g:
+            g.writelines(new_customers)
+
+    def add_customer(self, customer: tuple) -> (None):
+        """
+        appends a new customer to customers.txt
+
+        Args:
+            -> customer (tuple): customer row of the new customer
+        """
+        customer_id, name, surname, dob, address, account_numbers = customer
+
+        with open(self.customers_txt, mode='a') as f:
+            f.write(', '.join([str(customer_id), name, surname, str(dob.year), str(dob.month), str(dob.day), address] + list(account_numbers)) + '\n')
+
+
+class SQLiteStorage(Storage):
+    """
+    Storage backend keeping all data in a SQLite database running in WAL mode. Accounts and transactions live in indexed
+    tables, so a deposit, withdrawal or transfer is an indexed update plus an insert instead of a whole file rewrite.
+
+    Constructor Args:
+        -> database (str): path of the SQLite database file. Defaults to 'data/bank.db'
+        -> sync (bool): fsync the write-ahead log on every commit instead of only at checkpoints. Defaults to False
+    """
+
+    SCHEMA = '''
+        CREATE TABLE IF NOT EXISTS accounts (
+            account_number TEXT PRIMARY KEY,
+            type TEXT NOT NULL,
+            funds INTEGER NOT NULL,
+            credit_limit INTEGER
+        );
+        CREATE TABLE IF NOT EXISTS transactions (
+            id INTEGER PRIMARY KEY,
+            account_number TEXT NOT NULL,
+            amount INTEGER NOT NULL,
+            date TEXT NOT NULL,
+            type TEXT NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS transactions_account ON transactions (account_number, id);
+        CREATE TABLE IF NOT EXISTS customers (
+            id INTEGER PRIMARY KEY,
+            name TEXT NOT NULL,
+            surname TEXT NOT NULL,
+            dob TEXT NOT NULL,
+            address TEXT NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS customer_accounts (
+            customer_id INTEGER NOT NULL,
+            account_number TEXT PRIMARY KEY
+        );
+        CREATE INDEX IF NOT EXISTS customer_accounts_customer ON customer_accounts (customer_id);
+    '''
+
+    # statements are kept as constants so sqlite3 reuses its prepared statement for every call
+    UPDATE_FUNDS = 'UPDATE accounts SET funds = ? WHERE account_number = ?'
+    INSERT_TRANSACTION = 'INSERT INTO transactions (id, account_number, amount, date, type) VALUES (?, ?, ?, ?, ?)'
+    INSERT_ACCOUNT = 'INSERT INTO accounts (account_number, type, funds, credit_limit) VALUES (?, ?, ?, ?)'
+    INSERT_LINK = 'INSERT INTO customer_accounts (customer_id, account_number) VALUES (?, ?)'
+    INSERT_CUSTOMER = 'INSERT INTO customers (id, name, surname, dob, address) VALUES (?, ?, ?, ?, ?)'
+
+    def __init__(self, database: str = 'data/bank.db', sync: bool = False) -> (None):
+        """
+        constructor method for class SQLite Storage, creates the tables and indexes if the database is new
+
+        Args:
+            -> database (str): path of the SQLite database file. Defaults to 'data/bank.db'
+            -> sync (bool): fsync the write-ahead log on every commit instead of only at checkpoints. Defaults to False
+        """
+        self.database = database
+
+        # autocommit mode -> transactions are opened explicitly with BEGIN, the connection may be used from worker threads
+        self.connection = sqlite3.connect(database, isolation_level=None, check_same_thread=False)
+        self.connection.execute('PRAGMA journal_mode=WAL')
+        self.connection.execute('PRAGMA synchronous=FULL' if sync else 'PRAGMA synchronous=NORMAL')
+        self.connection.executescript(self.SCHEMA)
+
+        self.sequence = TransactionSequence(last=self.connection.execute('SELECT COALESCE(MAX(id), 0) FROM transactions').fetchone()[0])
+
+    def is_empty(self) -> (bool):
+        """
+        checks whether the database holds neither accounts nor customers
+
+        Returns:
+            -> bool: True or False -> database is empty
+        """
+        return self.connection.execute('SELECT NOT EXISTS (SELECT 1 FROM accounts) AND NOT EXISTS (SELECT 1 FROM customers)').fetchone()[0] == 1
+
+    def import_from(self, storage: Storage) -> (None):
+        """
+        copies all accounts, transactions and customers of another storage backend into the database
+
+        Args:
+            -> storage (Storage): backend to copy the data from, e.g the text files
+        """
+        with self._transaction() as cursor:
+            cursor.executemany(self.INSERT_ACCOUNT, [self._account_row(account) for account in storage.load_accounts()])
+            cursor.executemany(self.INSERT_TRANSACTION, (self._transaction_row(transaction) for transaction in storage.load_transactions()))
+
+            for customer_id, name, surname, dob, address, account_numbers in storage.load_customers():
+                cursor.execute(self.INSERT_CUSTOMER, (customer_id, name, surname, dob.isoformat(), address))
+                cursor.executemany(self.INSERT_LINK, [(customer_id, account_number) for account_number in account_numbers])
+
+        self.sequence = TransactionSequence(last=self.connection.execute('SELECT COALESCE(MAX(id), 0) FROM transactions').fetchone()[0])
+
+    def _transaction(self):
+        """
+        returns a context manager running the enclosed statements in one database transaction
+        """
+        return _SQLiteTransaction(self.connection)
+
+    def load_accounts(self) -> (list[tuple]):
+        """
+        returns all account rows, funds and credit limits are stored in cents
+        """
+        return [(account_number, accType, Money(funds), Money(credit_limit) if credit_limit is not None else None) for account_number, accType, funds, credit_limit in self.connection.execute('SELECT account_number, type, funds, credit_limit FROM accounts')]
+
+    @staticmethod
+    def _account_row(account: tuple) -> (tuple):
+        """
+        returns the column values of an account row -> funds and credit limit in cents
+        """
+        account_number, accType, funds, credit_limit = account
+        return account_number, accType, Money.of(funds).cents, Money.of(credit_limit).cents if credit_limit is not None else None
+
+    def load_transactions(self):
+        """
+        returns a generator over all transactions in ascending ID order
+        """
+        for transaction_id, account_number, amount, date, description in self.connection.execute('SELECT id, account_number, amount, date, type FROM transactions ORDER BY id'):
+            yield Transaction(transaction_id, account_number, amount, datetime.date.fromisoformat(date).toordinal(), *parse_type(description))
+
+    @staticmethod
+    def _transaction_row(transaction: Transaction) -> (tuple):
+        """
+        returns the column values of a transaction -> amount in cents, date in ISO format, type as text
+        """
+        return transaction.transaction_id, transaction.account_number, transaction.amount, transaction.get_date().isoformat(), transaction.get_description()
+
+    def load_customers(self) -> (list[tuple]):
+        """
+        returns all customer rows with the account numbers linked to each customer
+        """
+        links = {}
+        for customer_id, account_number in self.connection.execute('SELECT customer_id, account_number FROM customer_accounts ORDER BY rowid'):
+            links.setdefault(customer_id, []).append(account_number)
+
+        return [(customer_id, name, surname, datetime.date.fromisoformat(dob), address, links.get(customer_id, [])) for customer_id, name, surname, dob, address in self.connection.execute('SELECT id, name, surname, dob, address FROM customers ORDER BY id')]
+
+    def reserve_transaction_ids(self, count: int) -> (range):
+        """
+        reserves count consecutive transaction IDs from the sequence seeded with the highest stored ID
+
+        Args:
+            -> count (int): number of transaction IDs to reserve
+
+        Returns:
+            -> range: the reserved transaction IDs
+        """
+        return self.sequence.reserve(count)
+
+    def post(self, balances: dict[str, Money], transactions: list[Transaction]) -> (None):
+        """
+        updates the balances by primary key and inserts the transactions, all within one database transaction
+
+        Args:
+            -> balances (dict[str, Money]): account number mapped to the updated funds of the account
+            -> transactions (list[Transaction]): transactions to be stored
+        """
+        self._assign_ids(transactions)
+
+        with self._transaction() as cursor:
+            cursor.executemany(self.UPDATE_FUNDS, [(Money.of(funds).cents, account_number) for account_number, funds in balances.items()])
+            cursor.executemany(self.INSERT_TRANSACTION, [self._transaction_row(transaction) for transaction in transactions])
+
+    def add_account(self, customer_id: int, account: tuple) -> (None):
+        """
+        inserts the account and its link to the customer
+
+        Args:
+            -> customer_id (int): unique identifier of the customer owning the account
+            -> account (tuple): account row of the new account
+        """
+        with self._transaction() as cursor:
+            cursor.execute(self.INSERT_ACCOUNT, self._account_row(account))
+            cursor.execute(self.INSERT_LINK, (customer_id, account[0]))
+
+    def delete_account(self, account_number: str) -> (None):
+        """
+        deletes the account and its link to its customer
+
+        Args:
+            -> account_number (str): account number of the account to be removed
+        """
+        with self._transaction() as cursor:
+            cursor.execute('DELETE FROM accounts WHERE account_number = ?', (account_number,))
+            cursor.execute('DELETE FROM customer_accounts WHERE account_number = ?', (account_number,))
+
+    def add_customer(self, customer: tuple) -> (None):
+        """
+        inserts a new customer together with any linked accounts
+
+        Args:
+            -> customer (tuple): customer row of the new customer
+        """
+        customer_id, name, surname, dob, address, account_numbers = customer
+
+        with self._transaction() as cursor:
+            cursor.execute(self.INSERT_CUSTOMER, (customer_id, name, surname, datetime.date(dob.year, dob.month, dob.day).isoformat(), address))
+            cursor.executemany(self.INSERT_LINK, [(customer_id, account_number) for account_number in account_numbers])
+
+    def close(self) -> (None):
+        """
+        closes the database connection
+        """
+        self.connection.close()
+
+
+class _SQLiteTransaction(object):
+    """
+    context manager wrapping statements in BEGIN / COMMIT, rolling back if an exception is raised
+    """
+
+    def __init__(self, connection: sqlite3.Connection) -> (None):
+        self.connection = connection
+
+    def __enter__(self) -> (sqlite3.Cursor):
+        self.cursor = self.connection.cursor()
+        self.cursor.execute('BEGIN')
+        return self.cursor
+
+    def __exit__(self, exc_type, exc_value, traceback) -> (None):
+        if exc_type is None:
+            self.cursor.execute('COMMIT')
+        else:
+            self.cursor.execute('ROLLBACK')
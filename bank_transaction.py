@@ -0,0 +1,160 @@
+import datetime
+import sys
+
+from bank_money import Money, format_cents, parse_cents
+
+# transaction type codes -> the text form of a transaction type is built from the code and the transaction detail
+DEPOSIT = 0
+WITHDRAWAL = 1
+TRANSFER_TO = 2
+TRANSFER_FROM = 3
+OTHER = 4
+
+TYPE_NAMES = ('deposit', 'withdrawal', 'transfer to', 'transfer from')
+
+
+def parse_type(description: str) -> (tuple[int, str]):
+    """
+    splits the text form of a transaction type into its type code and detail, e.g 'transfer to 37480108' -> (TRANSFER_TO, '37480108')
+
+    Args:
+        -> description (str): transaction type as stored in accountsTransactions.txt
+
+    Returns:
+        -> tuple[int, str]: type code and (interned) detail
+    """
+    if description.startswith('transfer to '):
+        kind, detail = TRANSFER_TO, description[12:]
+    elif description.startswith('transfer from '):
+        kind, detail = TRANSFER_FROM, description[14:]
+    else:
+        name, _, detail = description.partition(' - ')
+
+        if name in ('deposit', 'withdrawal'):
+            kind = TYPE_NAMES.index(name)
+        else:
+            kind, detail = OTHER, description
+
+    # interned details are shared by all transactions with the same counterparty / description
+    return kind, sys.intern(detail)
+
+
+class Transaction(object):
+    """
+    A class to represent a single transaction of a Bank Account in a compact form. Instead of a list of five strings the
+    transaction keeps an integer ID, the signed amount in integer cents, the date as an ordinal and a type code, so the
+    values never have to be parsed again once loaded.
+
+    Constructor Args:
+        -> transaction_id (int): unique transaction identifier
+        -> account_number (str): account number of the Bank Account the transaction belongs to
+        -> amount (int): signed amount in cents, negative for money leaving the account
+        -> date_ordinal (int): date of the transaction as returned by datetime.date.toordinal()
+        -> kind (int): transaction type code -> DEPOSIT, WITHDRAWAL, TRANSFER_TO, TRANSFER_FROM or OTHER
+        -> detail (str): counterparty account number of a transfer, description of a deposit/withdrawal. Defaults to ''
+    """
+    __slots__ = ('transaction_id', 'account_number', 'amount', 'date_ordinal', 'kind', 'detail')
+
+    def __init__(self, transaction_id: int, account_number: str, amount: int, date_ordinal: int, kind: int, detail: str = '') -> (None):
+        """
+        constructor method for class Transaction
+
+        Args:
+            -> transaction_id (int): unique transaction identifier
+            -> account_number (str): account number of the Bank Account the transaction belongs to
+            -> amount (int): signed amount in cents, negative for money leaving the account
+            -> date_ordinal (int): date of the transaction as returned by datetime.date.toordinal()
+            -> kind (int): transaction type code -> DEPOSIT, WITHDRAWAL, TRANSFER_TO, TRANSFER_FROM or OTHER
+            -> detail (str): counterparty account number of a transfer, description of a deposit/withdrawal. Defaults to ''
+        """
+        self.transaction_id = transaction_id
+        self.account_number = account_number
+        self.amount = amount
+        self.date_ordinal = date_ordinal
+        self.kind = kind
+        self.detail = detail
+
+    @classmethod
+    def from_fields(cls, fields: list[str]) -> ('Transaction'):
+        """
+        creates a transaction from the columns of a line in accountsTransactions.txt
+
+        Args:
+            -> fields (list[str]): [transaction id, account number, signed amount, date, transaction type]
+
+        Returns:
+            -> Transaction: the parsed transaction
+        """
+        kind, detail = parse_type(fields[4])
+
+        # interned account numbers are shared by all transactions of an account
+        return cls(int(fields[0]), sys.intern(fields[1]), parse_cents(fields[2]), datetime.date.fromisoformat(fields[3]).toordinal(), kind, detail)
+
+    def get_date(self) -> (datetime.date):
+        """
+        get method to return the date of the transaction
+
+        Returns:
+            -> datetime.date: transaction date
+        """
+        return datetime.date.fromordinal(self.date_ordinal)
+
+    def get_amount(self) -> (Money):
+        """
+        get method to return the signed amount of the transaction
+
+        Returns:
+            -> Money: signed amount, negative for money leaving the account
+        """
+        return Money(self.amount)
+
+    def format_amount(self) -> (str):
+        """
+        returns the signed amount in fixed format, e.g '+5000.50'
+        """
+        return format_cents(self.amount, signed=True)
+
+    def get_description(self) -> (str):
+        """
+        get method to return the transaction type as text, e.g 'transfer to 37480108' or 'withdrawal - rent'
+
+        Returns:
+            -> str: transaction type text
+        """
+        if self.kind == OTHER:
+            return self.detail
+
+        if self.kind in (TRANSFER_TO, TRANSFER_FROM):
+            return f'{TYPE_NAMES[self.kind]} {self.detail}'
+
+        return f'{TYPE_NAMES[self.kind]} - {self.detail}' if self.detail else TYPE_NAMES[self.kind]
+
+    def is_debit(self) -> (bool):
+        """
+        checks whether the transaction is a withdrawal or an outgoing transfer
+
+        Returns:
+            -> bool: True or False -> transaction counts as a withdrawal/transfer
+        """
+        return self.kind == WITHDRAWAL or self.kind == TRANSFER_TO
+
+    def to_fields(self) -> (list[str]):
+        """
+        returns the columns of the transaction as stored in accountsTransactions.txt
+
+        Returns:
+            -> list[str]: [transaction id, account number, signed amount, date, transaction type]
+        """
+        return [str(self.transaction_id), self.account_number, self.format_amount(), self.get_date().isoformat(), self.get_description()]
+
+    def __eq__(self, other) -> (bool):
+        """
+        two transactions are equal if all of their fields are equal
+        """
+        return isinstance(other, Transaction) and all(getattr(self, field) == getattr(other, field) for field in self.__slots__)
+
+    def __repr__(self) -> (str):
+        """
+        convert instance to its text form as stored in accountsTransactions.txt
+        """
+        return f"Transaction({', '.join(self.to_fields())})"
@@ -0,0 +1,106 @@
+"""
+Benchmark of durable postings: per-operation fsync (SerializedStorage over a syncing TextStorage) against group commit
+(GroupCommitStorage over the same backend) for several batch sizes and waits. Every thread deposits into its own
+accounts, so the threads only contend for the storage writer. Prints throughput and deposit latency per mode.
+
+Usage: python benchmarks/bench_groupcommit.py [number of threads] [deposits per thread]
+"""
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import main
+from bank_concurrency import GroupCommitStorage, SerializedStorage
+from bank_external import BankAccount
+from bank_money import Money
+from bank_sequence import TransactionSequence
+from bank_storage import TextStorage
+
+ACCOUNTS_PER_THREAD = 4
+
+# (name, storage wrapper) of every mode measured
+MODES = [
+    ('per-op fsync', lambda storage: SerializedStorage(storage)),
+    ('group commit, batch 16', lambda storage: GroupCommitStorage(storage, max_batch=16)),
+    ('group commit, batch 256', lambda storage: GroupCommitStorage(storage, max_batch=256)),
+    ('group commit, batch 256, wait 1ms', lambda storage: GroupCommitStorage(storage, max_batch=256, max_wait=0.001)),
+]
+
+
+def worker(accounts: list[BankAccount], num_operations: int) -> (list[float]):
+    """
+    deposits num_operations times into the given accounts in turn
+
+    Returns:
+        -> list[float]: latency of every deposit in seconds
+    """
+    latencies = []
+
+    for i in range(num_operations):
+        start = time.perf_counter()
+        accounts[i % len(accounts)].deposit(Money(1))
+        latencies.append(time.perf_counter() - start)
+
+    return latencies
+
+
+def percentile(values: list[float], fraction: float) -> (float):
+    """
+    returns the value below which the given fraction of the sorted values lies
+    """
+    return values[min(int(fraction * len(values)), len(values) - 1)]
+
+
+def run(directory: str, wrap, num_threads: int, num_operations: int) -> (tuple[float, list[float], int]):
+    """
+    runs one mode against a fresh set of accounts
+
+    Returns:
+        -> tuple[float, list[float], int]: elapsed seconds, sorted latencies and number of stored transactions
+    """
+    accounts_txt = os.path.join(directory, 'accounts.txt')
+    transactions_txt = os.path.join(directory, 'accountsTransactions.txt')
+
+    with open(accounts_txt, 'w') as f:
+        f.writelines(f'{str(i).zfill(8)}, SavingsAccount, 0.00\n' for i in range(num_threads * ACCOUNTS_PER_THREAD))
+
+    open(transactions_txt, 'w').close()
+
+    BankAccount.storage = wrap(TextStorage(accounts_txt, transactions_txt, os.path.join(directory, 'customers.txt'), sequence=TransactionSequence(transactions_txt), sync=True))
+    accounts = main.get_accounts(accounts_txt, transactions_txt, os.path.join(directory, 'accountsJournal.txt'))
+
+    for account in accounts:
+        account.MONTHLY_LIMIT = num_operations
+
+    start = time.perf_counter()
+
+    with ThreadPoolExecutor(num_threads) as pool:
+        results = list(pool.map(worker, [accounts[i::num_threads] for i in range(num_threads)], [num_operations] * num_threads))
+
+    elapsed = time.perf_counter() - start
+    BankAccount.storage.close()
+
+    with open(transactions_txt, 'r') as f:
+        ids = [int(line.split(', ', 1)[0]) for line in f if line.strip()]
+
+    assert ids == list(range(1, num_threads * num_operations + 1)), 'transactions were lost or stored out of order'
+
+    return elapsed, sorted(latency for latencies in results for latency in latencies), len(ids)
+
+
+if __name__ == '__main__':
+    num_threads = int(sys.argv[1]) if len(sys.argv) > 1 else 16
+    num_operations = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+
+    print(f'{num_threads} threads x {num_operations} deposits, fsync on every commit')
+    print(f"{'mode':<36}{'deposits/s':>12}{'p50 ms':>10}{'p99 ms':>10}")
+
+    for name, wrap in MODES:
+        with tempfile.TemporaryDirectory() as directory:
+            elapsed, latencies, stored = run(directory, wrap, num_threads, num_operations)
+
+        print(f'{name:<36}{stored / elapsed:>12,.0f}{percentile(latencies, 0.5) * 1000:>10.2f}{percentile(latencies, 0.99) * 1000:>10.2f}')
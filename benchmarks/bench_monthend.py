@@ -0,0 +1,61 @@
+"""
+Benchmark of the month-end run: accrual computation alone and the full run including the bulk commit to the text files.
+
+Usage: python benchmarks/bench_monthend.py [number of accounts]
+"""
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import bank_monthend
+import main
+from bank_monthend import MonthEnd, compute_accruals
+from bank_sequence import TransactionSequence
+from bank_storage import TextStorage
+from bench_snapshot import generate
+
+
+if __name__ == '__main__':
+    num_accounts = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+
+    with tempfile.TemporaryDirectory() as directory:
+        # every generated customer owns one Savings Account and one Check Account
+        generate(directory, num_accounts // 2)
+
+        accounts_txt = os.path.join(directory, 'accounts.txt')
+        transactions_txt = os.path.join(directory, 'accountsTransactions.txt')
+        accounts = {account.account_number: account for account in main.get_accounts(accounts_txt, transactions_txt, os.path.join(directory, 'accountsJournal.txt'))}
+
+        month_end = MonthEnd(accounts, TextStorage(accounts_txt, transactions_txt, os.path.join(directory, 'customers.txt'), sequence=TransactionSequence(transactions_txt)), period_txt=None)
+
+        start = time.perf_counter()
+        loaded = month_end.load()
+        load = time.perf_counter() - start
+
+        # the accrual computation with NumPy (if installed) and with the plain loop fallback
+        timings = {}
+        numpy = bank_monthend.np
+
+        for name, module in (('numpy', numpy), ('loop', None)):
+            if name == 'numpy' and module is None:
+                continue
+
+            bank_monthend.np = module
+            start = time.perf_counter()
+            compute_accruals(*loaded[1:], month_end.savings_rate, month_end.overdraft_rate, month_end.overdraft_fee.cents)
+            timings[name] = time.perf_counter() - start
+
+        bank_monthend.np = numpy
+
+        start = time.perf_counter()
+        posted = month_end.run()
+        run = time.perf_counter() - start
+
+        print(f'{len(accounts)} accounts, {posted} transactions posted')
+        print(f'load arrays: {load:.3f}s')
+        for name, elapsed in timings.items():
+            print(f'accruals ({name}): {elapsed:.3f}s')
+        print(f'full run:    {run:.3f}s ({len(accounts) / run:,.0f} accounts/s)')
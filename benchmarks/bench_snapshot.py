@@ -0,0 +1,74 @@
+"""
+Benchmark comparing a cold start from the text files with a cold start from the binary snapshot.
+
+Usage: python benchmarks/bench_snapshot.py [number of customers]
+"""
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import main
+from bank_snapshot import write_snapshot
+
+
+def generate(directory: str, num_customers: int) -> (None):
+    """
+    writes accounts.txt, customers.txt and an empty accountsTransactions.txt with num_customers customers that own
+    one Savings Account and one Check Account each
+
+    Args:
+        -> directory (str): directory to write the data files to
+        -> num_customers (int): number of customers to generate
+    """
+    rng = random.Random(0)
+
+    with open(os.path.join(directory, 'accounts.txt'), 'w') as f, open(os.path.join(directory, 'customers.txt'), 'w') as g:
+        for i in range(num_customers):
+            savings, check = str(2 * i).zfill(8), str(2 * i + 1).zfill(8)
+
+            f.write(f'{savings}, SavingsAccount, {rng.randint(0, 100000) / 2}\n')
+            f.write(f'{check}, CheckAccount, {rng.randint(-1000, 100000) / 2}, -{rng.randint(50, 5000)}.0\n')
+            g.write(f'{i + 1}, Name{i}, Surname{i}, {rng.randint(1940, 2005)}, {rng.randint(1, 12)}, {rng.randint(1, 28)}, {i} Main Street Dublin D0{i % 10}, {savings}, {check}\n')
+
+    open(os.path.join(directory, 'accountsTransactions.txt'), 'w').close()
+
+
+def load(directory: str, snapshot_file: str) -> (float):
+    """
+    loads all accounts and customers from directory
+
+    Args:
+        -> directory (str): directory holding the data files
+        -> snapshot_file (str): snapshot to load from, None to load from the text files
+
+    Returns:
+        -> float: load time in seconds
+    """
+    start = time.perf_counter()
+
+    accounts = main.get_accounts(os.path.join(directory, 'accounts.txt'), os.path.join(directory, 'accountsTransactions.txt'), os.path.join(directory, 'accountsJournal.txt'), snapshot_file=snapshot_file)
+    main.get_customers(os.path.join(directory, 'customers.txt'), accounts, snapshot_file=snapshot_file)
+
+    return time.perf_counter() - start
+
+
+if __name__ == '__main__':
+    num_customers = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+
+    with tempfile.TemporaryDirectory() as directory:
+        generate(directory, num_customers)
+
+        snapshot_file = os.path.join(directory, 'bank.snap')
+        write_snapshot(snapshot_file, os.path.join(directory, 'accounts.txt'), os.path.join(directory, 'customers.txt'))
+
+        # best of three runs for each format
+        text = min(load(directory, None) for i in range(3))
+        snapshot = min(load(directory, snapshot_file) for i in range(3))
+
+        print(f'{num_customers} customers, {2 * num_customers} accounts')
+        print(f'text:     {text:.3f}s')
+        print(f'snapshot: {snapshot:.3f}s ({text / snapshot:.2f}x)')
@@ -0,0 +1,194 @@
+"""
+Deterministic synthetic data for the benchmarks, written in the formats of data/ -> accounts.txt, customers.txt and
+accountsTransactions.txt. The same scale and seed always produce byte-identical files. The transactions are generated
+by replaying deposits, withdrawals and transfers over the accounts, so the stored balances equal the sum of every
+account's transactions and every transfer has both legs (the data reconciles cleanly, see bank_reconcile.py).
+
+Usage: python benchmarks/datagen.py DIRECTORY [--scale 1k|100k|1m] [--customers N] [--accounts N] [--transactions N] [--seed N]
+"""
+import argparse
+import datetime
+import json
+import os
+import random
+import shutil
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from bank_journal import format_balance
+from bank_money import format_cents
+
+# customers, accounts and transaction lines of every preset scale
+SCALES = {
+    '1k': (1000, 1000, 10000),
+    '100k': (100000, 100000, 1000000),
+    '1m': (1000000, 1000000, 10000000),
+}
+
+# transaction lines are written in batches of this many lines
+WRITE_BATCH = 100000
+
+# data files written by generate(), and the file recording the counts and seed they were generated with
+DATA_FILES = ('accounts.txt', 'accountsTransactions.txt', 'customers.txt')
+MANIFEST = 'datagen.json'
+
+
+def generate(directory: str, num_customers: int, num_accounts: int, num_transactions: int, seed: int = 0, first_date: datetime.date = datetime.date(2021, 1, 1), days: int = 3 * 365) -> (dict):
+    """
+    writes accounts.txt, customers.txt and accountsTransactions.txt to directory. Account j belongs to customer
+    j % num_customers, every third account is a Check Account. Transaction dates rise evenly from first_date over days
+
+    Args:
+        -> directory (str): directory to write the data files to
+        -> num_customers (int): number of customers
+        -> num_accounts (int): number of accounts
+        -> num_transactions (int): number of transaction lines (a transfer writes two lines)
+        -> seed (int): seed of the random generator. Defaults to 0
+        -> first_date (datetime.date): date of the first transaction. Defaults to 2021-01-01
+        -> days (int): number of days the transactions are spread over. Defaults to 1095
+
+    Returns:
+        -> dict: number of customers, accounts and transactions written
+    """
+    rng = random.Random(seed)
+
+    # unique 8 digit account numbers, the credit limit of Savings Accounts is 0
+    numbers = [str(number).zfill(8) for number in rng.sample(range(10 ** 8), num_accounts)]
+    limits = [-rng.randint(50, 5000) * 100 if j % 3 == 2 else 0 for j in range(num_accounts)]
+    balances = [0] * num_accounts
+
+    first_ordinal = first_date.toordinal()
+    lines = []
+    transaction_id = 0
+
+    with open(os.path.join(directory, 'accountsTransactions.txt'), 'w') as f:
+        while transaction_id < num_transactions:
+            j = rng.randrange(num_accounts)
+            amount = rng.randint(1, 50000)
+            date = datetime.date.fromordinal(first_ordinal + transaction_id * days // num_transactions).isoformat()
+            choice = rng.random()
+
+            # withdrawals and transfers only take what the account (and its credit limit) allows, a deposit otherwise
+            if choice < 0.3 or balances[j] - amount < limits[j]:
+                transaction_id += 1
+                balances[j] += amount
+                lines.append(f'{transaction_id}, {numbers[j]}, {format_cents(amount, signed=True)}, {date}, deposit\n')
+
+            elif choice < 0.6 or transaction_id + 2 > num_transactions:
+                transaction_id += 1
+                balances[j] -= amount
+                lines.append(f'{transaction_id}, {numbers[j]}, {format_cents(-amount)}, {date}, withdrawal\n')
+
+            else:
+                k = rng.randrange(num_accounts - 1)
+                k += k >= j
+
+                balances[j] -= amount
+                balances[k] += amount
+                lines.append(f'{transaction_id + 1}, {numbers[j]}, {format_cents(-amount)}, {date}, transfer to {numbers[k]}\n')
+                lines.append(f'{transaction_id + 2}, {numbers[k]}, {format_cents(amount, signed=True)}, {date}, transfer from {numbers[j]}\n')
+                transaction_id += 2
+
+            if len(lines) >= WRITE_BATCH:
+                f.write(''.join(lines))
+                lines = []
+
+        f.write(''.join(lines))
+
+    with open(os.path.join(directory, 'accounts.txt'), 'w') as f:
+        for j in range(num_accounts):
+            if limits[j]:
+                f.write(f'{numbers[j]}, CheckAccount, {format_balance(format_cents(balances[j]))}, {format_cents(limits[j])}\n')
+            else:
+                f.write(f'{numbers[j]}, SavingsAccount, {format_balance(format_cents(balances[j]))}\n')
+
+    # customers are 18 or older, so they may own both kinds of account
+    owned = [[] for i in range(num_customers)]
+    for j in range(num_accounts):
+        owned[j % num_customers].append(numbers[j])
+
+    with open(os.path.join(directory, 'customers.txt'), 'w') as f:
+        for i in range(num_customers):
+            f.write(', '.join([str(i + 1), f'Name{rng.randrange(10000)}', f'Surname{rng.randrange(100000)}', str(rng.randint(1940, 2000)), str(rng.randint(1, 12)), str(rng.randint(1, 28)), f'{i} Main Street Dublin D0{i % 10}'] + owned[i]) + '\n')
+
+    # written last, so data that was only partly generated has no manifest
+    written = {'customers': num_customers, 'accounts': num_accounts, 'transactions': num_transactions, 'seed': seed}
+
+    with open(os.path.join(directory, MANIFEST), 'w') as f:
+        json.dump(written, f)
+
+    return written
+
+
+def prepare_data(directory: str, num_customers: int, num_accounts: int, num_transactions: int, seed: int = 0) -> (None):
+    """
+    generates the data into directory, or reuses the data generated there before if it was generated with the same
+    counts and seed
+
+    Args:
+        -> directory (str): directory holding (or receiving) the data files
+        -> num_customers (int): number of customers
+        -> num_accounts (int): number of accounts
+        -> num_transactions (int): number of transaction lines
+        -> seed (int): seed of the random generator. Defaults to 0
+
+    Raises:
+        -> ValueError: directory holds data files generated with other settings, or without a manifest
+    """
+    wanted = {'customers': num_customers, 'accounts': num_accounts, 'transactions': num_transactions, 'seed': seed}
+    os.makedirs(directory, exist_ok=True)
+
+    if not any(os.path.exists(os.path.join(directory, name)) for name in DATA_FILES + (MANIFEST,)):
+        print('generating data...', file=sys.stderr, flush=True)
+        generate(directory, num_customers, num_accounts, num_transactions, seed)
+        return
+
+    try:
+        with open(os.path.join(directory, MANIFEST), 'r') as f:
+            found = json.load(f)
+    except (OSError, ValueError):
+        raise ValueError(f'{directory} holds data without a readable {MANIFEST}, generate it again into an empty directory')
+
+    if found != wanted:
+        raise ValueError(f'{directory} holds data generated with {found}, not {wanted}')
+
+
+def copy_data(directory: str, workspace: str) -> (None):
+    """
+    copies the data files of directory to workspace, a run changes its files so every run starts from a fresh copy
+    """
+    os.makedirs(workspace, exist_ok=True)
+
+    for name in DATA_FILES:
+        shutil.copyfile(os.path.join(directory, name), os.path.join(workspace, name))
+
+
+def parse_args(argv: list[str] = None) -> (argparse.Namespace):
+    """
+    parses the command line options of the data generator, explicit counts override the counts of the scale
+    """
+    parser = argparse.ArgumentParser(description='Generate deterministic benchmark data in the formats of data/')
+    parser.add_argument('directory', help='directory the data files are written to')
+    parser.add_argument('--scale', choices=SCALES, default='1k', help='preset number of customers, accounts and transactions')
+    parser.add_argument('--customers', type=int, help='number of customers')
+    parser.add_argument('--accounts', type=int, help='number of accounts')
+    parser.add_argument('--transactions', type=int, help='number of transaction lines')
+    parser.add_argument('--seed', type=int, default=0, help='seed of the random generator')
+
+    args = parser.parse_args(argv)
+    customers, accounts, transactions = SCALES[args.scale]
+
+    args.customers = args.customers or customers
+    args.accounts = args.accounts or accounts
+    args.transactions = args.transactions if args.transactions is not None else transactions
+
+    return args
+
+
+if __name__ == '__main__':
+    args = parse_args()
+    os.makedirs(args.directory, exist_ok=True)
+
+    written = generate(args.directory, args.customers, args.accounts, args.transactions, args.seed)
+    print(f"Generated {written['customers']} customers, {written['accounts']} accounts and {written['transactions']} transactions in {args.directory}")
@@ -0,0 +1,399 @@
+"""
+Load generator of the Bank System -> drives the BankAccount / Customer APIs with a mixed workload from a pool of
+concurrent workers at a target rate, and reports the throughput and p50 / p95 / p99 latency of every operation as JSON.
+
+    -> history: a 30 day statement page of an account (get_statement())
+    -> deposit: a deposit into an account
+    -> transfer: a transfer between two accounts
+    -> open_close: a Savings Account opened for a customer and closed again (both rewrite customers.txt)
+
+Operations are scheduled at fixed intervals of 1 / rate seconds (open loop), the latency of an operation is measured
+from its scheduled start, so time spent queued behind slow operations counts towards it. --rate 0 runs the operations
+back to back (closed loop). The operation trace can be recorded with --record and replayed with --replay, so two builds
+or configurations run exactly the same operations for an A/B comparison (--compare).
+
+Usage: python benchmarks/loadgen.py [--scale 1k|100k|1m] [--data DIRECTORY] [--workers N] [--rate OPS_PER_S]
+                                    [--duration S] [--mix history=70,deposit=20,transfer=8,open_close=2]
+                                    [--record FILE | --replay FILE] [--output FILE] [--compare FILE]
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import queue
+import random
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import main
+from bank_concurrency import GroupCommitStorage, SerializedStorage
+from bank_external import BankAccount, SavingsAccount
+from bank_money import Money
+from bank_sequence import AccountNumberAllocator, TransactionSequence
+from bank_storage import TextStorage
+from datagen import SCALES, copy_data, prepare_data
+
+# share of every operation in the default workload, in percent
+DEFAULT_MIX = {'history': 70, 'deposit': 20, 'transfer': 8, 'open_close': 2}
+
+# the generated transactions are dated within these three years, history views pick a 30 day window of them
+FIRST_DATE = datetime.date(2021, 1, 1)
+HISTORY_DAYS = 3 * 365
+
+
+def percentile(latencies: list[float], p: float) -> (float):
+    """
+    returns the p-th percentile of sorted latencies by the nearest rank method
+    """
+    return latencies[min(max(int(-(-p * len(latencies) // 100)) - 1, 0), len(latencies) - 1)]
+
+
+def parse_mix(text: str) -> (dict[str, int]):
+    """
+    parses a workload mix written as name=weight pairs, e.g 'history=70,deposit=30'
+    """
+    mix = {}
+
+    for pair in text.split(','):
+        name, _, weight = pair.partition('=')
+
+        if name.strip() not in DEFAULT_MIX:
+            raise argparse.ArgumentTypeError(f"unknown operation '{name.strip()}', choose from {', '.join(DEFAULT_MIX)}")
+
+        mix[name.strip()] = int(weight)
+
+    return mix
+
+
+def make_trace(accounts: list[str], customer_ids: list[int], mix: dict[str, int], rate: float, count: int, seed: int = 0) -> (list[dict]):
+    """
+    generates the operation trace of a run
+
+    Args:
+        -> accounts (list[str]): account numbers the operations pick from
+        -> customer_ids (list[int]): customer IDs accounts are opened for
+        -> mix (dict[str, int]): operation name mapped to its weight
+        -> rate (float): operations per second, 0 schedules every operation at the start
+        -> count (int): number of operations
+        -> seed (int): seed of the random choices. Defaults to 0
+
+    Returns:
+        -> list[dict]: the operations in order, each with its scheduled start 'at' (seconds after the start of the run)
+    """
+    rng = random.Random(seed)
+    names, weights = list(mix), list(mix.values())
+    trace = []
+
+    for i in range(count):
+        name = rng.choices(names, weights)[0]
+        operation = {'at': round(i / rate, 6) if rate else 0.0, 'op': name}
+
+        if name == 'history':
+            operation.update(account=rng.choice(accounts), start=(FIRST_DATE + datetime.timedelta(days=rng.randrange(HISTORY_DAYS))).isoformat())
+        elif name == 'deposit':
+            operation.update(account=rng.choice(accounts), cents=rng.randint(1, 50000))
+        elif name == 'transfer':
+            sender, recipient = rng.sample(accounts, 2)
+            operation.update(account=sender, recipient=recipient, cents=rng.randint(1, 5000))
+        else:
+            operation.update(customer=rng.choice(customer_ids))
+
+        trace.append(operation)
+
+    return trace
+
+
+def write_trace(path: str, settings: dict, trace: list[dict]) -> (None):
+    """
+    writes a trace as JSON lines -> the settings it was generated with, then one operation per line
+    """
+    with open(path, 'w') as f:
+        f.write(json.dumps(settings) + '\n')
+
+        for operation in trace:
+            f.write(json.dumps(operation) + '\n')
+
+
+def read_trace(path: str) -> (tuple[dict, list[dict]]):
+    """
+    reads a trace written by write_trace()
+
+    Returns:
+        -> tuple[dict, list[dict]]: the settings it was generated with and its operations
+    """
+    with open(path, 'r') as f:
+        settings = json.loads(f.readline())
+
+        return settings, [json.loads(line) for line in f if line.strip()]
+
+
+class LoadGenerator(object):
+    """
+    A class to represent one run of a trace against the loaded accounts and customers. A dispatcher releases every
+    operation at its scheduled time to a queue served by the worker threads, each worker records the latency (from the
+    scheduled start) and the service time (from the start of the call) of the operations it runs.
+
+    ** Postings go through the thread safe storage set on BankAccount (SerializedStorage or GroupCommitStorage), so
+       operations on independent accounts run in parallel as in the server
+    ** An operation that is refused (e.g a transfer over the credit limit) or fails is counted separately and is not
+       part of the latencies
+
+    Constructor Args:
+        -> accounts (dict[str, BankAccount]): account number mapped to every account
+        -> customers (dict[int, Customer]): customer ID mapped to every customer
+        -> workers (int): number of worker threads. Defaults to 8
+    """
+
+    def __init__(self, accounts: dict, customers: dict, workers: int = 8) -> (None):
+        """
+        constructor method for class Load Generator
+
+        Args:
+            -> accounts (dict[str, BankAccount]): account number mapped to every account
+            -> customers (dict[int, Customer]): customer ID mapped to every customer
+            -> workers (int): number of worker threads. Defaults to 8
+        """
+        self.accounts = accounts
+        self.customers = customers
+        self.workers = workers
+        self.allocator = AccountNumberAllocator(None, accounts)
+
+        # customers own their accounts through a list, opening and closing accounts of one customer is serialized
+        self._customer_lock = threading.Lock()
+
+        # latencies and service times in seconds, and refused / failed counts, per operation
+        self.latencies = {name: [] for name in DEFAULT_MIX}
+        self.service_times = {name: [] for name in DEFAULT_MIX}
+        self.refused = dict.fromkeys(DEFAULT_MIX, 0)
+        self.failed = dict.fromkeys(DEFAULT_MIX, 0)
+
+        # '+=' on the shared counts is a read and a write, the workers update them under a lock
+        self._counts_lock = threading.Lock()
+
+    def history(self, operation: dict) -> (bool):
+        start = datetime.date.fromisoformat(operation['start'])
+        self.accounts[operation['account']].get_statement(start, start + datetime.timedelta(days=30))
+
+        return True
+
+    def deposit(self, operation: dict) -> (bool):
+        self.accounts[operation['account']].deposit(Money(operation['cents']))
+
+        return True
+
+    def transfer(self, operation: dict) -> (bool):
+        sender, amount = self.accounts[operation['account']], Money(operation['cents'])
+
+        # the check and the transfer are not atomic, a refusal by transfer() itself only prints its message
+        if sender.check_withdrawal(amount) is not None:
+            return False
+
+        sender.transfer(amount, self.accounts[operation['recipient']])
+
+        return True
+
+    def open_close(self, operation: dict) -> (bool):
+        customer, account = self.customers[operation['customer']], SavingsAccount(self.allocator.allocate())
+
+        with self._customer_lock:
+            customer.add_account(account)
+            customer.delete_cust_account(account)
+
+        return True
+
+    def _work(self, work: queue.Queue) -> (None):
+        """
+        body of a worker thread -> runs queued (operation, due time) pairs until it takes None
+        """
+        while True:
+            item = work.get()
+
+            if item is None:
+                return
+
+            operation, due = item
+            name = operation['op']
+            begin = time.perf_counter()
+
+            try:
+                done = getattr(self, name)(operation)
+            except Exception:
+                with self._counts_lock:
+                    self.failed[name] += 1
+                continue
+
+            end = time.perf_counter()
+
+            # list.append is atomic, the workers share the lists without a lock
+            if done:
+                self.latencies[name].append(end - due)
+                self.service_times[name].append(end - begin)
+            else:
+                with self._counts_lock:
+                    self.refused[name] += 1
+
+    def run(self, trace: list[dict]) -> (dict):
+        """
+        runs a trace and returns its results
+
+        Args:
+            -> trace (list[dict]): operations with their scheduled start, see make_trace()
+
+        Returns:
+            -> dict: elapsed seconds, and per operation (and 'all') count, throughput, p50 / p95 / p99 latency and p50
+               service time in microseconds, refused and failed counts
+        """
+        work = queue.Queue(maxsize=self.workers * 4)
+        started = time.perf_counter()
+        threads = [threading.Thread(target=self._work, args=(work,), name=f'loadgen-{i}', daemon=True) for i in range(self.workers)]
+
+        for thread in threads:
+            thread.start()
+
+        # release every operation at its scheduled time, a full queue holds the dispatcher back (that delay still
+        # counts towards the latency of the operation). A trace without a rate is run back to back, the latency of an
+        # operation then starts when it is queued
+        open_loop = any(operation['at'] for operation in trace)
+
+        for operation in trace:
+            due = started + operation['at'] if open_loop else time.perf_counter()
+            delay = due - time.perf_counter()
+
+            if delay > 0:
+                time.sleep(delay)
+
+            work.put((operation, due))
+
+        for thread in threads:
+            work.put(None)
+
+        for thread in threads:
+            thread.join()
+
+        elapsed = time.perf_counter() - started
+        results = {'elapsed_s': round(elapsed, 3), 'operations': {}}
+
+        for name in DEFAULT_MIX:
+            if self.latencies[name] or self.refused[name] or self.failed[name]:
+                results['operations'][name] = self._summary(self.latencies[name], self.service_times[name], elapsed, self.refused[name], self.failed[name])
+
+        results['operations']['all'] = self._summary([latency for name in DEFAULT_MIX for latency in self.latencies[name]], [service for name in DEFAULT_MIX for service in self.service_times[name]], elapsed, sum(self.refused.values()), sum(self.failed.values()))
+
+        return results
+
+    @staticmethod
+    def _summary(latencies: list[float], service_times: list[float], elapsed: float, refused: int, failed: int) -> (dict):
+        """
+        returns the count, throughput and percentiles of the completed calls of one operation
+        """
+        summary = {'count': len(latencies), 'ops_per_s': round(len(latencies) / elapsed, 1), 'refused': refused, 'failed': failed}
+
+        if latencies:
+            latencies, service_times = sorted(latencies), sorted(service_times)
+            summary.update({f'p{p}_us': round(percentile(latencies, p) * 1e6, 1) for p in (50, 95, 99)})
+            summary['service_p50_us'] = round(percentile(service_times, 50) * 1e6, 1)
+
+        return summary
+
+
+def compare(results: dict, baseline: dict) -> (str):
+    """
+    formats a comparison of two runs -> throughput and p50 / p99 latency of every operation, baseline -> this run
+    """
+    lines = [f"{'operation':<12}{'ops/s':>22}{'p50 us':>24}{'p99 us':>24}"]
+
+    for name, result in results['operations'].items():
+        before = baseline['operations'].get(name)
+
+        if before and 'p50_us' in before and 'p50_us' in result:
+            lines.append(f"{name:<12}{before['ops_per_s']:>10.1f} -> {result['ops_per_s']:<8.1f}{before['p50_us']:>12.1f} -> {result['p50_us']:<8.1f}{before['p99_us']:>12.1f} -> {result['p99_us']:<8.1f}")
+
+    return '\n'.join(lines)
+
+
+def parse_args(argv: list[str] = None) -> (argparse.Namespace):
+    """
+    parses the command line options of the load generator
+    """
+    parser = argparse.ArgumentParser(description='Mixed workload load generator of the Bank System')
+    parser.add_argument('--scale', choices=SCALES, default='1k', help='preset size of the generated data')
+    parser.add_argument('--data', metavar='DIRECTORY', help='use (or generate once into) this directory instead of a temporary one')
+    parser.add_argument('--seed', type=int, default=0, help='seed of the data generator and the trace')
+    parser.add_argument('--workers', type=int, default=8, help='number of concurrent workers')
+    parser.add_argument('--rate', type=float, default=500.0, help='target operations per second, 0 runs them back to back')
+    parser.add_argument('--duration', type=float, default=10.0, help='seconds of operations at the target rate')
+    parser.add_argument('--count', type=int, help='number of operations, instead of rate x duration')
+    parser.add_argument('--mix', type=parse_mix, default=DEFAULT_MIX, help='operation weights, e.g history=70,deposit=20,transfer=8,open_close=2')
+    parser.add_argument('--group-commit', action='store_true', help='group concurrent postings into one write (GroupCommitStorage)')
+    parser.add_argument('--sync', action='store_true', help='fsync every write of the text storage')
+    trace = parser.add_mutually_exclusive_group()
+    trace.add_argument('--record', metavar='FILE', help='write the generated trace to FILE')
+    trace.add_argument('--replay', metavar='FILE', help='run the trace in FILE instead of generating one')
+    parser.add_argument('--output', metavar='FILE', help='write the JSON report to FILE instead of stdout')
+    parser.add_argument('--compare', metavar='FILE', help='compare the run with a JSON report written before')
+
+    return parser.parse_args(argv)
+
+
+if __name__ == '__main__':
+    args = parse_args()
+
+    # a replayed trace runs against the data it was recorded with
+    if args.replay:
+        settings, trace = read_trace(args.replay)
+        args.scale, args.seed = settings['scale'], settings['seed']
+
+    customers, accounts, transactions = SCALES[args.scale]
+
+    with tempfile.TemporaryDirectory() as temporary:
+        directory = args.data or temporary
+
+        # data in --data is reused only if it was generated with the scale and seed of the run (or of the trace)
+        try:
+            prepare_data(directory, customers, accounts, transactions, args.seed)
+        except ValueError as error:
+            sys.exit(f'error: {error}')
+
+        # the run changes the data files, it works on a copy so every run starts from the same data
+        workspace = os.path.join(temporary, 'run')
+        copy_data(directory, workspace)
+
+        accounts_txt, transactions_txt, customers_txt = (os.path.join(workspace, name) for name in ('accounts.txt', 'accountsTransactions.txt', 'customers.txt'))
+        storage = TextStorage(accounts_txt, transactions_txt, customers_txt, sequence=TransactionSequence(transactions_txt), sync=args.sync)
+        BankAccount.storage = GroupCommitStorage(storage) if args.group_commit else SerializedStorage(storage)
+
+        print('loading data...', file=sys.stderr, flush=True)
+        bank_accounts = {account.account_number: account for account in main.get_accounts(accounts_txt, transactions_txt, os.path.join(workspace, 'accountsJournal.txt'))}
+        bank_customers = {customer.get_custID(): customer for customer in main.get_customers(customers_txt, bank_accounts)}
+
+        # the workload exercises postings, not the rule of one withdrawal per month of Savings Accounts
+        SavingsAccount.MONTHLY_LIMIT = sys.maxsize
+
+        if not args.replay:
+            count = args.count if args.count is not None else int(args.rate * args.duration) if args.rate else 1000
+            settings = {'scale': args.scale, 'seed': args.seed, 'mix': args.mix, 'rate': args.rate, 'count': count}
+            trace = make_trace(sorted(bank_accounts), sorted(bank_customers), args.mix, args.rate, count, args.seed)
+
+            if args.record:
+                write_trace(args.record, settings, trace)
+
+        print(f'running {len(trace)} operations on {args.workers} workers...', file=sys.stderr, flush=True)
+        results = LoadGenerator(bank_accounts, bank_customers, args.workers).run(trace)
+        BankAccount.storage.close()
+
+    report = {'run': {**settings, 'workers': args.workers, 'group_commit': args.group_commit, 'sync': args.sync, 'replay': args.replay, 'python': platform.python_version(), 'platform': platform.platform(), 'started': datetime.datetime.now().isoformat(timespec='seconds')}, 'results': results}
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+    else:
+        print(json.dumps(report, indent=2))
+
+    if args.compare:
+        with open(args.compare, 'r') as f:
+            print(compare(results, json.load(f)['results']), file=sys.stderr)
@@ -0,0 +1,120 @@
+"""
+Stress run of the concurrency-safe mode: many threads post random deposits, withdrawals and transfers against a small
+set of accounts through SerializedStorage. Afterwards it checks that
+
+    -> no money was created or lost by transfers (total funds == opening funds + deposits - withdrawals)
+    -> the balances in memory and in accounts.txt agree
+    -> every transaction ID was handed out once, in ascending order within accountsTransactions.txt
+    -> the transactions of every account add up to its change in funds
+
+Usage: python benchmarks/stress_concurrency.py [number of threads] [operations per thread]
+"""
+import os
+import random
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import main
+from bank_concurrency import SerializedStorage
+from bank_external import BankAccount
+from bank_money import Money
+from bank_sequence import TransactionSequence
+from bank_storage import TextStorage
+
+NUM_ACCOUNTS = 20
+
+
+def worker(accounts: list[BankAccount], seed: int, num_operations: int) -> (tuple[int, int]):
+    """
+    posts num_operations random operations
+
+    Returns:
+        -> tuple[int, int]: cents deposited and cents withdrawn by the successful operations
+    """
+    rng = random.Random(seed)
+    deposited = withdrawn = 0
+
+    for i in range(num_operations):
+        account = rng.choice(accounts)
+        amount = Money(rng.randint(1, 5000))
+        choice = rng.random()
+
+        if choice < 0.2:
+            account.deposit(amount)
+            deposited += amount.cents
+
+        elif choice < 0.3:
+            # the balance before the withdrawal can't be compared afterwards (other threads post too), so count
+            # the withdrawal from the history entry it leaves behind
+            with account._lock:
+                before = len(account.get_transactions())
+                account.withdraw(amount)
+
+                if len(account.get_transactions()) > before:
+                    withdrawn += amount.cents
+        else:
+            account.transfer(amount, rng.choice([recipient for recipient in accounts if recipient is not account]))
+
+    return deposited, withdrawn
+
+
+if __name__ == '__main__':
+    num_threads = int(sys.argv[1]) if len(sys.argv) > 1 else 8
+    num_operations = int(sys.argv[2]) if len(sys.argv) > 2 else 2000
+
+    with tempfile.TemporaryDirectory() as directory:
+        accounts_txt = os.path.join(directory, 'accounts.txt')
+        transactions_txt = os.path.join(directory, 'accountsTransactions.txt')
+
+        with open(accounts_txt, 'w') as f:
+            for i in range(NUM_ACCOUNTS):
+                if i % 2:
+                    f.write(f'{str(i).zfill(8)}, CheckAccount, 1000.00, -500.00\n')
+                else:
+                    f.write(f'{str(i).zfill(8)}, SavingsAccount, 1000.00\n')
+
+        open(transactions_txt, 'w').close()
+
+        BankAccount.storage = SerializedStorage(TextStorage(accounts_txt, transactions_txt, os.path.join(directory, 'customers.txt'), sequence=TransactionSequence(transactions_txt)))
+
+        accounts = main.get_accounts(accounts_txt, transactions_txt, os.path.join(directory, 'accountsJournal.txt'))
+        opening = {account.account_number: account.get_funds() for account in accounts}
+
+        start = time.perf_counter()
+
+        # the monthly limit of Savings Accounts would stop most of their debits, so the limit is lifted for the run
+        for account in accounts:
+            account.MONTHLY_LIMIT = num_threads * num_operations
+
+        with ThreadPoolExecutor(num_threads) as pool:
+            results = list(pool.map(worker, [accounts] * num_threads, range(num_threads), [num_operations] * num_threads))
+
+        elapsed = time.perf_counter() - start
+        BankAccount.storage.close()
+
+        deposited = sum(result[0] for result in results)
+        withdrawn = sum(result[1] for result in results)
+        total = sum(account.get_funds().cents for account in accounts)
+
+        # money is conserved
+        assert total == sum(funds.cents for funds in opening.values()) + deposited - withdrawn, 'money was created or lost'
+
+        # memory and accounts.txt agree
+        stored = {account.account_number: account.get_funds() for account in main.get_accounts(accounts_txt, transactions_txt, os.path.join(directory, 'accountsJournal.txt'))}
+        assert stored == {account.account_number: account.get_funds() for account in accounts}, 'accounts.txt differs from memory'
+
+        # IDs are unique and stored in ascending order
+        with open(transactions_txt, 'r') as f:
+            ids = [int(line.split(', ', 1)[0]) for line in f if line.strip()]
+        assert ids == list(range(1, len(ids) + 1)), 'transaction IDs are duplicated or out of order'
+
+        # every account's history explains its change in funds
+        for account in accounts:
+            assert sum(transaction.amount for transaction in account.get_transactions()) == account.get_funds().cents - opening[account.account_number].cents, f'history of {account.account_number} does not add up'
+
+        print(f'{num_threads} threads, {len(ids)} transactions in {elapsed:.2f}s ({len(ids) / elapsed:,.0f} transactions/s)')
+        print('money conserved, balances and transaction IDs consistent')
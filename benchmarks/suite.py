@@ -0,0 +1,305 @@
+"""
+Benchmark suite of the hot paths of the Bank System on deterministic synthetic data (see datagen.py). Every operation
+is timed on its own against the data of the chosen scale and the results are reported as JSON, so runs can be kept
+and compared with --compare.
+
+    -> load_accounts, load_customers: get_accounts() / get_customers() over the text files
+    -> transaction_index_scan, transaction_index_load: building the byte offset index of the lazy history, and
+       loading it again from its sidecar
+    -> deposit, withdraw, transfer: postings through TextStorage, deposit_journal: deposits through the balance journal
+    -> add_account, delete_cust_account: opening and closing accounts (rewrites customers.txt)
+    -> customer_login, customer_search: customer registry lookups by ID and by surname prefix
+    -> statement_page, balance_at: date range pages and balance-at-date queries
+    -> month_end: one month-end run over all accounts, reconcile: a reconciliation of the whole log
+
+Usage: python benchmarks/suite.py [--scale 1k|100k|1m] [--ops N] [--output FILE] [--compare FILE] [--only NAME,..]
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import main
+from bank_customers import CustomerRegistry
+from bank_external import BankAccount, SavingsAccount
+from bank_history import TransactionIndex
+from bank_journal import BalanceJournal
+from bank_money import Money
+from bank_monthend import MonthEnd
+from bank_reconcile import reconcile
+from bank_sequence import AccountNumberAllocator, CustomerSequence, TransactionSequence
+from bank_storage import TextStorage
+from datagen import SCALES, copy_data, prepare_data
+
+
+def timed(function, count: int = 1) -> (dict):
+    """
+    times count calls of function, each call on its own
+
+    Args:
+        -> function (callable): called with the number of the call
+        -> count (int): number of calls. Defaults to 1
+
+    Returns:
+        -> dict: count, total seconds, operations per second and the p50 / p99 latency of one call in microseconds
+    """
+    latencies = []
+
+    for i in range(count):
+        start = time.perf_counter()
+        function(i)
+        latencies.append(time.perf_counter() - start)
+
+    latencies.sort()
+    total = sum(latencies)
+
+    return {'count': count, 'seconds': round(total, 6), 'ops_per_s': round(count / total, 1) if total else None, 'p50_us': round(latencies[len(latencies) // 2] * 1e6, 1), 'p99_us': round(latencies[min(int(0.99 * count), count - 1)] * 1e6, 1)}
+
+
+class Suite(object):
+    """
+    A class to represent one run of the benchmark suite against a directory of generated data
+
+    Constructor Args:
+        -> directory (str): directory holding the generated data files
+        -> ops (int): number of calls timed per fast operation. Defaults to 1000
+        -> slow_ops (int): number of calls timed per operation that rewrites a whole file. Defaults to 20
+        -> seed (int): seed of the random choices of accounts and amounts. Defaults to 0
+    """
+
+    def __init__(self, directory: str, ops: int = 1000, slow_ops: int = 20, seed: int = 0) -> (None):
+        """
+        constructor method for class Suite
+
+        Args:
+            -> directory (str): directory holding the generated data files
+            -> ops (int): number of calls timed per fast operation. Defaults to 1000
+            -> slow_ops (int): number of calls timed per operation that rewrites a whole file. Defaults to 20
+            -> seed (int): seed of the random choices of accounts and amounts. Defaults to 0
+        """
+        self.directory = directory
+        self.ops = ops
+        self.slow_ops = slow_ops
+        self.rng = random.Random(seed)
+
+        self.accounts_txt = os.path.join(directory, 'accounts.txt')
+        self.transactions_txt = os.path.join(directory, 'accountsTransactions.txt')
+        self.customers_txt = os.path.join(directory, 'customers.txt')
+        self.journal_txt = os.path.join(directory, 'accountsJournal.txt')
+
+        self.accounts = None
+        self.customers = None
+
+        BankAccount.storage = TextStorage(self.accounts_txt, self.transactions_txt, self.customers_txt, sequence=TransactionSequence(self.transactions_txt))
+
+    # operations run in this order, later ones use the accounts and customers loaded by the first ones
+    OPERATIONS = ['load_accounts', 'load_customers', 'transaction_index_scan', 'transaction_index_load', 'deposit', 'withdraw', 'transfer', 'deposit_journal', 'add_account', 'delete_cust_account', 'customer_login', 'customer_search', 'statement_page', 'balance_at', 'month_end', 'reconcile']
+
+    def _pick(self) -> (BankAccount):
+        """
+        returns a random account, with the monthly limit of Savings Accounts lifted so every posting is stored
+        """
+        account = self.rng.choice(self.account_list)
+        account.MONTHLY_LIMIT = sys.maxsize
+
+        return account
+
+    def load_accounts(self) -> (dict):
+        def run(i):
+            self.accounts = {account.account_number: account for account in main.get_accounts(self.accounts_txt, self.transactions_txt, self.journal_txt)}
+
+        result = timed(run)
+        self.account_list = sorted(self.accounts.values(), key=lambda account: account.account_number)
+
+        return result
+
+    def load_customers(self) -> (dict):
+        def run(i):
+            self.customers = CustomerRegistry(main.get_customers(self.customers_txt, self.accounts), CustomerSequence(None, 0))
+
+        return timed(run)
+
+    def transaction_index_scan(self) -> (dict):
+        def run(i):
+            if os.path.exists(self.transactions_txt + '.idx'):
+                os.remove(self.transactions_txt + '.idx')
+
+            TransactionIndex(self.transactions_txt).load()
+
+        return timed(run)
+
+    def transaction_index_load(self) -> (dict):
+        return timed(lambda i: TransactionIndex(self.transactions_txt).load())
+
+    def deposit(self) -> (dict):
+        return timed(lambda i: self._pick().deposit(Money(self.rng.randint(1, 10000))), self.ops)
+
+    def withdraw(self) -> (dict):
+        return timed(lambda i: self._pick().withdraw(Money(self.rng.randint(1, 100))), self.ops)
+
+    def transfer(self) -> (dict):
+        def run(i):
+            account, recipient = self._pick(), self._pick()
+
+            if recipient is not account:
+                account.transfer(Money(self.rng.randint(1, 100)), recipient)
+
+        return timed(run, self.ops)
+
+    def deposit_journal(self) -> (dict):
+        storage = BankAccount.storage
+        BankAccount.storage = TextStorage(self.accounts_txt, self.transactions_txt, self.customers_txt, journal=BalanceJournal(self.journal_txt, self.accounts_txt), sequence=storage.sequence)
+
+        try:
+            return timed(lambda i: self._pick().deposit(Money(self.rng.randint(1, 10000))), self.ops)
+        finally:
+            BankAccount.storage.journal.compact()
+            BankAccount.storage = storage
+
+    def add_account(self) -> (dict):
+        allocator = AccountNumberAllocator(None, self.accounts)
+        customers = list(self.customers)
+        self.opened = []
+
+        def run(i):
+            customer, account = self.rng.choice(customers), SavingsAccount(allocator.allocate())
+            customer.add_account(account)
+            self.opened.append((customer, account))
+
+        return timed(run, self.slow_ops)
+
+    def delete_cust_account(self) -> (dict):
+        return timed(lambda i: self.opened[i][0].delete_cust_account(self.opened[i][1]), len(self.opened))
+
+    def customer_login(self) -> (dict):
+        return timed(lambda i: self.customers.get(self.rng.randint(1, len(self.customers))), self.ops)
+
+    def customer_search(self) -> (dict):
+        return timed(lambda i: self.customers.search(f'surname{self.rng.randrange(1000)}'), self.ops)
+
+    def statement_page(self) -> (dict):
+        def run(i):
+            start = datetime.date(2021, 1, 1) + datetime.timedelta(days=self.rng.randrange(3 * 365))
+            self._pick().get_statement(start, start + datetime.timedelta(days=30))
+
+        return timed(run, self.ops)
+
+    def balance_at(self) -> (dict):
+        return timed(lambda i: self._pick().get_balance_at(datetime.date(2021, 1, 1) + datetime.timedelta(days=self.rng.randrange(3 * 365))), self.ops)
+
+    def month_end(self) -> (dict):
+        return timed(lambda i: MonthEnd(self.accounts, period_txt=None).run())
+
+    def reconcile(self) -> (dict):
+        balances = {account[0]: account[2] for account in BankAccount.storage.load_accounts()}
+        return timed(lambda i: reconcile(self.transactions_txt, balances))
+
+    def run(self, only: list[str] = None) -> (dict):
+        """
+        runs the operations in order, an operation left out by only is skipped unless a later one needs its data
+
+        Returns:
+            -> dict: operation name mapped to its timing
+        """
+        results = {}
+
+        for name in self.OPERATIONS:
+            # the loads (and add_account for delete_cust_account) are needed by everything after them
+            needed = name in ('load_accounts', 'load_customers') or (name == 'add_account' and 'delete_cust_account' in (only or []))
+
+            if only and name not in only and not needed:
+                continue
+
+            print(f'{name}...', file=sys.stderr, flush=True)
+            result = getattr(self, name)()
+
+            if not only or name in only:
+                results[name] = result
+
+        return results
+
+
+def describe_run(args: argparse.Namespace, counts: dict) -> (dict):
+    """
+    returns the settings and environment of a run, stored next to the results
+    """
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError:
+        commit = None
+
+    return {'scale': args.scale, 'seed': args.seed, 'ops': args.ops, 'slow_ops': args.slow_ops, **counts, 'python': platform.python_version(), 'platform': platform.platform(), 'commit': commit, 'started': datetime.datetime.now().isoformat(timespec='seconds')}
+
+
+def compare(results: dict, baseline: dict) -> (str):
+    """
+    formats a comparison of two runs -> the mean time of one call of every operation relative to the baseline run,
+    a ratio below 1 is faster than the baseline
+    """
+    lines = [f"{'operation':<26}{'baseline us':>14}{'this run us':>14}{'ratio':>8}"]
+
+    for name, result in results.items():
+        if name in baseline:
+            before, after = baseline[name]['seconds'] / baseline[name]['count'] * 1e6, result['seconds'] / result['count'] * 1e6
+            lines.append(f"{name:<26}{before:>14.1f}{after:>14.1f}{after / before if before else float('inf'):>8.2f}")
+
+    return '\n'.join(lines)
+
+
+def parse_args(argv: list[str] = None) -> (argparse.Namespace):
+    """
+    parses the command line options of the benchmark suite
+    """
+    parser = argparse.ArgumentParser(description='Benchmark suite of the Bank System')
+    parser.add_argument('--scale', choices=SCALES, default='1k', help='preset number of customers, accounts and transactions')
+    parser.add_argument('--transactions', type=int, help='number of transaction lines instead of the count of the scale (up to 10M)')
+    parser.add_argument('--seed', type=int, default=0, help='seed of the data generator and the random choices')
+    parser.add_argument('--ops', type=int, default=1000, help='number of calls timed per fast operation')
+    parser.add_argument('--slow-ops', type=int, default=20, help='number of calls timed per operation that rewrites a whole file')
+    parser.add_argument('--data', metavar='DIRECTORY', help='use (or generate once into) this directory instead of a temporary one')
+    parser.add_argument('--only', type=lambda names: names.split(','), help='comma separated operations to run')
+    parser.add_argument('--output', metavar='FILE', help='write the JSON report to FILE instead of stdout')
+    parser.add_argument('--compare', metavar='FILE', help='compare the run with a JSON report written before')
+
+    return parser.parse_args(argv)
+
+
+if __name__ == '__main__':
+    args = parse_args()
+    customers, accounts, transactions = SCALES[args.scale]
+    transactions = args.transactions if args.transactions is not None else transactions
+
+    with tempfile.TemporaryDirectory() as temporary:
+        directory = args.data or temporary
+
+        # generated data is reused from --data (if it matches the scale and seed), the benchmark itself runs on a copy
+        # so every run starts the same
+        try:
+            prepare_data(directory, customers, accounts, transactions, args.seed)
+        except ValueError as error:
+            sys.exit(f'error: {error}')
+
+        workspace = os.path.join(temporary, 'run')
+        copy_data(directory, workspace)
+
+        results = Suite(workspace, args.ops, args.slow_ops, args.seed).run(args.only)
+
+    report = {'run': describe_run(args, {'customers': customers, 'accounts': accounts, 'transactions': transactions}), 'results': results}
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+    else:
+        print(json.dumps(report, indent=2))
+
+    if args.compare:
+        with open(args.compare, 'r') as f:
+            print(compare(results, json.load(f)['results']), file=sys.stderr)
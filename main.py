@@ -1,8 +1,26 @@
+from bank_customers import CustomerRegistry
 from bank_external import Customer, BankAccount, SavingsAccount, CheckAccount
-import random
+from bank_history import TransactionIndex
+from bank_import import import_payments
+from bank_journal import BalanceJournal, read_journal
+import bank_metrics
+import bank_profile
+from bank_money import Money
+from bank_monthend import MonthEnd
+from bank_reconcile import format_report, reconcile
+from bank_snapshot import parse_account, parse_customer, read_account_snapshot, read_customer_snapshot, write_snapshot
+from bank_sequence import AccountNumberAllocator, TransactionSequence
+from bank_server import serve
+from bank_storage import Storage, SQLiteStorage, TextStorage
+import argparse
+import asyncio
+import atexit
+import sys
 import datetime
 import platform
+import time
 import os
+import signal
 
 def clear_console() -> (None):
     """
@@ -17,103 +35,162 @@ def clear_console() -> (None):
     else:
         print('\n' * 100)
 
-def get_accounts(accounts_txt: str = 'data/accounts.txt', transactions_txt: str = 'data/accountsTransactions.txt') -> (list[BankAccount]):
+def get_accounts(accounts_txt: str = 'data/accounts.txt', transactions_txt: str = 'data/accountsTransactions.txt', journal_txt: str = 'data/accountsJournal.txt', report: bool = False, lazy: bool = False, snapshot_file: str = None, storage: Storage = None) -> (list[BankAccount]):
     """
     takes accounts and transactions from text files; accounts.txt and transactions.txt, creates Bank Account instances
-    from the data and returns a list of Bank Account instances
+    from the data and returns a list of Bank Account instances. Balances in the balance journal that have not been
+    compacted into accounts.txt yet are replayed over the balances in accounts.txt
+
+    ** Each file is streamed once, transactions are grouped by account number and joined to their accounts by lookup
+    ** In lazy mode only the byte offsets of each account's transactions are loaded (from the persisted transaction
+       index), the transaction history of an account is read the first time it is accessed
+    ** When an up to date binary snapshot is given, the account table is read from it instead of accounts.txt
+    ** When a storage backend is given, accounts and transactions are read from it instead of the text files
 
     Args:
         -> accounts_txt (str): text file containing All Bank Account data. Defaults to 'data/accounts.txt'
         -> transactions_txt: (str): text file containing All Transactions in Banking System. Defaults to 'data/accountsTransactions.txt'
+        -> journal_txt (str): text file containing journaled balances. Defaults to 'data/accountsJournal.txt'
+        -> report (bool): print the load throughput in rows per second to stderr. Defaults to False
+        -> lazy (bool): defer loading the transaction history of each account until it is accessed. Defaults to False
+        -> snapshot_file (str): binary snapshot of the account table (see bank_snapshot.py). Defaults to None
+        -> storage (Storage): storage backend to read accounts and transactions from (see bank_storage.py). Defaults to None
 
     """    
+    start = time.perf_counter()
+    num_transactions = 0
+
     try:
-        accounts = []
-        transactions = []
+        accTransactions = {}
+        accOffsets = {}
         accObjects = []
 
-        # read accounts from accounts.txt
-        with open(accounts_txt, 'r') as f:
+        # load the byte offsets of the transactions of each account instead of the transactions themselves
+        if lazy and storage is None:
+            index = TransactionIndex(transactions_txt)
+            accOffsets = index.load()
+            num_transactions = len(index)
 
-            # formats each account from one whole string to an array of strings seperated by ','
-            for account in f.readlines():
-                account = (account.strip('\n')).split(', ')
-                accounts.append(account)
-        
-        # read transactions from transactions.txt
-        with open(transactions_txt, 'r') as g:
+        # read transactions from transactions.txt (or the storage backend), grouping them by account number in a single pass
+        else:
+            for transaction in (storage or TextStorage(transactions_txt=transactions_txt)).load_transactions():
+                num_transactions += 1
+
+                if transaction.account_number in accTransactions:
+                    accTransactions[transaction.account_number].append(transaction)
+                else:
+                    accTransactions[transaction.account_number] = [transaction]
+
+        # the journal tail -> the latest journaled balance of an account replaces the balance in accounts.txt
+        journaled = read_journal(journal_txt) if storage is None else {}
+
+        # read accounts from the snapshot, or from accounts.txt if there is no up to date snapshot
+        accounts = read_account_snapshot(snapshot_file, accounts_txt) if snapshot_file is not None and storage is None else None
 
-            # formats each account from one whole string to an array of strings seperated by ','
-            for transaction in g.readlines():
-                transaction = transaction.strip('\n').split(', ')
-                transactions.append(transaction)
+        if storage is not None:
+            accounts = storage.load_accounts()
+
+        elif accounts is None:
+            with open(accounts_txt, 'r') as f:
+                accounts = [parse_account(account) for account in f if account.strip()]
+
+        for account_number, accType, funds, credit_limit in accounts:
+            if account_number in journaled:
+                funds = Money.parse(journaled[account_number])
+
+            # create account instance based on type of account with its grouped transactions and append to accObjects list
+            if accType == 'SavingsAccount':
+                accObject = SavingsAccount(account_number, funds, accTransactions.get(account_number))
+            else:
+                accObject = CheckAccount(account_number, funds, accTransactions.get(account_number), credit_limit)
+
+            # in lazy mode the transaction history is read from its offsets on first access
+            if account_number in accOffsets:
+                accObject.defer_transactions(transactions_txt, accOffsets[account_number])
+
+            accObjects.append(accObject)
                 
     except IOError:
         print(IOError)
         exit()
 
-    # for loop to associate all the transactions for each bank account instance
-    for account in accounts:
-        accTransactions=[]
-
-        for transaction in transactions:
-
-            # check if the account number in the transaction matches current account instance in for loop
-            if account[0] == transaction[1]:
-                accTransactions.append(transaction)
-            
-        # create account instance based on type of account and append to accObjects list
-        if account[1] == 'SavingsAccount':
-            accObjects.append(SavingsAccount(account[0], float(account[2]), accTransactions))
-        else:
-            accObjects.append(CheckAccount(account[0], float(account[2]), accTransactions, float(account[3])))
+    # report load throughput so startup regressions can be tracked
+    if report:
+        elapsed = time.perf_counter() - start
+        rows = len(accObjects) + num_transactions
+        print(f'Loaded {len(accObjects)} accounts and {num_transactions} transactions in {elapsed:.3f}s ({rows / max(elapsed, 1e-9):,.0f} rows/s)', file=sys.stderr)
 
     return accObjects
 
-def get_customers(customer_txt: str = 'data/customers.txt', accounts: list[BankAccount] = get_accounts()) -> (list[Customer]):
+def get_customers(customer_txt: str = 'data/customers.txt', accounts: dict[str, BankAccount] = None, snapshot_file: str = None, storage: Storage = None) -> (list[Customer]):
     """
     Function to return a list of all the customers in the system as Customer objects 
 
     Args:
         -> customer_txt (str): text file containing all customer data in Bank System. Defaults to 'data/customers.txt'
-        -> accounts (list[BankAccount]): list of all Account instances in Bank System. Defaults to method get_accounts().
+        -> accounts (dict[str, BankAccount]): all Account instances in Bank System keyed by account number (a list of Account instances is also accepted). Defaults to method get_accounts().
+        -> snapshot_file (str): binary snapshot of the customers and their account links (see bank_snapshot.py). Defaults to None
+        -> storage (Storage): storage backend to read the customers from instead of customers.txt. Defaults to None
     """ 
+    # load the accounts only when the caller didn't supply them and index them by account number
+    if accounts is None:
+        accounts = get_accounts(storage=storage)
+
+    if not isinstance(accounts, dict):
+        accounts = {account.account_number: account for account in accounts}
+
     try:
-        customers = []
         custObjects = []
 
-        # read customers from customers.txt
-        with open(customer_txt, 'r') as f:
+        # read customers from the snapshot, or from customers.txt if there is no up to date snapshot
+        customers = read_customer_snapshot(snapshot_file, customer_txt) if snapshot_file is not None and storage is None else None
 
-            # formats each customer from one whole string to an array of strings seperated by ','
-            for customer in f.readlines():
-                customers.append((customer.strip('\n')).split(', '))
+        if storage is not None:
+            customers = storage.load_customers()
+
+        elif customers is None:
+            with open(customer_txt, 'r') as f:
+                customers = [parse_customer(customer) for customer in f if customer.strip()]
 
     except IOError:
         print(f"File {customer_txt} does not exist.")
         exit()
 
-    # for loop to associate all the accounts owned by each customer instance
-    for customer in customers:
-        custAccounts = []
+    for customer_id, name, surname, dob, address, account_numbers in customers:
 
-        ''' data in text file cleaned so as to define accounts from the 7th index onwards -> assumption that one customer can have multiple accounts '''
+        # look up each linked account number directly in the account index
+        custAccounts = [accounts[account_number] for account_number in account_numbers if account_number in accounts]
 
-        # if statement to check if customer has at least one account, check if the data elements associated with current customer in loop has more than 7 elements (i.e there exists accounts)
-        if len(customer) > 7:
+        # create customer instance with their associated accounts and append to list of customer objects
+        custObjects.append(Customer(customer_id, name, surname, dob, address, custAccounts))
 
-            # for loop to check if a account instance can be associated with current customer within loop by match of account number
-            for account in accounts:     
+    return custObjects
 
-                # for loop to check each customer element from the 7th index to the length of elements
-                for i in range(7, len(customer)):
-                    if customer[i] == account.account_number:
-                        custAccounts.append(account)
+def load_bank(report: bool = False, lazy: bool = False, snapshot_file: str = 'data/bank.snap', storage: Storage = None) -> (tuple[dict[str, BankAccount], CustomerRegistry]):
+    """
+    loads all accounts and customers of the Bank System exactly once. The first call reads each data file a single time
+    and builds the account-number -> account index, later calls return the already loaded data. An up to date binary
+    snapshot (created with --snapshot) is used in place of accounts.txt and customers.txt
 
-        # create customer instance with their associated accounts and append to list of customer objects
-        custObjects.append(Customer( int(customer[0]), customer[1], customer[2], datetime.date(int(customer[3]), int(customer[4]), int(customer[5])), customer[6], custAccounts))
+    Args:
+        -> report (bool): print the account load throughput to stderr. Defaults to False
+        -> lazy (bool): defer loading each account's transaction history until it is accessed. Defaults to False
+        -> snapshot_file (str): binary snapshot of accounts and customers, ignored when missing or stale. Defaults to 'data/bank.snap'
+        -> storage (Storage): storage backend to load from, None loads the text files in data/. Defaults to None
 
-    return custObjects
+    Returns:
+        -> tuple[dict[str, BankAccount], CustomerRegistry]: account instances keyed by account number and all customer instances indexed by ID and name
+    """
+    global myAccounts, myCustomers, accountNumbers
+
+    if myAccounts is None:
+        myAccounts = {account.account_number: account for account in get_accounts(report=report, lazy=lazy, snapshot_file=snapshot_file, storage=storage)}
+        myCustomers = CustomerRegistry(get_customers(accounts=myAccounts, snapshot_file=snapshot_file, storage=storage))
+
+        # the issued account numbers are read from data/accountNumbers.bin, the accounts only seed a missing file
+        accountNumbers = AccountNumberAllocator(existing=myAccounts)
+
+    return myAccounts, myCustomers
 
 def create_account(customer : Customer) -> (None):
     """
@@ -130,14 +207,21 @@ def create_account(customer : Customer) -> (None):
         try:
             accType = int(input("\n2 Types of Accounts are available:\n\nEnter (1) for Savings Account\nEnter (2) for Check Account *(18 and older to qualify)\n\nEnter (3) to return to your Bank\n"))
 
-            # generate a unique customer number using the method generate_account_number()
-            newAcc_number = generate_account_number()
-
             ''' if statements to direct based on input from menu '''
 
             # add a new Savings Bank Account
             if accType == 1:
-                customer.add_account(SavingsAccount(newAcc_number))          
+                if customer.age < 14:
+                    print('\nError, You dont meet the requirements to create a Savings Account\n')
+                    continue
+
+                with bank_profile.action('create_account'):
+
+                    # generate a unique account number using the method generate_account_number(), only once the account is
+                    # accepted -> issued numbers are never reused
+                    newAcc_number = generate_account_number()
+                    newAccount = SavingsAccount(newAcc_number)
+                    customer.add_account(newAccount)
             
             # add a new Check Bank Account
             elif accType == 2:
@@ -145,11 +229,17 @@ def create_account(customer : Customer) -> (None):
                     while True:
                         try:
                             # get credit limit from user (usually defined by bank -> program allows user to select a limit within specific bounds)
-                            get_limit = float(input('\nEnter a credit limit for your Check Account *(credit limit must be greater than 50 but smaller than 5000):\n-> '))
+                            get_limit = Money.parse(input('\nEnter a credit limit for your Check Account *(credit limit must be greater than 50 but smaller than 5000):\n-> '))
 
                             # check if credit limit falls between min and max bounds
                             if 50 <= get_limit <= 5000:
-                                customer.add_account(CheckAccount(newAcc_number, credit_limit=get_limit))
+                                with bank_profile.action('create_account'):
+                                    newAcc_number = generate_account_number()
+                                    newAccount = CheckAccount(newAcc_number, credit_limit=get_limit)
+                                    customer.add_account(newAccount)
+
+                                    # register the new account in the account index so it can receive transfers
+                                    myAccounts[newAcc_number] = newAccount
                                 return
                             else:
                                 print('Input Error, Credit Limit must be between 50 and 5000\n')
@@ -164,11 +254,16 @@ def create_account(customer : Customer) -> (None):
             # return bank to bank menu
             elif accType == 3:
                 my_bank(customer)
+                continue
 
             else:
                 print('\nError, Select a valid option from the menu\n')
                 continue
 
+            # register the new account in the account index so it can receive transfers
+            if newAccount in customer.get_accounts():
+                myAccounts[newAcc_number] = newAccount
+
             # upon success of account creation display new account number
             print('\nSuccess, your new Bank Account number is: ' + newAcc_number)
             my_bank(customer)  
@@ -254,7 +349,9 @@ def delete_account(customer : Customer) -> (None):
                                 delAcc = (customer.get_accounts())[selDel-1].account_number
 
                                 # pass the selected account instance to the customer class method delete_cust_account()
-                                customer.delete_cust_account((customer.get_accounts())[selDel-1])
+                                with bank_profile.action('delete_account'):
+                                    customer.delete_cust_account((customer.get_accounts())[selDel-1])
+                                    myAccounts.pop(delAcc, None)
 
                                 print(f'\nSuccess, Your Account: {delAcc} was deleted.\n')
                                 break
@@ -285,6 +382,7 @@ def delete_account(customer : Customer) -> (None):
             print('\nInvalid Input, only numeric input allowed') 
             continue
         
+@bank_profile.profiled('create_customer')
 def create_customer() -> (None):
     """
     Gets all information for a new 'Registering' Customer. Does validation on All Input
@@ -293,7 +391,6 @@ def create_customer() -> (None):
     while True:
         
         print('\nEnter your Information:')        
-        customer_id = len(myCustomers) + 1
 
         cust_name = input('\nEnter your first name: ').strip()
         cust_surname = input('\nEnter your last name: ').strip()
@@ -328,13 +425,14 @@ def create_customer() -> (None):
             if c in '()[]{}<>/.,!@#$%^&)_+|':
                 customer_address = customer_address.replace(c, '') 
 
-        # append new customer instance to list of all customer instances in system
-        myCustomers.append(Customer(int(customer_id), cust_name, cust_surname, dob, customer_address))
+        # the customer ID comes from the persistent customer ID sequence, so it stays unique when customers are removed
+        customer_id = myCustomers.new_id()
+
+        # register new customer instance with all customer instances in system
+        myCustomers.add(Customer(customer_id, cust_name, cust_surname, dob, customer_address))
         
-        # append new customer to customers text file in appropriate string format
-        customer = f'{str(customer_id)}, {cust_name}, {cust_surname}, {dob.year}, {dob.month}, {dob.day}, {customer_address}\n'
-        with open('data/customers.txt', mode='a') as f:
-            f.write(customer)
+        # store new customer through the storage backend
+        BankAccount.storage.add_customer((customer_id, cust_name, cust_surname, dob, customer_address, []))
         
         # clear console
         clear_console()
@@ -348,7 +446,7 @@ def create_customer() -> (None):
                 leave = int(input('\nEnter (1) to return to the main menu\nEnter (2) to Exit\n'))
 
                 if leave == 1:
-                    main()
+                    return
                     
                 elif leave == 2:
                     exit()
@@ -360,23 +458,90 @@ def create_customer() -> (None):
                 print('\nInvalid Input, only numeric input allowed')
                 continue
 
+def search_customers() -> (None):
+    """
+    Back-office search of customers by (the start of) their surname, optionally followed by (the start of) their name, e.g 'mur' or 'murphy j'
+    """
+    query = input('\nEnter a surname, optionally followed by a name:\n\n-> ').split()
+
+    if not query:
+        print('\nError, Empty Input\n')
+        return
+
+    matches = myCustomers.search(*query[:2])
+
+    if not matches:
+        print('\nNo customers found\n')
+        return
+
+    print(f"\n{'ID':<8}{'Surname':<20}{'Name':<20}Accounts")
+
+    for customer in matches:
+        print(f"{customer.get_custID():<8}{customer.surname:<20}{customer.name:<20}{', '.join(account.account_number for account in customer.get_accounts())}")
+
 def generate_account_number() -> (str):
     """
-    Generates a 8 digit random account number and Checks if it is unique given all current active account instances within the system.
+    Generates a 8 digit random account number that was never issued before, using the account number allocator loaded by load_bank().
 
     Returns:
         str: 8-digit numeric account number
     """    
-    # randoms a number between 0, 99999999, cast to string and if the number length is smaller than 9, fills them with zeroes -> NOTE: (could lead to repeating account numbers like 11111111 or 000000000, Low probability)
-    account_number = str(random.randint(0,99999999)).zfill(8)
+    # the allocator never repeats a number it issued, a number taken by an account it never saw (e.g added to accounts.txt by hand) is skipped
+    while True:
+        account_number = accountNumbers.allocate()
 
-    for account in myAccounts:
-        # if account number does exist regenerate new account number
-        if account_number == str(account.account_number):
-            generate_account_number()
-    
-    return account_number   
+        if account_number not in myAccounts:
+            return account_number
     
+def view_statement(account : BankAccount, page_size: int = 20) -> (None):
+    """
+    Displays the statement of a Bank Account for a date range one page at a time, the user can move between the pages. Only the transactions of the page shown are looked up.
+
+    Args:
+        account (BankAccount): a customer's account instance
+        page_size (int): number of transactions shown per page. Defaults to 20
+    """
+    # an empty date means no bound on that side of the range
+    try:
+        start, end = [datetime.datetime.strptime(date, '%Y/%m/%d').date() if date.strip() else None for date in (input('\nStatement from date AS yyyy/mm/dd (empty for the first transaction): '), input('\nStatement to date AS yyyy/mm/dd (empty for today): '))]
+
+    except ValueError:
+        print('\nError, Invalid Date Input -> Format should be yyyy/mm/dd\n')
+        return
+
+    page = 1
+
+    while True:
+        transactions, total = account.get_statement(start, end, page, page_size)
+        pages = max((total + page_size - 1) // page_size, 1)
+
+        print("\n\n| {:^20} | {:^20} | {:^20} | {:^20}".format('Transaction Number:', 'Amount:', 'Date:', 'Transaction Type:'))
+
+        for transaction in transactions:
+            print("| {:^20} | {:^20} | {:^20} | {:^20}".format(transaction.transaction_id, transaction.format_amount(), str(transaction.get_date()), transaction.get_description()))
+
+        if not total:
+            print('\nNo Transaction Data...\n')
+            return
+
+        # opening and closing balance of the range come from the running balance index of the account
+        opening, closing = account.get_period_balances(start or datetime.date.min, end or datetime.date.max)
+
+        print(f'\nPage {page} of {pages} - {total} transactions - Opening balance: {opening} - Closing balance: {closing}\n')
+
+        # move between the pages until the user returns to the account menu
+        choice = input('Enter (n) for the next page\nEnter (p) for the previous page\nEnter anything else to return\n\n-> ').strip().lower()
+
+        if choice == 'n' and page < pages:
+            page += 1
+        elif choice == 'p' and page > 1:
+            page -= 1
+        elif choice not in ('n', 'p'):
+            return
+
+# names of the choices of the account menu, used as the names of profiled actions
+ACCOUNT_ACTIONS = {1: 'view_transactions', 2: 'deposit', 3: 'withdraw', 4: 'transfer', 6: 'view_statement'}
+
 def manage_bank_account(account : BankAccount) -> (None):
     """
     Acts as the main menu from which to manage a specific instance of a Bank Account. Allows the fundamental class method operations such as Deposit, Withdraw and Transfer. Allows the user
@@ -398,79 +563,84 @@ def manage_bank_account(account : BankAccount) -> (None):
             print("\nSelect a option from the menu:\n")
 
             # get menu choice
-            decision = int(input("Enter (1) to View Transactions\nEnter (2) to Deposit\nEnter (3) to Withdraw\nEnter (4) to Transfer\nEnter (5) to Cancel\n\n-> "))
+            decision = int(input("Enter (1) to View Transactions\nEnter (2) to Deposit\nEnter (3) to Withdraw\nEnter (4) to Transfer\nEnter (5) to Cancel\nEnter (6) to View Statement by Date\n\n-> "))
 
-            # display transactions in table format
-            if decision == 1:
-                print("\n\n| {:^20} | {:^20} | {:^20} | {:^20}".format('Transaction Number:', 'Amount:', 'Date:', 'Transaction Type:'))
+            # profile the chosen action when profiling is on (see bank_profile.py)
+            with bank_profile.action(ACCOUNT_ACTIONS.get(decision)):
 
-                # checks if transactions have been performed by the account yet
-                if len(account.get_transactions()) > 0:
-                    i = 1
+                # display transactions in table format
+                if decision == 1:
+                    print("\n\n| {:^20} | {:^20} | {:^20} | {:^20}".format('Transaction Number:', 'Amount:', 'Date:', 'Transaction Type:'))
+
+                    # checks if transactions have been performed by the account yet
+                    if len(account.get_transactions()) > 0:
+                        i = 1
         
-                    # for loop to get each transaction from the instance account
-                    for transaction in account.get_transactions():
+                        # for loop to get each transaction from the instance account
+                        for transaction in account.get_transactions():
 
-                        # string format and display each transaction in table
-                        print("| {:^20} | {:^20} | {:^20} | {:^20}".format(i, transaction[2], transaction[3], transaction[4]))
+                            # string format and display each transaction in table
+                            print("| {:^20} | {:^20} | {:^20} | {:^20}".format(i, transaction.format_amount(), str(transaction.get_date()), transaction.get_description()))
 
-                        i += 1
+                            i += 1
 
-                    print(f'\nFUNDS: {account.get_funds()}\n')
+                        print(f'\nFUNDS: {account.get_funds()}\n')
 
-                else:
-                    print('\nNo Transaction Data...\n')
+                    else:
+                        print('\nNo Transaction Data...\n')
 
-            # deposit money
-            elif decision == 2:
-                depositAmount = float(input('\nEnter amount to deposit: \n'))
-                account.deposit(depositAmount)
-                print(f'\nSuccess, {depositAmount} was Deposited in to your account.')
+                # deposit money
+                elif decision == 2:
+                    depositAmount = Money.parse(input('\nEnter amount to deposit: \n'))
+                    account.deposit(depositAmount)
+                    print(f'\nSuccess, {depositAmount} was Deposited in to your account.')
 
-            # withdraw money
-            elif decision == 3:
-                withdrawAmount = float(input('\nEnter amount to withdraw: '))
-                funds = account.get_funds()
-                account.withdraw(withdrawAmount)
+                # withdraw money
+                elif decision == 3:
+                    withdrawAmount = Money.parse(input('\nEnter amount to withdraw: '))
+                    funds = account.get_funds()
+                    account.withdraw(withdrawAmount)
 
-                if account.get_funds() < funds:
-                    print(f'\nSuccess, {withdrawAmount} was Withdrawn from your account.')
+                    if account.get_funds() < funds:
+                        print(f'\nSuccess, {withdrawAmount} was Withdrawn from your account.')
 
-            # transfer funds
-            elif decision == 4:
-                accExist = False
+                # transfer funds
+                elif decision == 4:
+                    accExist = False
 
-                # get transfer amount and recipient account number
-                transferAmount = float(input('\nEnter amount to Transfer: '))
-                transfer_account_number = input('\nEnter Transfer Recipient Account Number: ')
+                    # get transfer amount and recipient account number
+                    transferAmount = Money.parse(input('\nEnter amount to Transfer: '))
+                    transfer_account_number = input('\nEnter Transfer Recipient Account Number: ')
 
-                # store instance account old funds value
-                funds = account.get_funds()
+                    # store instance account old funds value
+                    funds = account.get_funds()
 
-                # check if entered account does exist
-                for acc in myAccounts:
-                    if acc.account_number == transfer_account_number:
+                    # check if entered account does exist
+                    if transfer_account_number in myAccounts:
                         accExist = True
-                        account.transfer(transferAmount, acc)    
-                        break   # break to stop searching
+                        account.transfer(transferAmount, myAccounts[transfer_account_number])
                         
-                # if statement if account number does not exist
-                if accExist != True:
-                    print('\nInvalid Account Number, Try Again\n')
-                    continue
+                    # if statement if account number does not exist
+                    if accExist != True:
+                        print('\nInvalid Account Number, Try Again\n')
+                        continue
             
-                # display success if funds changed
-                if account.get_funds() < funds:
-                    print(f'\nSuccess, {transferAmount} was succesfully transferred to Account: {transfer_account_number}')
+                    # display success if funds changed
+                    if account.get_funds() < funds:
+                        print(f'\nSuccess, {transferAmount} was succesfully transferred to Account: {transfer_account_number}')
 
-            # return to back to menu
-            elif decision == 5:
-                clear_console()
-                return
+                # return to back to menu
+                elif decision == 5:
+                    clear_console()
+                    return
 
-            else:
-                print('\nInvalid option, enter a option from the menu\n')
-                continue
+                # display a date range of transactions page by page
+                elif decision == 6:
+                    view_statement(account)
+
+                else:
+                    print('\nInvalid option, enter a option from the menu\n')
+                    continue
                 
         except ValueError:
             print("\nInvalid Input, only numeric input allowed\n")
@@ -503,7 +673,7 @@ def my_bank(customer : Customer) -> (None):
                 
                 # return back to 'login' menu
                 elif createAccount == 2:
-                    main()
+                    return
                 else:
                     print('\nSelect a valid option from the menu\n\n')
                     continue
@@ -547,7 +717,7 @@ def my_bank(customer : Customer) -> (None):
 
                 # return to 'login' menu
                 elif getAccount == 0:
-                    main()
+                    return
                 else:
                     print('\nError, Select a valid option from the menu\n')
                     continue
@@ -570,19 +740,20 @@ def main() -> (None):
         print('\nWelcome to Galactic Bank \n')
         
         try:
-            isCustomer = int(input('Enter (1) to Login\nEnter (2) to Register\nEnter (3) to Exit :(\n\n-> '))
+            isCustomer = int(input('Enter (1) to Login\nEnter (2) to Register\nEnter (3) to Exit :(\nEnter (4) to Search Customers\n\n-> '))
 
             # login based on customer identifier
             if isCustomer == 1:
                 customerID = int(input('\nEnter your UNIQUE Customer ID:\n\n-> '))
 
-                # check if customer instance exists
-                for customer in myCustomers:
-                    if customerID == customer.get_custID():
-                        my_bank(customer)
+                # look up customer instance by its identifier
+                customer = myCustomers.get(customerID)
 
-                print('\nUnable to find your data, try again\n')
-                continue
+                if customer is None:
+                    print('\nUnable to find your data, try again\n')
+                    continue
+
+                my_bank(customer)
             
             # create new customer instance
             elif isCustomer == 2:
@@ -592,6 +763,10 @@ def main() -> (None):
             elif isCustomer == 3:
                 print('\nGood Bye :)')
                 exit()
+
+            # back-office customer search
+            elif isCustomer == 4:
+                search_customers()
             else:
                 print('\nInvalid Input, Choose any option from the menu')
                 continue
@@ -599,7 +774,126 @@ def main() -> (None):
         except ValueError:
             print('\nInput Error, Try again\n')
 
-# initialize data and start program
-myAccounts = get_accounts()
-myCustomers = get_customers()
-main()
+# accounts keyed by account number, the customer registry and the account number allocator, loaded once by load_bank()
+myAccounts = None
+myCustomers = None
+accountNumbers = None
+
+def parse_args(argv: list[str] = None) -> (argparse.Namespace):
+    """
+    parses the command line options of the Bank System
+
+    Args:
+        -> argv (list[str]): command line arguments. Defaults to sys.argv
+
+    Returns:
+        -> argparse.Namespace: the parsed options
+    """
+    parser = argparse.ArgumentParser(description='Galactic Bank - Bank Management System')
+    parser.add_argument('--journal', action='store_true', help='append balance changes to data/accountsJournal.txt and compact them into accounts.txt')
+    parser.add_argument('--report-load', action='store_true', help='print the load throughput in rows per second to stderr')
+    parser.add_argument('--lazy-history', action='store_true', help='read transaction histories only when they are viewed')
+    parser.add_argument('--snapshot', action='store_true', help='write a binary snapshot of accounts and customers to data/bank.snap and exit')
+    parser.add_argument('--sqlite', metavar='DATABASE', help='keep all data in a SQLite database (the text files are imported into a new database)')
+    parser.add_argument('--import-payments', metavar='CSV', help='post a payment file (account number, signed amount, description) and exit')
+    parser.add_argument('--chunk-size', type=int, default=10000, help='number of payments posted per batch by --import-payments')
+    parser.add_argument('--rejects', metavar='CSV', help='file the rows rejected by --import-payments are written to')
+    parser.add_argument('--month-end', action='store_true', help='book month-end savings interest and overdraft charges on all accounts and exit, refused if the current month was booked already (see data/monthEnd.txt)')
+    parser.add_argument('--serve', metavar='HOST:PORT', nargs='?', const='127.0.0.1:8765', help='serve clients over line-delimited JSON on TCP instead of the menu (defaults to 127.0.0.1:8765)')
+    parser.add_argument('--unix-socket', metavar='PATH', help='serve clients over line-delimited JSON on a Unix socket instead of the menu')
+    parser.add_argument('--reconcile', action='store_true', help='audit data/accountsTransactions.txt against the balances in data/accounts.txt and exit')
+    parser.add_argument('--workers', type=int, default=None, help='number of worker processes used by --reconcile (defaults to the number of CPUs)')
+    parser.add_argument('--sync', action='store_true', help='flush every stored change to disk (fsync) before it is confirmed')
+    parser.add_argument('--max-batch', type=int, default=256, help='largest number of requests the server stores as one group commit')
+    parser.add_argument('--max-wait', type=float, default=0.0, help='seconds the server waits for more requests before storing a group commit')
+    parser.add_argument('--profile', metavar='DIRECTORY', help=f'profile every menu action (and batch run) with cProfile into DIRECTORY and print the hotspots on exit (or set ${bank_profile.PROFILE_ENV})')
+    parser.add_argument('--profile-memory', action='store_true', help=f'also take tracemalloc snapshots around every profiled action (or set ${bank_profile.PROFILE_MEMORY_ENV}=1)')
+    parser.add_argument('--metrics', metavar='FILE', help='collect operation latency and file I/O metrics, written to FILE on exit and on SIGUSR1 (Prometheus text format, JSON if FILE ends in .json)')
+
+    return parser.parse_args(argv)
+
+if __name__ == '__main__':
+    args = parse_args()
+
+    # collect metrics from the start so the loaders are included, they are written on exit and whenever SIGUSR1 arrives
+    if args.metrics:
+        metrics = bank_metrics.enable(sys.modules[__name__])
+        atexit.register(metrics.write, args.metrics)
+
+        if hasattr(signal, 'SIGUSR1'):
+            signal.signal(signal.SIGUSR1, lambda signum, frame: metrics.write(args.metrics))
+
+    # profile menu actions and batch runs, from the flags or the BANK_PROFILE environment variables
+    bank_profile.enable(args.profile, args.profile_memory or None)
+
+    # write a binary snapshot of the account table and customer links for a fast cold start, then exit
+    if args.snapshot:
+        num_accounts, num_customers = write_snapshot()
+        print(f'Snapshot written to data/bank.snap: {num_accounts} accounts, {num_customers} customers')
+        exit()
+
+    # replay the transaction log in parallel and compare it with the stored balances, then exit (status 1 on findings)
+    if args.reconcile:
+        balances = {account[0]: account[2] for account in TextStorage(journal=BalanceJournal() if os.path.exists('data/accountsJournal.txt') else None).load_accounts()}
+        report = reconcile('data/accountsTransactions.txt', balances, args.workers)
+        print(format_report(report))
+        exit(1 if report['balance_mismatches'] or report['unmatched_transfers'] or report['id_gap_count'] or report['malformed_count'] else 0)
+
+    # keep all data in a SQLite database, a new database is filled from the text files
+    if args.sqlite:
+        BankAccount.storage = SQLiteStorage(args.sqlite, sync=args.sync)
+
+        if BankAccount.storage.is_empty():
+            BankAccount.storage.import_from(TextStorage(journal=BalanceJournal() if os.path.exists('data/accountsJournal.txt') else None))
+
+        load_bank(report=args.report_load, storage=BankAccount.storage)
+
+    else:
+        # enable the balance journal -> balance changes are appended to data/accountsJournal.txt and compacted into accounts.txt
+        if args.journal:
+            journal = BalanceJournal()
+
+        # otherwise fold a journal left over from a journaled session, so accounts.txt is the only place balances are kept
+        else:
+            journal = None
+
+            if os.path.exists('data/accountsJournal.txt'):
+                BalanceJournal().compact()
+
+        # seed the transaction ID sequence once from the last record of accountsTransactions.txt
+        BankAccount.storage = TextStorage(journal=journal, sequence=TransactionSequence(), sync=args.sync)
+
+        # initialize data (--lazy-history defers reading transaction histories until they are viewed)
+        load_bank(report=args.report_load, lazy=args.lazy_history)
+
+    # non-interactive import of a payment file
+    if args.import_payments:
+        with bank_profile.action('import_payments'):
+            posted, rejected = import_payments(args.import_payments, myAccounts, args.chunk_size, args.rejects)
+
+        print(f'Import finished: {posted} payments posted, {rejected} rejected')
+        exit()
+
+    # non-interactive month-end run over all accounts
+    if args.month_end:
+        try:
+            with bank_profile.action('month_end'):
+                posted = MonthEnd(myAccounts).run()
+        except ValueError as error:
+            sys.exit(f'Error, {error}')
+
+        print(f'Month-end finished: {posted} transactions posted')
+        exit()
+
+    # network service -> clients are served until the program is interrupted
+    if args.serve or args.unix_socket:
+        host, port = (args.serve or '127.0.0.1:8765').rsplit(':', 1)
+
+        try:
+            asyncio.run(serve(myAccounts, myCustomers, BankAccount.storage, host, int(port), args.unix_socket, args.max_batch, args.max_wait, accountNumbers))
+        except KeyboardInterrupt:
+            pass
+
+        exit()
+
+    main()